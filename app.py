@@ -1,12 +1,26 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, Request
 import os
-import pandas as pd
+import json
+import numpy as np
 from flask import render_template_string
 # Import dari backend
-from backend.models.preprocessing import preprocess_dataframe
 from backend.models.model_bert import bertopic_analysis, generate_topics_with_label
-from backend.models.model_match import keyword_matching,group_fields_with_groq, get_top10_chart_df
+from backend.models.cluster_sweep import DEFAULT_MIN_SAMPLES
+from backend.models.model_registry import warm_up, readiness, get_embedding_model
+from backend.models.model_match import keyword_matching, get_top10_chart_df
+from backend.models.job_queue import JobQueue, QueueFullError
+from backend.models.analysis_cache import AnalysisCache
+from backend.models.corpus_store import CorpusStore
+from backend.models.ingestion import read_upload
+from backend.models.upload_store import UploadStore, UPLOAD_EXTENSIONS
+from backend.models.incremental import CorpusRegistry, kunci_korpus
+from backend.models.ann_index import AnnStore
+from backend.models.acm_embedding import embedding_matching, laporan_kesepakatan
+from backend.models.preprocessing import clean_abstract
+from functools import lru_cache
 import base64
+import threading
+import time
 from io import BytesIO
 
 app = Flask(__name__,
@@ -17,8 +31,90 @@ UPLOAD_FOLDER = 'uploads'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# In-memory cache untuk menyimpan model dan data
-analysis_cache = {}
+# Batas ukuran request upload (UPLOAD_MAX_MB), di atasnya dibalas 413
+app.config['UPLOAD_MAX_MB'] = int(os.environ.get('UPLOAD_MAX_MB', 512))
+app.config['MAX_CONTENT_LENGTH'] = app.config['UPLOAD_MAX_MB'] * 1024 ** 2
+
+# File upload disimpan per isi (sha1) dengan nama file sebagai alias; sha1 menjadi key cache
+upload_store = UploadStore(UPLOAD_FOLDER)
+
+# Hasil preprocessing per isi file disimpan sebagai artefak di uploads/.preprocessed
+corpus_store = CorpusStore(UPLOAD_FOLDER)
+
+
+class UploadRequest(Request):
+    """Request yang menulis file multipart langsung ke upload_store sambil menghitung hash"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return upload_store.open_temp()
+
+
+app.request_class = UploadRequest
+
+
+def _hash_upload(filename):
+    """sha1 isi file upload untuk nama tertentu, None jika nama tidak dikenal"""
+    entry = upload_store.get(filename) if filename else None
+    return entry["hash"] if entry else None
+
+# Mode paralel keyword matching (0 = nonaktif, kosong = semua core)
+_workers_env = os.environ.get('KEYWORD_MATCH_WORKERS', '0')
+app.config['KEYWORD_MATCH_WORKERS'] = int(_workers_env) if _workers_env else None
+app.config['KEYWORD_MATCH_SHARD_SIZE'] = int(os.environ.get('KEYWORD_MATCH_SHARD_SIZE', 2000))
+
+# Jumlah dokumen sampel untuk laporan kesepakatan engine embedding vs fuzzy (0 = nonaktif);
+# jika hasil keyword matching file yang sama ada di cache, seluruh dokumen dibandingkan
+app.config['ACM_AGREEMENT_SAMPLE'] = int(os.environ.get('ACM_AGREEMENT_SAMPLE', 500))
+
+# Mode paralel tokenisasi coherence BERTopic (0 = nonaktif, kosong = semua core)
+_tokenize_workers_env = os.environ.get('TOKENIZE_WORKERS', '0')
+app.config['TOKENIZE_WORKERS'] = int(_tokenize_workers_env) if _tokenize_workers_env else None
+
+# Sweep min_cluster_size (kosong = semua core, 1 = sekuensial; strategi 'grid' atau 'coarse')
+_sweep_workers_env = os.environ.get('SWEEP_WORKERS', '')
+app.config['SWEEP_WORKERS'] = int(_sweep_workers_env) if _sweep_workers_env else None
+app.config['SWEEP_STRATEGY'] = os.environ.get('SWEEP_STRATEGY', 'grid')
+app.config['SWEEP_STRIDE'] = int(os.environ.get('SWEEP_STRIDE', 3))
+# min_samples HDBSCAN tetap agar hierarki dihitung sekali per sweep (default 10;
+# kosong = ikut min_cluster_size seperti clustering sebelumnya, MST per kandidat)
+_min_samples_env = os.environ.get('SWEEP_MIN_SAMPLES', str(DEFAULT_MIN_SAMPLES))
+app.config['SWEEP_MIN_SAMPLES'] = int(_min_samples_env) if _min_samples_env else None
+
+# Job queue analisis (JOB_WORKERS analisis paralel, JOB_MAX_QUEUE job menunggu)
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 1))
+app.config['JOB_MAX_QUEUE'] = int(os.environ.get('JOB_MAX_QUEUE', 8))
+app.config['JOB_RESULT_TTL'] = int(os.environ.get('JOB_RESULT_TTL', 3600))
+job_queue = JobQueue(
+    max_workers=app.config['JOB_WORKERS'],
+    max_queue=app.config['JOB_MAX_QUEUE'],
+    result_ttl=app.config['JOB_RESULT_TTL']
+)
+
+# Cache data analisis per file: dibatasi ANALYSIS_CACHE_MAX_MB di memori, entry LRU atau yang
+# tidak diakses selama ANALYSIS_CACHE_TTL detik di-spill ke disk lalu dimuat ulang saat dipakai
+app.config['ANALYSIS_CACHE_MAX_MB'] = int(os.environ.get('ANALYSIS_CACHE_MAX_MB', 1024))
+app.config['ANALYSIS_CACHE_TTL'] = int(os.environ.get('ANALYSIS_CACHE_TTL', 6 * 3600))
+analysis_cache = AnalysisCache(
+    max_bytes=app.config['ANALYSIS_CACHE_MAX_MB'] * 1024 ** 2,
+    ttl=app.config['ANALYSIS_CACHE_TTL']
+)
+
+# Analisis inkremental: korpus yang pernah dianalisis dicatat per baris agar file yang
+# sebagian besar sama (INCREMENTAL_MIN_OVERLAP baris lama masih ada) bisa memakai hasil lama.
+# Refit penuh jika perubahan baris, kenaikan share outlier atau drift melewati batas.
+app.config['INCREMENTAL_MAX_CHANGE'] = float(os.environ.get('INCREMENTAL_MAX_CHANGE', 0.25))
+app.config['INCREMENTAL_MAX_OUTLIER_SHIFT'] = float(os.environ.get('INCREMENTAL_MAX_OUTLIER_SHIFT', 0.15))
+app.config['INCREMENTAL_MAX_DRIFT'] = float(os.environ.get('INCREMENTAL_MAX_DRIFT', 0.1))
+app.config['INCREMENTAL_MIN_OVERLAP'] = float(os.environ.get('INCREMENTAL_MIN_OVERLAP', 0.8))
+corpus_registry = CorpusRegistry()
+
+# Index ANN embedding per isi file (uploads/.ann) untuk /similar; dibangun setelah analisis BERTopic
+ann_store = AnnStore(UPLOAD_FOLDER)
+app.config['SIMILAR_MAX_K'] = int(os.environ.get('SIMILAR_MAX_K', 100))
+
+# Warm-up model di background saat start (WARMUP_MODELS=1)
+if os.environ.get('WARMUP_MODELS', '0') == '1':
+    threading.Thread(target=warm_up, name='model-warmup', daemon=True).start()
 
 @app.route('/')
 def index():
@@ -28,29 +124,117 @@ def index():
         best_params={})
 
 
+@app.route('/health')
+def health():
+    status = readiness()
+    return jsonify({"status": "ready" if status["ready"] else "loading", "models": status,
+                    "jobs": job_queue.stats(), "analysis_cache": analysis_cache.stats()}), \
+        200 if status["ready"] else 503
+
+
+def _submit_job(key, kind, fn, *args):
+    """Masukkan job ke antrian dan kembalikan response 202 berisi job id"""
+    try:
+        job, deduplicated = job_queue.submit(key, kind, fn, *args)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": deduplicated,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result"
+    }), 202
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+    if job.status == 'error':
+        return jsonify({'error': job.error, 'job_id': job.id}), 500
+    if not job.finished:
+        # Belum selesai: klien tetap polling
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result)
+
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """
+    Server-Sent Events progress job: event 'progress' untuk setiap tahap (termasuk
+    setiap pasangan min_cluster_size/coherence dari sweep), lalu 'done' atau 'failed'.
+    Header Last-Event-ID dipakai untuk melanjutkan stream setelah reconnect.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+
+    try:
+        seq = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        seq = 0
+
+    def stream(seq):
+        while True:
+            events, finished = job.wait_events(seq)
+            for event in events:
+                yield f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            seq += len(events)
+            if finished:
+                break
+            if not events:
+                # Komentar keep-alive agar proxy tidak menutup koneksi
+                yield ": keep-alive\n\n"
+
+    return Response(stream(seq), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/jobs/<job_id>/stop', methods=['POST'])
+def job_stop(job_id):
+    job = job_queue.stop(job_id)
+    if job is None:
+        return jsonify({'error': 'Job tidak ditemukan'}), 404
+    return jsonify(job.to_dict())
+
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
     file = request.files['file']
-    if file and file.filename.lower().endswith(('.csv', '.xlsx')):
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        if os.path.exists(filepath):
+    if file and file.filename.lower().endswith(UPLOAD_EXTENSIONS):
+        # Body sudah di-stream ke disk dan di-hash oleh UploadRequest
+        entry, status = upload_store.add(file.filename, file.stream)
+        print(f"Upload '{file.filename}': {status} ({entry['hash'][:12]}, {entry['size']} byte)")
+        if status == 'duplicate':
             return 'DUPLICATE'
-        file.save(filepath)
         return 'OK'
     return 'Format salah'
 
 
+@app.errorhandler(413)
+def upload_too_large(e):
+    return 'TOO_LARGE', 413
+
+
 @app.route('/files')
 def list_files():
     files = []
-    for fname in os.listdir(app.config['UPLOAD_FOLDER']):
-        fpath = os.path.join(app.config['UPLOAD_FOLDER'], fname)
-        if os.path.isfile(fpath):
-            files.append({
-                'name': fname,
-                'size': os.path.getsize(fpath),
-                'status': 'success' if fname.lower().endswith(('.csv', '.xlsx')) else 'fail'
-            })
+    for entry in upload_store.list():
+        files.append({
+            'name': entry['name'],
+            'size': entry['size'],
+            'status': 'success'
+        })
     return jsonify(files)
 
 
@@ -61,23 +245,191 @@ def delete_file():
         if not file_name:
             return "No filename provided", 400
 
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_name)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            # Hapus dari cache juga
-            analysis_cache.pop(file_name, None)
-            return "OK"
-        else:
+        entry, orphan = upload_store.remove(file_name)
+        if entry is None:
             return "File not found", 404
+        if orphan:
+            # Tidak ada alias lain untuk isi ini: hapus dari cache dan artefak preprocessing juga
+            analysis_cache.discard(entry["hash"])
+            corpus_store.remove(entry["hash"])
+            ann_store.remove(entry["hash"])
+            _korpus_similar.cache_clear()
+        return "OK"
     except Exception as e:
         return f"Error: {str(e)}", 500
 
 
+def _cari_basis(content_hash, metode, keys, base_hash=None):
+    """
+    Data analisis sebelumnya yang dipakai sebagai basis analisis inkremental.
+
+    Basis adalah base_hash jika diberikan, selain itu korpus terdaftar dengan
+    overlap baris terbesar. Entry analysis_cache harus berasal dari metode yang
+    sama (cache per isi file dipakai bergantian oleh BERTopic dan keyword).
+    """
+    if base_hash is None:
+        base_hash = corpus_registry.cari_basis(content_hash, metode, keys,
+                                               app.config['INCREMENTAL_MIN_OVERLAP'])
+    if base_hash is None:
+        return None, None
+    base = analysis_cache.get(base_hash)
+    if base is None:
+        return None, None
+    if metode == 'bertopic':
+        cocok = "topic_assignments" in base
+    else:
+        # Hasil keyword dan embedding sama-sama berupa hasil_df; bedakan lewat metode
+        cocok = "hasil_df" in base and base.get("metode", 'keyword') == metode
+    return (base_hash, base) if cocok else (None, None)
+
+
+def _kesepakatan_fuzzy(content_hash, df, hasil):
+    """
+    Laporan kesepakatan hasil embedding matching terhadap keyword matching (fuzzy).
+
+    Jika hasil keyword matching isi file yang sama ada di analysis_cache, semua
+    dokumen dibandingkan; selain itu keyword matching dijalankan pada sampel
+    ACM_AGREEMENT_SAMPLE dokumen.
+    """
+    cache = analysis_cache.get(content_hash)
+    if cache is not None and cache.get("metode") == 'keyword' and len(cache["hasil_df"]) == len(hasil):
+        laporan = laporan_kesepakatan(cache["hasil_df"]['Bidang_Ilmu_ACM'].tolist(),
+                                      hasil['Bidang_Ilmu_ACM'].tolist())
+        laporan["sumber"] = "cache"
+        return laporan
+
+    n_sampel = min(app.config['ACM_AGREEMENT_SAMPLE'], len(df))
+    if n_sampel <= 0:
+        return None
+    posisi = np.sort(np.random.default_rng(0).choice(len(df), n_sampel, replace=False))
+    fuzzy = keyword_matching(
+        df.iloc[posisi],
+        n_workers=app.config['KEYWORD_MATCH_WORKERS'],
+        shard_size=app.config['KEYWORD_MATCH_SHARD_SIZE'],
+        preprocessed=True
+    )
+    laporan = laporan_kesepakatan(fuzzy['Bidang_Ilmu_ACM'].tolist(),
+                                  hasil['Bidang_Ilmu_ACM'].iloc[posisi].tolist())
+    laporan["sumber"] = "sampel"
+    return laporan
+
+
+def _jalankan_analisis(job, content_hash, filepath, metode, incremental=False, base_hash=None):
+    """Pipeline /analyze yang dijalankan di job queue"""
+    print(f"Processing file: {filepath}")
+
+    # Load dan preprocessing (sekali per isi file, selanjutnya dari artefak)
+    job.report("preprocessing")
+    df, _ = corpus_store.load(content_hash, filepath, read_upload)
+    keys = kunci_korpus(df)
+
+    base = None
+    if incremental:
+        base_hash, base = _cari_basis(content_hash, metode, keys, base_hash)
+        if base is None:
+            print("Tidak ada analisis sebelumnya yang cocok, analisis penuh")
+        else:
+            print(f"Analisis inkremental dari {base_hash[:12]}")
+
+    if metode == 'bertopic':
+        print("Starting BERTopic analysis...")
+        hasil = bertopic_analysis(
+            df,
+            sweep_workers=app.config['SWEEP_WORKERS'],
+            sweep_strategy=app.config['SWEEP_STRATEGY'],
+            sweep_stride=app.config['SWEEP_STRIDE'],
+            min_samples=app.config['SWEEP_MIN_SAMPLES'],
+            progress=job.report,
+            stop_event=job.stop_event,
+            preprocessed=True,
+            tokenize_workers=app.config['TOKENIZE_WORKERS'],
+            base=base,
+            max_change=app.config['INCREMENTAL_MAX_CHANGE'],
+            max_outlier_shift=app.config['INCREMENTAL_MAX_OUTLIER_SHIFT'],
+            max_drift=app.config['INCREMENTAL_MAX_DRIFT']
+        )
+
+        print(f"Analysis result keys: {list(hasil.keys()) if isinstance(hasil, dict) else 'Not a dict'}")
+
+        if 'error' in hasil:
+            print(f"Analysis error: {hasil['error']}")
+            raise RuntimeError(hasil['error'])
+
+        # Simpan cache untuk generate topics nanti
+        if 'cache_data' in hasil:
+            analysis_cache[content_hash] = hasil['cache_data']
+
+            # Index /similar; korpus sebelumnya yang mirip dipakai sebagai basis index
+            job.report("indexing")
+            index_base = corpus_registry.cari_basis(content_hash, metode, keys,
+                                                    app.config['INCREMENTAL_MIN_OVERLAP'])
+            ann_store.build(content_hash, hasil['cache_data']['embeddings'], keys, base_hash=index_base)
+
+            corpus_registry.daftar(content_hash, metode, keys)
+            print(f"Cache saved for {content_hash[:12]}")
+
+        # Ambil min_cluster_range yang sudah dievaluasi untuk dropdown
+        cluster_options = hasil.get('cluster_options', [])
+
+        return {
+            "plot_html": hasil["plot_html"],
+            "best_params": hasil["best_params"],
+            "cluster_options": cluster_options,  # Kirim opsi cluster ke frontend
+            "stopped_early": hasil.get("stopped_early", False),
+            "incremental": hasil.get("incremental")
+        }
+
+    print("Starting Match analysis...")
+    job.report("matching")
+    kesepakatan = None
+    if metode == 'embedding':
+        hasil = embedding_matching(
+            df,
+            preprocessed=True,
+            base_df=base["hasil_df"] if base is not None else None,
+            progress=job.report
+        )
+        job.report("agreement")
+        kesepakatan = _kesepakatan_fuzzy(content_hash, df, hasil)
+    else:
+        hasil = keyword_matching(
+            df,
+            n_workers=app.config['KEYWORD_MATCH_WORKERS'],
+            shard_size=app.config['KEYWORD_MATCH_SHARD_SIZE'],
+            preprocessed=True,
+            base_df=base["hasil_df"] if base is not None else None
+        )
+
+    # Grouping Groq tidak ditunggu di sini: frontend memintanya lewat
+    # /generate_groups setelah chart tampil (hasilnya di-cache per n_groups)
+
+    # Hitung Top 10 bidang ilmu
+    job.report("chart")
+    img_base64 = get_top10_chart_df(hasil)
+
+    # Store hasil untuk generate_groups endpoint
+    analysis_cache[content_hash] = {
+        "hasil_df": hasil,
+        "top_fields": hasil['Bidang_Ilmu_ACM'].tolist() if 'Bidang_Ilmu_ACM' in hasil.columns else [],
+        "metode": metode
+    }
+    corpus_registry.daftar(content_hash, metode, keys)
+
+    return {
+        "chart": img_base64,
+        "incremental": {"dipakai": base is not None} if incremental else None,
+        "agreement": kesepakatan
+    }
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     try:
         filename = request.form.get('filename')
         metode = request.form.get('metode')
+        # incremental=1: pakai hasil analisis file ini atau file serupa (base_filename) sebelumnya
+        incremental = request.form.get('incremental', '').lower() in ('1', 'true', 'on')
+        base_filename = request.form.get('base_filename')
         
         print(f"=== ANALYZE REQUEST ===")
         print(f"Filename: {filename}")
@@ -87,72 +439,118 @@ def analyze():
             return jsonify({'error': 'Filename tidak ditemukan'}), 400
         if not metode:
             return jsonify({'error': 'Metode tidak ditemukan'}), 400
+        if metode not in ('bertopic', 'keyword', 'embedding'):
+            return jsonify({'error': 'Metode tidak dikenali'}), 400
             
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if not os.path.exists(filepath):
+        entry = upload_store.get(filename)
+        if entry is None or not os.path.exists(upload_store.path(entry)):
             return jsonify({'error': 'File tidak ditemukan'}), 404
 
-        print(f"Processing file: {filepath}")
+        base_hash = None
+        if incremental and base_filename:
+            base_hash = _hash_upload(base_filename)
+            if base_hash is None:
+                return jsonify({'error': 'File basis tidak ditemukan'}), 400
 
-        # Load dan preprocessing
-        df = pd.read_csv(filepath)
-        df = preprocess_dataframe(df)
+        # Request identik (isi file yang sama, apa pun namanya) yang masih berjalan tidak diulang
+        key = ('analyze', entry["hash"], metode, incremental, base_hash)
+        return _submit_job(key, 'analyze', _jalankan_analisis, entry["hash"], upload_store.path(entry), metode,
+                           incremental, base_hash)
 
-        if metode == 'bertopic':
-            print("Starting BERTopic analysis...")
-            hasil = bertopic_analysis(df)
-            
-            print(f"Analysis result keys: {list(hasil.keys()) if isinstance(hasil, dict) else 'Not a dict'}")
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
 
-            if 'error' in hasil:
-                print(f"Analysis error: {hasil['error']}")
-                return jsonify({'error': hasil['error']}), 500
 
-            # Simpan cache untuk generate topics nanti
-            if 'cache_data' in hasil:
-                analysis_cache[filename] = hasil['cache_data']
-                print(f"Cache saved for {filename}")
+@lru_cache(maxsize=4)
+def _korpus_similar(content_hash, filepath):
+    """Title dan Abstract korpus (dari artefak preprocessing) untuk hasil /similar"""
+    df, _ = corpus_store.load(content_hash, filepath, read_upload)
+    return df['Title'].astype(str).tolist(), df['Abstract'].astype(str).tolist()
 
-            # Ambil min_cluster_range yang sudah dievaluasi untuk dropdown
-            cluster_options = hasil.get('cluster_options', [])
-            
-            response_data = {
-                "plot_html": hasil["plot_html"],
-                "best_params": hasil["best_params"],
-                "cluster_options": cluster_options  # Kirim opsi cluster ke frontend
-            }
-            
-            print("Sending response to client")
-            return jsonify(response_data)
 
-        elif metode == 'keyword':
-            print("Starting Match analysis...")
-            hasil = keyword_matching(df)
-            
-            # Perbaikan: pass DataFrame lengkap, bukan hanya kolom
-            grouped_result = group_fields_with_groq(hasil, 5)  # Default 5 groups
+@app.route('/similar', methods=['POST'])
+def similar():
+    """
+    Paper paling mirip dalam satu korpus, lewat index ANN embedding.
 
-            # Hitung Top 10 bidang ilmu
-            img_base64 = get_top10_chart_df(hasil)
-            
-            # Store hasil untuk generate_groups endpoint
-            analysis_cache[filename] = {
-                "hasil_df": hasil,
-                "top_fields": hasil['Bidang_Ilmu_ACM'].tolist() if 'Bidang_Ilmu_ACM' in hasil.columns else []
-            }
+    Body JSON: filename, lalu query (teks bebas) atau doc_id (nomor baris korpus
+    hasil preprocessing), dan k (default 10). Index dibangun saat analisis BERTopic.
+    """
+    data = request.get_json(silent=True) or {}
+    filename = data.get("filename")
+    query = data.get("query")
+    doc_id = data.get("doc_id")
+
+    entry = upload_store.get(filename) if filename else None
+    if entry is None:
+        return jsonify({"error": "File tidak ditemukan"}), 404
+    if not query and doc_id is None:
+        return jsonify({"error": "query atau doc_id harus diisi"}), 400
+    try:
+        k = min(max(1, int(data.get("k", 10))), app.config['SIMILAR_MAX_K'])
+        doc_id = None if doc_id is None else int(doc_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "k dan doc_id harus berupa angka"}), 400
+
+    index = ann_store.get(entry["hash"])
+    if index is None:
+        return jsonify({"error": "Index belum tersedia. Silakan jalankan analisis BERTopic terlebih dahulu."}), 400
+
+    mulai = time.perf_counter()
+    if doc_id is not None:
+        if not 0 <= doc_id < len(index):
+            return jsonify({"error": f"doc_id harus di antara 0 dan {len(index) - 1}"}), 400
+        vector = index.vector(doc_id)
+    else:
+        vector = get_embedding_model().encode([clean_abstract(query)], show_progress_bar=False)[0]
+    ids, scores = index.search(vector, k=k, exclude=doc_id)
+
+    titles, abstracts = _korpus_similar(entry["hash"], upload_store.path(entry))
+    return jsonify({
+        "results": [
+            {"doc_id": int(i), "score": round(float(score), 4), "title": titles[i], "abstract": abstracts[i]}
+            for i, score in zip(ids, scores)
+        ],
+        "took_ms": round((time.perf_counter() - mulai) * 1000, 2)
+    })
+
+
+def _jalankan_generate_topics(job, content_hash, min_cluster_size):
+    """Pipeline /generate_topics yang dijalankan di job queue"""
+    # Label dari fit baru ditambahkan ke topic_assignments entry cache, jadi entry
+    # di-pin agar tidak di-spill selama fit berjalan
+    with analysis_cache.pinned(content_hash) as cache:
+        if cache is None:
+            raise RuntimeError("Data analisis tidak ditemukan. Silakan jalankan analisis BERTopic terlebih dahulu.")
+        print(f"Using cached data for {content_hash[:12]}")
 
-            return jsonify({
-                "chart": img_base64,
-                "grouped": grouped_result
-            })
+        # Panggil fungsi generate topics dengan data yang sudah di-cache
+        result = generate_topics_with_label(
+            docs=cache["docs"],
+            embeddings=cache["embeddings"],
+            min_cluster_size=min_cluster_size,
+            reduced_embeddings=cache.get("reduced_embeddings"),
+            fitted_umap=cache.get("fitted_umap"),
+            min_samples=cache.get("min_samples"),
+            topic_assignments=cache.get("topic_assignments"),
+            progress=job.report
+        )
 
-        else:
-            return jsonify({'error': 'Metode tidak dikenali'}), 400
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(result["error"])
 
-    except Exception as e:
-        import traceback
-        print(traceback.format_exc())
-        return jsonify({'error': str(e)}), 500
+    topic_model, topic_info = result
+
+    # Filter topik yang valid (bukan outlier)
+    valid_topics = topic_info[topic_info["Topic"] != -1][["Topic", "Name", "Count"]]
+    valid_topics = valid_topics.rename(columns={"Topic": "topic", "Name": "label", "Count": "count"})
+
+    return {
+        "topic_count": len(valid_topics),
+        "topics": valid_topics.to_dict(orient="records")
+    }
 
 
 @app.route("/generate_topics", methods=["POST"])
@@ -164,44 +562,12 @@ def generate_topics():
 
     print(f"Generate topics request - File: {filename}, Min cluster: {min_cluster_size}")
 
-    if not filename or filename not in analysis_cache:
+    content_hash = _hash_upload(filename)
+    if not content_hash or content_hash not in analysis_cache:
         return jsonify({"error": "Data analisis tidak ditemukan. Silakan jalankan analisis BERTopic terlebih dahulu."}), 400
 
-    try:
-        cache = analysis_cache[filename]
-        print(f"Using cached data for {filename}")
-        
-        # Panggil fungsi generate topics dengan data yang sudah di-cache
-        result = generate_topics_with_label(
-            docs=cache["docs"],
-            embeddings=cache["embeddings"],
-            embedding_model=cache["embedding_model"],
-            umap_model=cache["umap_model"],
-            vectorizer_model=cache["vectorizer_model"],
-            ctfidf_model=cache["ctfidf_model"],
-            representation_model=cache["representation_model"],
-            min_cluster_size=min_cluster_size
-        )
-
-        if isinstance(result, dict) and "error" in result:
-            return jsonify(result), 500
-
-        topic_model, topic_info = result
-        
-        # Filter topik yang valid (bukan outlier)
-        valid_topics = topic_info[topic_info["Topic"] != -1][["Topic", "Name", "Count"]]
-        valid_topics = valid_topics.rename(columns={"Topic": "topic", "Name": "label", "Count": "count"})
-        
-        return jsonify({
-            "topic_count": len(valid_topics),
-            "topics": valid_topics.to_dict(orient="records")
-        })
-
-    except Exception as e:
-        import traceback
-        print("Generate topics error:")
-        print(traceback.format_exc())
-        return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
+    key = ('generate_topics', content_hash, min_cluster_size)
+    return _submit_job(key, 'generate_topics', _jalankan_generate_topics, content_hash, min_cluster_size)
 
 @app.route("/generate_groups", methods=["POST"])
 def generate_groups():
@@ -209,14 +575,15 @@ def generate_groups():
     filename = data.get("filename")
     num_groups = int(data.get("num_groups", 5))
     
-    if not filename or filename not in analysis_cache:
+    content_hash = _hash_upload(filename)
+    if not content_hash or content_hash not in analysis_cache:
         return jsonify({
             "error": "Data analisis tidak ditemukan. Silakan jalankan keyword matching terlebih dahulu."
         }), 400
     
     try:
         # Ambil hasil DataFrame dari cache
-        cache = analysis_cache[filename]
+        cache = analysis_cache[content_hash]
         hasil_df = cache.get("hasil_df")
         
         if hasil_df is None:
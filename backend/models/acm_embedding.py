@@ -0,0 +1,219 @@
+"""
+Embedding matching untuk Research Intelligence
+Klasifikasi bidang ilmu ACM lewat cosine similarity embedding dokumen terhadap embedding topik dan keyword ACM
+"""
+
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+
+import numpy as np
+
+from .embedding_store import encode_with_cache
+from .model_match import get_keyword_matcher, match_dengan_basis
+from .model_registry import get_embedding_model, EMBEDDING_MODEL_NAME
+from .preprocessing import preprocess_dataframe, combine_title_abstract
+
+# Naikkan jika teks label atau format matriks berubah supaya matriks lama tidak dipakai
+ACM_LABEL_VERSION = 1
+
+LABEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'save_models', 'acm_embeddings'))
+
+# Jumlah dokumen per perkalian matriks dokumen x label
+CLASSIFY_CHUNK_SIZE = 4096
+
+
+def _normalisasi(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class AcmEmbeddingClassifier:
+    """
+    Classifier bidang ilmu ACM berbasis embedding.
+
+    Setiap topik diwakili beberapa label: nama topik dan semua keyword-nya,
+    di-encode sekali dengan model embedding yang sama dengan dokumen. Label
+    disimpan berurutan per topik (`label_offsets`) sebagai matriks ternormalisasi.
+    Skor dokumen untuk satu topik adalah cosine similarity tertinggi ke label
+    topik tersebut; topik dengan skor tertinggi dipilih.
+    """
+
+    def __init__(self, topik, label_matrix, label_offsets):
+        self.topik = list(topik)
+        # Disimpan float16 di disk, dihitung float32
+        self.label_matrix = np.asarray(label_matrix, dtype=np.float32)
+        self.label_offsets = np.asarray(label_offsets, dtype=np.int64)
+
+    @staticmethod
+    def teks_label(matcher):
+        """Teks label per topik (nama topik lalu keyword) beserta offset per topik"""
+        teks, offsets = [], [0]
+        for topik, keywords in matcher.iter_topik_keywords():
+            teks.append(str(topik).lower())
+            teks.extend(keywords)
+            offsets.append(len(teks))
+        return teks, offsets
+
+    @classmethod
+    def from_matcher(cls, matcher, embedding_model, model_name=EMBEDDING_MODEL_NAME, label_dir=LABEL_DIR):
+        """
+        Classifier dari taksonomi KeywordMatcher.
+
+        Matriks label disimpan di label_dir sebagai .npz float16 dengan nama dari
+        sha1 teks label, sehingga hanya di-encode ulang jika dataset atau model berubah.
+        """
+        teks, offsets = cls.teks_label(matcher)
+        sidik = hashlib.sha1("\x00".join([model_name, str(ACM_LABEL_VERSION)] + teks).encode('utf-8')).hexdigest()
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        path = os.path.join(label_dir, f"{slug}_{sidik[:16]}.npz")
+
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return cls(matcher.topik, data["label_matrix"], data["label_offsets"])
+
+        print(f"Encode {len(teks)} label ACM ({len(matcher.topik)} topik)...")
+        matrix = _normalisasi(embedding_model.encode(teks, batch_size=64, show_progress_bar=False))
+        os.makedirs(label_dir, exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+        try:
+            np.savez(tmp, label_matrix=matrix.astype(np.float16), label_offsets=np.asarray(offsets, dtype=np.int64))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return cls(matcher.topik, matrix, offsets)
+
+    def skor(self, embeddings, chunk_size=CLASSIFY_CHUNK_SIZE):
+        """
+        Topik terbaik dan skornya untuk setiap embedding dokumen.
+
+        Returns:
+            tuple: (indeks topik int32, cosine similarity float32)
+        """
+        n_docs = len(embeddings)
+        topik_id = np.empty(n_docs, dtype=np.int32)
+        skor = np.empty(n_docs, dtype=np.float32)
+        for mulai in range(0, n_docs, chunk_size):
+            sim = _normalisasi(embeddings[mulai:mulai + chunk_size]) @ self.label_matrix.T
+            # Maksimum per topik: label satu topik bersebelahan di kolom
+            per_topik = np.maximum.reduceat(sim, self.label_offsets[:-1], axis=1)
+            terbaik = per_topik.argmax(axis=1)
+            topik_id[mulai:mulai + chunk_size] = terbaik
+            skor[mulai:mulai + chunk_size] = per_topik[np.arange(len(terbaik)), terbaik]
+        return topik_id, skor
+
+    def klasifikasi(self, embeddings, chunk_size=CLASSIFY_CHUNK_SIZE):
+        """Nama topik ACM per embedding dokumen"""
+        topik_id, _ = self.skor(embeddings, chunk_size=chunk_size)
+        return [self.topik[i] for i in topik_id]
+
+
+_classifier_lock = threading.Lock()
+_classifier_cache = {"matcher": None, "classifier": None}
+
+
+def get_acm_classifier():
+    """
+    AcmEmbeddingClassifier yang di-cache per proses; dibangun ulang jika
+    taksonomi keyword (get_keyword_matcher) dimuat ulang.
+    """
+    matcher = get_keyword_matcher()
+    with _classifier_lock:
+        cache = _classifier_cache
+        if cache["classifier"] is None or cache["matcher"] is not matcher:
+            cache["classifier"] = AcmEmbeddingClassifier.from_matcher(matcher, get_embedding_model())
+            cache["matcher"] = matcher
+        return cache["classifier"]
+
+
+def embedding_matching(df, preprocessed=False, base_df=None, batch_size=64, progress=None):
+    """
+    Klasifikasi bidang ilmu ACM per dokumen dengan embedding, dan kembalikan DataFrame hasil
+
+    Embedding dokumen diambil lewat embedding store (dokumen yang sudah pernah
+    di-encode, misalnya saat analisis BERTopic, tidak di-encode ulang).
+
+    Args:
+        df: pandas DataFrame dengan kolom Title dan Abstract
+        preprocessed: True jika df sudah melewati preprocess_dataframe
+        base_df: Hasil matching embedding sebelumnya untuk korpus yang mirip;
+            hanya baris baru yang diklasifikasi
+        batch_size: Batch size encode
+        progress: Callback progress untuk job queue
+
+    Returns:
+        pandas DataFrame: df dengan kolom Bidang_Ilmu_ACM
+    """
+    df_processed = df.copy() if preprocessed else preprocess_dataframe(df)
+    docs = combine_title_abstract(df_processed)
+    classifier = get_acm_classifier()
+
+    def klasifikasi(teks):
+        embeddings = encode_with_cache(
+            get_embedding_model(),
+            EMBEDDING_MODEL_NAME,
+            teks,
+            batch_size=batch_size,
+            dtype=os.environ.get('EMBEDDING_CACHE_DTYPE', 'float32'),
+            progress=progress
+        )
+        return classifier.klasifikasi(embeddings)
+
+    df_processed['Bidang_Ilmu_ACM'] = match_dengan_basis(docs, klasifikasi, base_df)
+    return df_processed
+
+
+def laporan_kesepakatan(hasil_fuzzy, hasil_embedding, top_n=10):
+    """
+    Laporan kesepakatan engine embedding terhadap engine fuzzy (keyword_matching).
+
+    Args:
+        hasil_fuzzy: Bidang_Ilmu_ACM dari keyword_matching
+        hasil_embedding: Bidang_Ilmu_ACM dari embedding_matching untuk dokumen yang sama
+        top_n: Jumlah bidang dan pasangan ketidaksepakatan yang dilaporkan
+
+    Returns:
+        dict: n_dokumen, agreement (proporsi label sama), kappa (Cohen),
+            per_bidang (agreement untuk bidang terbanyak hasil embedding) dan
+            beda_terbanyak (pasangan fuzzy -> embedding yang paling sering berbeda)
+    """
+    pasangan = [
+        (a, b) for a, b in zip(hasil_fuzzy, hasil_embedding)
+        if isinstance(a, str) and isinstance(b, str)
+    ]
+    n = len(pasangan)
+    if n == 0:
+        return {"n_dokumen": 0, "agreement": None, "kappa": None, "per_bidang": [], "beda_terbanyak": []}
+
+    sama = sum(a == b for a, b in pasangan)
+    agreement = sama / n
+    frek_fuzzy = Counter(a for a, _ in pasangan)
+    frek_embedding = Counter(b for _, b in pasangan)
+    # Kesepakatan yang diharapkan jika kedua engine memilih bidang secara independen
+    peluang = sum(frek_fuzzy[k] * frek_embedding[k] for k in frek_fuzzy) / (n * n)
+    kappa = (agreement - peluang) / (1 - peluang) if peluang < 1 else 1.0
+
+    sama_per_bidang = Counter(b for a, b in pasangan if a == b)
+    per_bidang = [
+        {
+            "bidang": bidang,
+            "n_embedding": jumlah,
+            "n_fuzzy": frek_fuzzy.get(bidang, 0),
+            "agreement": round(sama_per_bidang.get(bidang, 0) / jumlah, 4),
+        }
+        for bidang, jumlah in frek_embedding.most_common(top_n)
+    ]
+    beda = Counter((a, b) for a, b in pasangan if a != b)
+    return {
+        "n_dokumen": n,
+        "agreement": round(agreement, 4),
+        "kappa": round(kappa, 4),
+        "per_bidang": per_bidang,
+        "beda_terbanyak": [
+            {"fuzzy": a, "embedding": b, "jumlah": jumlah} for (a, b), jumlah in beda.most_common(top_n)
+        ],
+    }
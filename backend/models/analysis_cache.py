@@ -0,0 +1,302 @@
+"""
+Analysis cache untuk Research Intelligence
+Cache hasil analisis per file dengan batas memori, eviction LRU/TTL dan spill ke disk
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sps
+
+SPILL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'save_models', 'analysis_cache'))
+
+
+def ukuran_objek(obj, _depth=0):
+    """
+    Perkiraan ukuran memori (byte) isi cache.
+
+    Array NumPy/sparse dan DataFrame dihitung tepat; list/dict dijumlahkan per
+    elemen; objek lain (misalnya UMAP yang sudah di-fit) dihitung dari atributnya
+    sampai kedalaman 3 karena ukurannya didominasi array di dalamnya.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if sps.issparse(obj):
+        return sum(getattr(obj, a).nbytes for a in ('data', 'indices', 'indptr', 'row', 'col') if hasattr(obj, a))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=True).sum()) if isinstance(obj, pd.DataFrame) \
+            else int(obj.memory_usage(deep=True))
+    if isinstance(obj, (str, bytes)):
+        return sys.getsizeof(obj)
+    if _depth >= 3:
+        return sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v, _depth + 1) for v in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v, _depth + 1) for v in obj.values())
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + sum(ukuran_objek(v, _depth + 1) for v in vars(obj).values())
+    return sys.getsizeof(obj)
+
+
+def _pid_hidup(pid):
+    """True jika proses dengan pid masih berjalan (atau tidak bisa dipastikan)"""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def bersihkan_spill_lama(spill_dir=SPILL_DIR):
+    """
+    Hapus direktori spill milik proses yang sudah berhenti.
+
+    Index entry hanya ada di memori proses pemiliknya, sehingga file spill
+    proses yang restart atau di-recycle tidak pernah dimuat lagi.
+
+    Returns:
+        int: Jumlah direktori yang dihapus
+    """
+    if not os.path.isdir(spill_dir):
+        return 0
+    dihapus = 0
+    for nama in os.listdir(spill_dir):
+        if not nama.isdigit():
+            continue
+        pid = int(nama)
+        if pid == os.getpid() or not _pid_hidup(pid):
+            shutil.rmtree(os.path.join(spill_dir, nama), ignore_errors=True)
+            dihapus += 1
+    return dihapus
+
+
+def _is_list_teks(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+class AnalysisCache:
+    """
+    Pengganti dict analysis_cache dengan batas memori.
+
+    Setiap entry (dict data satu file) dihitung ukurannya. Jika total melebihi
+    max_bytes, entry yang paling lama tidak dipakai di-spill ke disk; entry yang
+    tidak diakses selama ttl detik juga di-spill. Spill menyimpan array sebagai
+    .npy, list teks (docs) sebagai JSON lines gzip, DataFrame sebagai pickle dan
+    sisanya lewat joblib. Akses berikutnya (get/[]/in) memuat entry kembali
+    secara transparan.
+
+    Entry yang datanya diubah di tempat harus dipakai lewat pinned(): selama
+    itu entry tidak di-spill, sehingga perubahannya tidak hilang bersama dict
+    yang sudah dilepas dari cache.
+    """
+
+    def __init__(self, max_bytes=1024 * 1024 ** 2, ttl=6 * 3600, spill_dir=SPILL_DIR):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Direktori per proses: beberapa worker server tidak saling menimpa spill
+        self.spill_dir = os.path.join(spill_dir, str(os.getpid()))
+        self._lock = threading.RLock()
+        # key -> {"data": dict atau None jika di disk, "nbytes", "last_access",
+        #         "pins": jumlah pemakai pinned() yang sedang berjalan}
+        self._entries = OrderedDict()
+        # Spill proses yang sudah berhenti (termasuk proses lama dengan pid yang sama)
+        # tidak punya index lagi
+        dihapus = bersihkan_spill_lama(spill_dir)
+        if dihapus:
+            print(f"Analysis cache: {dihapus} direktori spill proses lama dihapus")
+
+    # ----- penyimpanan disk -----
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, hashlib.sha1(str(key).encode('utf-8')).hexdigest())
+
+    def _spill(self, key, entry):
+        """Tulis entry ke disk dan lepaskan datanya dari memori (dipanggil dengan lock)"""
+        path = self._spill_path(key)
+        tmp_path = path + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        manifest, lainnya = {}, {}
+        for name, value in entry["data"].items():
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), value)
+                manifest[name] = "npy"
+            elif _is_list_teks(value):
+                with gzip.open(os.path.join(tmp_path, f"{name}.jsonl.gz"), 'wt', encoding='utf-8') as f:
+                    for teks in value:
+                        f.write(json.dumps(teks, ensure_ascii=False))
+                        f.write("\n")
+                manifest[name] = "text"
+            elif isinstance(value, pd.DataFrame):
+                value.to_pickle(os.path.join(tmp_path, f"{name}.pkl"))
+                manifest[name] = "dataframe"
+            else:
+                lainnya[name] = value
+                manifest[name] = "joblib"
+        if lainnya:
+            joblib.dump(lainnya, os.path.join(tmp_path, "lainnya.joblib"))
+        with open(os.path.join(tmp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        entry["data"] = None
+        print(f"Analysis cache: '{key}' di-spill ke disk ({entry['nbytes'] / 1024 ** 2:.1f} MB)")
+
+    def _restore(self, key, entry):
+        """Muat entry yang di-spill kembali ke memori (dipanggil dengan lock)"""
+        path = self._spill_path(key)
+        with open(os.path.join(path, "manifest.json"), encoding='utf-8') as f:
+            manifest = json.load(f)
+        lainnya = {}
+        if "joblib" in manifest.values():
+            lainnya = joblib.load(os.path.join(path, "lainnya.joblib"))
+
+        data = {}
+        for name, jenis in manifest.items():
+            if jenis == "npy":
+                data[name] = np.load(os.path.join(path, f"{name}.npy"))
+            elif jenis == "text":
+                with gzip.open(os.path.join(path, f"{name}.jsonl.gz"), 'rt', encoding='utf-8') as f:
+                    data[name] = [json.loads(line) for line in f]
+            elif jenis == "dataframe":
+                data[name] = pd.read_pickle(os.path.join(path, f"{name}.pkl"))
+            else:
+                data[name] = lainnya[name]
+        entry["data"] = data
+        print(f"Analysis cache: '{key}' dimuat kembali dari disk")
+
+    # ----- eviction -----
+
+    def _bytes_memori(self):
+        return sum(e["nbytes"] for e in self._entries.values() if e["data"] is not None)
+
+    def _evict(self, keep=None):
+        """Spill entry kadaluarsa (TTL) lalu entry LRU sampai di bawah max_bytes"""
+        sekarang = time.time()
+        for key, entry in self._entries.items():
+            if key == keep or entry["data"] is None or entry["pins"]:
+                continue
+            if sekarang - entry["last_access"] > self.ttl:
+                self._spill(key, entry)
+
+        total = self._bytes_memori()
+        for key, entry in self._entries.items():
+            if total <= self.max_bytes:
+                break
+            if key == keep or entry["data"] is None or entry["pins"]:
+                continue
+            self._spill(key, entry)
+            total -= entry["nbytes"]
+
+    # ----- antarmuka dict -----
+
+    def __setitem__(self, key, data):
+        with self._lock:
+            self._hapus(key)
+            self._entries[key] = {
+                "data": data,
+                "nbytes": ukuran_objek(data),
+                "last_access": time.time(),
+                "pins": 0
+            }
+            self._evict(keep=key)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key):
+        with self._lock:
+            entry = self._entries[key]
+            if entry["data"] is None:
+                self._restore(key, entry)
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(key)
+            self._evict(keep=key)
+            return entry["data"]
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self[key]
+
+    @contextmanager
+    def pinned(self, key):
+        """
+        Data entry yang tidak di-spill selama blok with berjalan.
+
+        Dipakai jika data entry diubah di tempat (misalnya label hasil fit baru
+        ditambahkan): tanpa pin, entry bisa di-spill di tengah jalan dan
+        perubahan setelahnya hanya masuk ke dict yang sudah tidak dipegang
+        cache. Ukuran entry dihitung ulang saat blok selesai.
+
+        Yields:
+            dict data entry, atau None jika key tidak ada
+        """
+        with self._lock:
+            if key not in self._entries:
+                entry = data = None
+            else:
+                data = self[key]
+                entry = self._entries[key]
+                entry["pins"] += 1
+        try:
+            yield data
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry["pins"] -= 1
+                    # Entry yang diganti atau dihapus selama blok berjalan tidak dihitung lagi
+                    if self._entries.get(key) is entry:
+                        entry["nbytes"] = ukuran_objek(data)
+                        self._evict(keep=key)
+
+    def _hapus(self, key):
+        if self._entries.pop(key, None) is not None:
+            shutil.rmtree(self._spill_path(key), ignore_errors=True)
+
+    def discard(self, key):
+        """Hapus entry (juga file spill-nya) tanpa memuatnya kembali dari disk"""
+        with self._lock:
+            self._hapus(key)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            data = self[key]
+            self._hapus(key)
+            return data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Ringkasan pemakaian cache untuk /health"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "in_memory": sum(1 for e in self._entries.values() if e["data"] is not None),
+                "memory_bytes": self._bytes_memori(),
+                "max_bytes": self.max_bytes
+            }
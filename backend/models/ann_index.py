@@ -0,0 +1,309 @@
+"""
+ANN index untuk Research Intelligence
+Index inverted-file (IVF) atas embedding dokumen per korpus untuk pencarian paper serupa
+"""
+
+import json
+import math
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.cluster import KMeans
+
+from .incremental import hitung_delta
+
+# Naikkan jika format file index berubah supaya index lama dibangun ulang
+ANN_VERSION = 1
+
+ANN_DIRNAME = '.ann'
+
+# Korpus di bawah batas ini dicari brute force (satu list, hasil eksak)
+ANN_MIN_DOCS_IVF = 4096
+
+# Jumlah list IVF = ANN_LISTS_PER_SQRT * sqrt(jumlah dokumen)
+ANN_LISTS_PER_SQRT = 2
+
+# Maksimal titik per list yang dipakai melatih k-means
+ANN_TRAIN_PER_LIST = 64
+
+# List yang di-scan per query (lebih besar = recall lebih tinggi, lebih lambat)
+ANN_N_PROBE = int(os.environ.get('ANN_N_PROBE', 24))
+
+_FILES = ('centroids', 'vectors', 'ids', 'offsets', 'keys')
+
+
+def normalisasi(vectors):
+    """Vektor satuan float32 (cosine similarity = dot product)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norm = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norm, 1e-12)
+
+
+def _assign(vectors, centroids, batch=8192):
+    """List (centroid dengan dot product terbesar) untuk setiap vektor"""
+    lists = np.empty(len(vectors), dtype=np.int32)
+    for mulai in range(0, len(vectors), batch):
+        lists[mulai:mulai + batch] = (vectors[mulai:mulai + batch] @ centroids.T).argmax(axis=1)
+    return lists
+
+
+class IVFIndex:
+    """
+    Index cosine inverted-file untuk satu korpus.
+
+    Embedding dinormalisasi lalu dikelompokkan ke n_lists centroid k-means.
+    Vektor disimpan terurut per list (`vectors`, dengan `ids` = nomor baris
+    korpus dan `offsets` = batas list) sehingga satu list adalah satu potongan
+    memori kontigu. Query hanya men-scan n_probe list dengan centroid terdekat.
+    Korpus kecil memakai satu list (brute force). `keys` (kunci_dokumen per
+    baris korpus) dipakai untuk membangun index korpus turunan lewat dari_basis.
+    """
+
+    def __init__(self, centroids, vectors, ids, offsets, keys):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.keys = keys
+        # Posisi setiap baris korpus di `vectors`
+        self._posisi = np.empty(len(ids), dtype=np.int64)
+        self._posisi[np.asarray(ids)] = np.arange(len(ids))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def _dari_assignment(cls, centroids, vectors, lists, keys):
+        urutan = np.argsort(lists, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(lists, minlength=len(centroids)), out=offsets[1:])
+        return cls(centroids, vectors[urutan], urutan.astype(np.int64), offsets, keys)
+
+    @classmethod
+    def build(cls, embeddings, keys, n_lists=None, seed=0):
+        """
+        Bangun index baru (k-means dilatih dari sampel embedding).
+
+        Args:
+            embeddings: Matriks embedding per baris korpus
+            keys: kunci_dokumen per baris korpus
+            n_lists: Jumlah list IVF (None = otomatis dari jumlah dokumen)
+            seed: Seed sampling dan k-means
+        """
+        vectors = normalisasi(embeddings)
+        n_docs = len(vectors)
+        if n_lists is None:
+            n_lists = 1 if n_docs < ANN_MIN_DOCS_IVF else int(ANN_LISTS_PER_SQRT * math.sqrt(n_docs))
+
+        if n_lists <= 1:
+            centroids = normalisasi(vectors.mean(axis=0, keepdims=True)) if n_docs else \
+                np.zeros((1, vectors.shape[1]), dtype=np.float32)
+            lists = np.zeros(n_docs, dtype=np.int32)
+        else:
+            rng = np.random.default_rng(seed)
+            n_train = min(n_docs, n_lists * ANN_TRAIN_PER_LIST)
+            sampel = vectors[rng.choice(n_docs, n_train, replace=False)] if n_train < n_docs else vectors
+            kmeans = KMeans(n_clusters=n_lists, init='random', n_init=1, max_iter=20,
+                            random_state=seed).fit(sampel)
+            centroids = normalisasi(kmeans.cluster_centers_)
+            lists = _assign(vectors, centroids)
+        return cls._dari_assignment(centroids, vectors, lists, np.asarray(keys, dtype='S16'))
+
+    @classmethod
+    def dari_basis(cls, base, embeddings, keys, max_growth=2.0):
+        """
+        Index korpus turunan (baris lama + baris baru) dari index korpus sebelumnya.
+
+        Centroid dipakai ulang tanpa melatih k-means; baris lama mengikuti list
+        lamanya dan hanya baris baru yang di-assign. Jika korpus tumbuh lebih
+        dari max_growth kali (list terlalu panjang) atau index lama brute force
+        padahal korpus sudah cukup besar, index dibangun ulang.
+        """
+        keys = np.asarray(keys, dtype='S16')
+        n_lists_baru = 1 if len(keys) < ANN_MIN_DOCS_IVF else 2
+        if len(keys) > max_growth * max(len(base), 1) or base.n_lists < n_lists_baru:
+            return cls.build(embeddings, keys)
+
+        idx_lama, _, _ = hitung_delta(base.keys.tolist(), keys.tolist())
+        lama = idx_lama >= 0
+        vectors = normalisasi(embeddings)
+        list_basis = np.repeat(np.arange(base.n_lists, dtype=np.int32), np.diff(base.offsets))
+        lists = np.empty(len(keys), dtype=np.int32)
+        lists[lama] = list_basis[base._posisi[idx_lama[lama]]]
+        lists[~lama] = _assign(vectors[~lama], base.centroids)
+        return cls._dari_assignment(np.asarray(base.centroids), vectors, lists, keys)
+
+    def vector(self, row):
+        """Vektor ternormalisasi untuk baris korpus"""
+        return np.asarray(self.vectors[self._posisi[row]])
+
+    def search(self, query, k=10, n_probe=ANN_N_PROBE, exclude=None):
+        """
+        k dokumen dengan cosine similarity terbesar terhadap query.
+
+        Args:
+            query: Vektor embedding query
+            k: Jumlah hasil
+            n_probe: Jumlah list yang di-scan
+            exclude: Baris korpus yang tidak ikut hasil (misalnya dokumen query)
+
+        Returns:
+            tuple: (array baris korpus, array skor) terurut skor menurun
+        """
+        q = normalisasi(query).reshape(-1)
+        if self.n_lists == 1:
+            kandidat = np.asarray(self.vectors)
+            pos = None
+        else:
+            n_probe = min(max(1, n_probe), self.n_lists)
+            probe = np.argpartition(-(self.centroids @ q), n_probe - 1)[:n_probe]
+            pos = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in probe])
+            kandidat = self.vectors[pos]
+
+        skor = kandidat @ q
+        ids = self.ids if pos is None else self.ids[pos]
+        n_kandidat = len(skor)
+        if exclude is not None:
+            dikecualikan = ids == exclude
+            skor = np.where(dikecualikan, -np.inf, skor)
+            n_kandidat -= int(dikecualikan.sum())
+        k = min(k, n_kandidat)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-skor, k - 1)[:k]
+        top = top[np.argsort(-skor[top], kind='stable')]
+        return np.asarray(ids[top], dtype=np.int64), skor[top]
+
+    def save(self, folder):
+        """
+        Tulis file .npy ke folder secara atomik (folder sementara lalu rename).
+
+        Folder lama dipindah ke samping dulu (rename) dan baru dihapus setelah
+        folder baru terpasang. Jika proses lain lebih dulu memasang index di
+        folder tersebut, index milik proses itu dibiarkan.
+
+        Returns:
+            bool: True jika index ini yang terpasang, False jika kalah balapan
+        """
+        parent = os.path.dirname(folder)
+        os.makedirs(parent, exist_ok=True)
+        prefix = os.path.join(parent, f".{os.path.basename(folder)}.{uuid.uuid4().hex}")
+        tmp, lama = f"{prefix}.tmp", f"{prefix}.old"
+        os.makedirs(tmp)
+        try:
+            for name in _FILES:
+                np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+            with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({"version": ANN_VERSION, "n_docs": len(self), "n_lists": self.n_lists}, f)
+            try:
+                os.rename(folder, lama)
+            except FileNotFoundError:
+                pass
+            try:
+                os.rename(tmp, folder)
+            except OSError:
+                # Folder sudah diisi proses lain di antara kedua rename
+                return False
+            return True
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(lama, ignore_errors=True)
+
+    @classmethod
+    def load(cls, folder):
+        """Buka index dari folder; vektor dan id di-memory-map, tidak dibaca ke RAM"""
+        arrays = {name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode='r') for name in _FILES}
+        # Centroid dan offsets kecil dan dipakai setiap query
+        arrays["centroids"] = np.array(arrays["centroids"])
+        arrays["offsets"] = np.array(arrays["offsets"])
+        return cls(**arrays)
+
+
+class AnnStore:
+    """
+    Index ANN per isi file upload di `<upload_folder>/.ann/<sha1>/v<ANN_VERSION>/`.
+
+    Index yang sudah dibuka disimpan (LRU, max_open) agar query berikutnya
+    tidak membuka file lagi.
+    """
+
+    def __init__(self, upload_folder, max_open=8):
+        self.root = os.path.join(upload_folder, ANN_DIRNAME)
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._open = OrderedDict()
+        # content_hash -> Lock; build untuk isi yang sama dijalankan bergantian
+        self._build_locks = {}
+
+    def _dir(self, content_hash):
+        return os.path.join(self.root, os.path.basename(content_hash), f"v{ANN_VERSION}")
+
+    def exists(self, content_hash):
+        return os.path.exists(os.path.join(self._dir(content_hash), 'meta.json'))
+
+    def _simpan_terbuka(self, content_hash, index):
+        self._open[content_hash] = index
+        self._open.move_to_end(content_hash)
+        while len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+
+    def get(self, content_hash):
+        """Index untuk isi file, atau None jika belum dibangun"""
+        with self._lock:
+            index = self._open.get(content_hash)
+            if index is not None:
+                self._open.move_to_end(content_hash)
+                return index
+            if not self.exists(content_hash):
+                return None
+            index = IVFIndex.load(self._dir(content_hash))
+            self._simpan_terbuka(content_hash, index)
+            return index
+
+    def _build_lock(self, content_hash):
+        with self._lock:
+            return self._build_locks.setdefault(content_hash, threading.Lock())
+
+    def build(self, content_hash, embeddings, keys, base_hash=None):
+        """
+        Bangun dan simpan index korpus. Jika index lama untuk isi yang sama atau
+        untuk base_hash (korpus sebelumnya yang mirip) ada, index dibangun dari
+        index tersebut (IVFIndex.dari_basis) tanpa melatih ulang k-means.
+
+        Build untuk isi yang sama dalam satu proses dijalankan bergantian; jika
+        proses lain lebih dulu menyimpan index isi yang sama, index itu yang dipakai.
+        """
+        with self._build_lock(content_hash):
+            base = self.get(content_hash)
+            if base is not None:
+                base_hash = content_hash
+            elif base_hash:
+                base = self.get(base_hash)
+            if base is not None:
+                index = IVFIndex.dari_basis(base, embeddings, keys)
+                print(f"ANN index {content_hash[:12]} dibangun dari index {base_hash[:12]} "
+                      f"({len(index)} dokumen, {index.n_lists} list)")
+            else:
+                index = IVFIndex.build(embeddings, keys)
+                print(f"ANN index {content_hash[:12]} dibangun ({len(index)} dokumen, {index.n_lists} list)")
+            if not index.save(self._dir(content_hash)):
+                print(f"ANN index {content_hash[:12]} sudah disimpan proses lain, index tersebut dipakai")
+            with self._lock:
+                self._open.pop(content_hash, None)
+            tersimpan = self.get(content_hash)
+            # Folder bisa sedang diganti proses lain; index yang baru dibangun tetap valid
+            return tersimpan if tersimpan is not None else index
+
+    def remove(self, content_hash):
+        """Hapus index milik isi file upload"""
+        with self._lock:
+            self._open.pop(content_hash, None)
+        shutil.rmtree(os.path.join(self.root, os.path.basename(content_hash)), ignore_errors=True)
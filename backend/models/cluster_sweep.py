@@ -0,0 +1,391 @@
+"""
+Sweep min_cluster_size untuk Research Intelligence
+Evaluasi coherence BERTopic per min_cluster_size secara paralel antar proses
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from tqdm import tqdm
+from bertopic import BERTopic
+from bertopic.cluster import BaseCluster
+from hdbscan import HDBSCAN, hdbscan_
+from sklearn.utils import check_array
+
+from .coherence import CoherenceIndex
+from .process_pool import mp_context
+
+
+def sidik_embeddings(embeddings):
+    """Sidik jari isi matriks embedding untuk mengenali input yang sama"""
+    arr = np.ascontiguousarray(embeddings)
+    return (arr.shape, hashlib.sha1(arr.view(np.uint8)).hexdigest())
+
+
+def sidik_dokumen(docs):
+    """Sidik jari korpus (teks dokumen yang sudah dibersihkan, berurutan)"""
+    h = hashlib.sha1()
+    for doc in docs:
+        h.update(doc.encode('utf-8'))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def kunci_assignment(docs, min_cluster_size, min_samples=None):
+    """Key topic assignment: korpus yang sama + parameter HDBSCAN yang sama"""
+    return (sidik_dokumen(docs), int(min_cluster_size), min_samples)
+
+
+class CachedReduction:
+    """
+    Pengganti umap_model untuk BERTopic yang memakai proyeksi UMAP yang sudah dihitung.
+
+    fit() tidak melakukan apa-apa. transform() mengembalikan proyeksi cache untuk
+    embeddings yang sama dengan saat reduksi, dan memakai UMAP yang sudah di-fit
+    untuk data lain (misalnya dokumen baru).
+    """
+
+    def __init__(self, reduced_embeddings, source_embeddings, umap_model=None):
+        self.reduced_embeddings = reduced_embeddings
+        self.source_fingerprint = sidik_embeddings(source_embeddings)
+        self.umap_model = umap_model
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if sidik_embeddings(X) == self.source_fingerprint:
+            return self.reduced_embeddings
+        if self.umap_model is None:
+            raise ValueError("Embeddings berbeda dari hasil reduksi dan UMAP yang sudah di-fit tidak tersedia")
+        return self.umap_model.transform(X)
+
+    def __getstate__(self):
+        # UMAP yang sudah di-fit tidak ikut dikirim ke worker sweep
+        state = self.__dict__.copy()
+        state["umap_model"] = None
+        return state
+
+
+def reduce_embeddings(umap_model, embeddings):
+    """
+    Fit UMAP sekali per analisis.
+
+    UMAP.transform pada data training mengembalikan embedding_ hasil fit, sama
+    dengan yang dihitung BERTopic di setiap fit.
+
+    Returns:
+        tuple: (reduced_embeddings, CachedReduction)
+    """
+    umap_model.fit(embeddings)
+    reduced = np.nan_to_num(umap_model.transform(embeddings))
+    return reduced, CachedReduction(reduced, embeddings, umap_model)
+
+
+# min_samples HDBSCAN default untuk sweep: tetap untuk semua kandidat supaya hierarki
+# dihitung sekali (lihat HierarkiHDBSCAN). Ini mengubah clustering default: sebelumnya
+# min_samples ikut min_cluster_size; None mengembalikan perilaku tersebut.
+DEFAULT_MIN_SAMPLES = 10
+
+
+def buat_hdbscan(min_cluster_size, min_samples=None, core_dist_n_jobs=-2, prediction_data=False):
+    """HDBSCAN untuk sweep/generate topics dengan parameter yang sama di semua jalur"""
+    return HDBSCAN(
+        min_cluster_size=min_cluster_size,
+        min_samples=min_samples,
+        metric='euclidean',
+        cluster_selection_method='eom',
+        prediction_data=prediction_data,
+        core_dist_n_jobs=core_dist_n_jobs
+    )
+
+
+class HierarkiHDBSCAN:
+    """
+    Hierarki HDBSCAN (mutual-reachability MST dan single-linkage tree) untuk
+    min_samples tetap, dihitung sekali dan dipakai semua min_cluster_size.
+
+    Core distance dan MST hanya bergantung pada min_samples, jadi untuk setiap
+    kandidat hanya condense tree dan seleksi EOM yang dihitung (labels). Langkah
+    dan parameter sama dengan HDBSCAN(metric='euclidean', algorithm='best')
+    sehingga label identik dengan fit independen
+    HDBSCAN(min_cluster_size=m, min_samples=min_samples).
+    """
+
+    def __init__(self, X, min_samples, core_dist_n_jobs=-2):
+        self.X = check_array(X, ensure_all_finite=False)
+        self.min_samples = max(1, min(len(self.X) - 1, int(min_samples)))
+        if self.X.shape[1] > 60:
+            self.single_linkage_tree, _ = hdbscan_._hdbscan_prims_kdtree(
+                self.X, self.min_samples, 1.0, 'euclidean', None, 40, False
+            )
+        else:
+            self.single_linkage_tree, _ = hdbscan_._hdbscan_boruvka_kdtree(
+                self.X, self.min_samples, 1.0, 'euclidean', None, 40, True, False, core_dist_n_jobs
+            )
+
+    def labels(self, min_cluster_size):
+        """Label HDBSCAN (int32, -1 = outlier) untuk satu min_cluster_size"""
+        labels = hdbscan_._tree_to_labels(
+            self.X, self.single_linkage_tree, int(min_cluster_size), cluster_selection_method='eom'
+        )[0]
+        return np.asarray(labels, dtype=np.int32)
+
+
+# State read-only per proses worker pool: diisi sekali oleh initializer. Mode 1 worker
+# tidak memakainya (state dikirim langsung ke evaluate_min_cluster) karena beberapa job
+# analisis bisa menjalankan sweep bersamaan di proses server.
+_sweep_state = {}
+
+
+def _init_sweep_worker(embeddings_path, payload_bytes):
+    """
+    Initializer ProcessPoolExecutor.
+
+    Embeddings dibuka memory-mapped (copy-on-write) dari file .npy bersama sehingga
+    halaman memorinya dibagi antar proses; docs, index coherence dan
+    komponen model di-unpickle sekali per worker, bukan per task.
+    """
+    _sweep_state.clear()
+    _sweep_state.update(pickle.loads(payload_bytes))
+    _sweep_state["embeddings"] = np.load(embeddings_path, mmap_mode='c')
+
+
+def evaluate_min_cluster(min_cluster, state=None):
+    """
+    Fit BERTopic untuk satu min_cluster_size dan hitung coherence c_v.
+
+    Args:
+        min_cluster: Kandidat min_cluster_size
+        state: State sweep (docs, embeddings, model, ...); None di worker pool
+            berarti state proses yang diisi _init_sweep_worker
+
+    Returns:
+        tuple: (min_cluster, coherence atau NaN, label HDBSCAN int32 atau None
+            jika fit gagal)
+    """
+    if state is None:
+        state = _sweep_state
+    try:
+        fixed = (state.get("fixed_labels") or {}).get(min_cluster)
+        if fixed is None and state.get("hierarchy") is not None:
+            # Seleksi EOM dari hierarki bersama, tanpa menghitung MST lagi
+            fixed = state["hierarchy"].labels(min_cluster)
+        if fixed is not None:
+            # Label sudah ditetapkan (analisis inkremental atau hierarki bersama)
+            hdbscan_model = BaseCluster()
+        else:
+            hdbscan_model = buat_hdbscan(
+                min_cluster,
+                min_samples=state["min_samples"],
+                core_dist_n_jobs=state["core_dist_n_jobs"]
+            )
+        topic_model = BERTopic(
+            embedding_model=state["embedding_model"],
+            umap_model=state["umap_model"],
+            hdbscan_model=hdbscan_model,
+            vectorizer_model=state["vectorizer_model"],
+            ctfidf_model=state["ctfidf_model"],
+            verbose=False
+        )
+        if fixed is not None:
+            topic_model.fit(state["docs"], state["embeddings"], y=np.asarray(fixed))
+            labels = np.asarray(fixed, dtype=np.int32)
+        else:
+            topic_model.fit(state["docs"], state["embeddings"])
+            # Label mentah HDBSCAN (sebelum diurutkan BERTopic) untuk dipakai ulang saat generate topics
+            labels = np.asarray(hdbscan_model.labels_, dtype=np.int32)
+        topic_words = []
+        topic_freq = topic_model.get_topic_freq()
+        topic_ids = topic_freq[(topic_freq['Count'] >= 5) & (topic_freq['Topic'] != -1)]['Topic'].tolist()
+        topic_ids = [t for t in topic_ids if t != -1]
+        for topic_id in topic_ids:
+            words = topic_model.get_topic(topic_id)
+            if isinstance(words, list):
+                topic_words.append([word for word, _ in words])
+        if len(topic_words) > 1:
+            coherence = state["coherence_index"].c_v(topic_words, topn=15)
+            return (min_cluster, coherence, labels)
+        return (min_cluster, np.nan, labels)
+    except Exception as e:
+        print(f"min_cluster_size = {min_cluster} → ERROR: {str(e)}")
+        return (min_cluster, np.nan, None)
+
+
+def _diminta_berhenti(stop_event):
+    return stop_event is not None and stop_event.is_set()
+
+
+def _jalankan_kandidat(candidates, evaluator, hasil, progress=None, stop_event=None):
+    """
+    Evaluasi kandidat yang belum ada di hasil, evaluator mengembalikan iterator hasil.
+    Berhenti setelah kandidat yang sedang selesai jika stop_event di-set.
+    """
+    baru = [m for m in candidates if m not in hasil]
+    total = len(hasil) + len(baru)
+    if progress is not None:
+        progress("sweep", len(hasil), total)
+    hasil_iter = evaluator(baru)
+    try:
+        for min_cluster, coherence, labels in hasil_iter:
+            hasil[min_cluster] = (min_cluster, coherence, labels)
+            if progress is not None:
+                progress("sweep", len(hasil), total, min_cluster_size=min_cluster,
+                         coherence=None if np.isnan(coherence) else float(coherence))
+            if _diminta_berhenti(stop_event):
+                print(f"Sweep dihentikan lebih awal setelah {len(hasil)} kandidat")
+                break
+    finally:
+        hasil_iter.close()
+
+
+def _kandidat_refine(hasil, min_cluster_range, stride):
+    """Tetangga (±stride-1) dari min_cluster_size terbaik pada tahap kasar"""
+    valid = [(c, m) for m, c, _ in hasil.values() if not np.isnan(c)]
+    if not valid:
+        return []
+    # Coherence tertinggi, min_cluster_size terkecil saat seri (sama dengan sweep penuh)
+    _, terbaik = max(valid, key=lambda x: (x[0], -x[1]))
+    return [m for m in min_cluster_range if abs(m - terbaik) < stride]
+
+
+def sweep_min_cluster_size(
+    docs,
+    embeddings,
+    docs_tokenized,
+    dictionary,
+    models,
+    min_cluster_range,
+    embedding_model=None,
+    n_workers=None,
+    strategy="grid",
+    stride=3,
+    min_samples=None,
+    progress=None,
+    stop_event=None,
+    fixed_labels=None
+):
+    """
+    Evaluasi coherence untuk setiap min_cluster_size.
+
+    Args:
+        docs: List teks dokumen
+        embeddings: Matriks embedding dokumen
+        docs_tokenized: Token dokumen untuk coherence
+        dictionary: gensim Dictionary dari docs_tokenized; keduanya diindeks sekali
+            ke CoherenceIndex yang dipakai semua kandidat
+        models: dict umap_model (CachedReduction dari reduce_embeddings),
+            vectorizer_model, ctfidf_model
+        min_cluster_range: Kandidat min_cluster_size
+        embedding_model: Diteruskan ke BERTopic pada mode 1 worker
+        n_workers: Jumlah proses (None = os.cpu_count(), 1 = tanpa process pool)
+        strategy: 'grid' (semua kandidat) atau 'coarse' (langkah stride lalu refine
+            di sekitar yang terbaik, jumlah fit jauh lebih sedikit)
+        stride: Jarak kandidat pada tahap kasar strategi 'coarse'
+        min_samples: min_samples HDBSCAN yang tetap untuk semua kandidat; jika
+            diisi, hierarki HDBSCAN dihitung sekali di proses utama dan dipakai ulang
+            (HierarkiHDBSCAN). None = min_samples ikut min_cluster_size, setiap
+            kandidat menghitung MST sendiri
+        progress: Callback progress(stage, current, total, **detail) yang dipanggil
+            setiap kandidat selesai
+        stop_event: threading.Event opsional; jika di-set, sweep berhenti dan hanya
+            mengembalikan kandidat yang sudah dievaluasi
+        fixed_labels: dict opsional min_cluster_size -> label per dokumen; kandidat
+            yang ada di sini tidak di-cluster ulang, label dipakai lewat BaseCluster
+            (analisis inkremental, lihat incremental.rencana_incremental)
+
+    Returns:
+        list: (min_cluster, coherence, labels) terurut menurut min_cluster; labels
+            adalah label HDBSCAN per dokumen (objek BERTopic tidak dikirim balik
+            antar proses) dan dipakai generate_topics_with_label tanpa fit ulang
+    """
+    min_cluster_range = list(min_cluster_range)
+    if strategy == "grid":
+        tahapan = [lambda hasil: min_cluster_range]
+    elif strategy == "coarse":
+        stride = max(1, int(stride))
+        tahapan = [
+            lambda hasil: min_cluster_range[::stride],
+            lambda hasil: _kandidat_refine(hasil, min_cluster_range, stride),
+        ]
+    else:
+        raise ValueError(f"Strategi sweep tidak dikenali: {strategy}")
+
+    n_workers = n_workers or os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(min_cluster_range)))
+    hasil = {}
+
+    # Index sliding window c_v dibangun sekali per analisis
+    coherence_index = CoherenceIndex(docs_tokenized, dictionary)
+
+    # Satu MST untuk seluruh sweep jika min_samples tetap (kecuali semua label sudah ditetapkan)
+    hierarchy = None
+    if min_samples is not None and any(m not in (fixed_labels or {}) for m in min_cluster_range):
+        hierarchy = HierarkiHDBSCAN(models["umap_model"].transform(embeddings), min_samples)
+
+    state = {
+        "min_samples": min_samples,
+        "hierarchy": hierarchy,
+        "docs": docs,
+        "fixed_labels": fixed_labels,
+        "coherence_index": coherence_index,
+        "umap_model": models["umap_model"],
+        "vectorizer_model": models["vectorizer_model"],
+        "ctfidf_model": models["ctfidf_model"],
+    }
+
+    if n_workers == 1:
+        state_lokal = dict(state, embeddings=embeddings, embedding_model=embedding_model,
+                           core_dist_n_jobs=-2)
+
+        def evaluator(candidates):
+            for m in tqdm(candidates, desc="Evaluating cluster sizes"):
+                yield evaluate_min_cluster(m, state_lokal)
+
+        for tahap in tahapan:
+            if _diminta_berhenti(stop_event):
+                break
+            _jalankan_kandidat(tahap(hasil), evaluator, hasil, progress, stop_event)
+        return [hasil[m] for m in sorted(hasil)]
+
+    # Embedding model tidak dikirim: fit memakai embeddings yang sudah ada.
+    # Satu core per worker untuk HDBSCAN agar tidak oversubscribe.
+    state.update({"embedding_model": None, "core_dist_n_jobs": 1})
+    payload_bytes = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    tmp_dir = tempfile.mkdtemp(prefix="sweep_")
+    try:
+        embeddings_path = os.path.join(tmp_dir, "embeddings.npy")
+        np.save(embeddings_path, np.ascontiguousarray(embeddings))
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=mp_context(__name__),
+            initializer=_init_sweep_worker,
+            initargs=(embeddings_path, payload_bytes)
+        ) as executor:
+
+            def evaluator(candidates):
+                futures = [executor.submit(evaluate_min_cluster, m) for m in candidates]
+                try:
+                    for future in tqdm(as_completed(futures), total=len(futures),
+                                       desc=f"Evaluating cluster sizes ({n_workers} proses)"):
+                        yield future.result()
+                finally:
+                    # Saat dihentikan, kandidat yang belum mulai tidak dijalankan
+                    for future in futures:
+                        future.cancel()
+
+            for tahap in tahapan:
+                if _diminta_berhenti(stop_event):
+                    break
+                _jalankan_kandidat(tahap(hasil), evaluator, hasil, progress, stop_event)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return [hasil[m] for m in sorted(hasil)]
@@ -0,0 +1,95 @@
+"""
+Corpus store untuk Research Intelligence
+Simpan hasil preprocessing per file upload agar cleaning, validasi dan dedup hanya dijalankan sekali
+"""
+
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+from .ingestion import read_upload
+from .preprocessing import preprocess_dataframe
+
+# Naikkan jika pembacaan upload atau preprocess_dataframe berubah supaya artefak lama tidak dipakai
+CORPUS_VERSION = 2
+
+CORPUS_DIRNAME = '.preprocessed'
+
+
+class CorpusStore:
+    """
+    Artefak korpus yang sudah di-preprocess, satu per isi file upload.
+
+    Artefak disimpan di `<upload_folder>/.preprocessed/<sha1 isi>/` dengan nama
+    `v<CORPUS_VERSION>.parquet`, sehingga alias nama untuk isi yang sama memakai
+    artefak yang sama. Jika DataFrame tidak bisa ditulis
+    sebagai Parquet (pyarrow tidak ada atau kolom bertipe campuran), artefak
+    ditulis sebagai pickle.
+    """
+
+    def __init__(self, upload_folder):
+        self.root = os.path.join(upload_folder, CORPUS_DIRNAME)
+
+    def _dir(self, content_hash):
+        return os.path.join(self.root, os.path.basename(content_hash))
+
+    def _baca(self, base):
+        """Artefak tersimpan untuk base path, atau None"""
+        if os.path.exists(base + '.parquet'):
+            return pd.read_parquet(base + '.parquet')
+        if os.path.exists(base + '.pkl'):
+            return pd.read_pickle(base + '.pkl')
+        return None
+
+    def _tulis(self, content_hash, base, df):
+        """Tulis artefak secara atomik lalu hapus artefak versi lama isi yang sama"""
+        folder = self._dir(content_hash)
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{base}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                df.to_parquet(tmp)
+                path = base + '.parquet'
+            except Exception as e:
+                print(f"Artefak korpus ditulis sebagai pickle ({type(e).__name__}: {e})")
+                df.to_pickle(tmp)
+                path = base + '.pkl'
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        for fname in os.listdir(folder):
+            fpath = os.path.join(folder, fname)
+            if fpath != path and not fname.endswith('.tmp'):
+                os.remove(fpath)
+        return path
+
+    def load(self, content_hash, filepath, read_fn=read_upload):
+        """
+        DataFrame hasil preprocess_dataframe untuk file upload.
+
+        Args:
+            content_hash: sha1 isi file upload (dipakai sebagai folder artefak)
+            filepath: Path file upload
+            read_fn: Fungsi pembaca file mentah menjadi DataFrame
+
+        Returns:
+            tuple: (DataFrame yang sudah di-preprocess, True jika dari artefak)
+        """
+        base = os.path.join(self._dir(content_hash), f"v{CORPUS_VERSION}")
+        df = self._baca(base)
+        if df is not None:
+            print(f"Korpus {content_hash[:12]} dimuat dari artefak preprocessing ({len(df)} dokumen)")
+            return df, True
+
+        df = preprocess_dataframe(read_fn(filepath))
+        path = self._tulis(content_hash, base, df)
+        print(f"Artefak preprocessing disimpan: {path}")
+        return df, False
+
+    def remove(self, content_hash):
+        """Hapus semua artefak milik isi file upload"""
+        shutil.rmtree(self._dir(content_hash), ignore_errors=True)
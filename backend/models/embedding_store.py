@@ -0,0 +1,243 @@
+"""
+Embedding store untuk Research Intelligence
+Cache embedding dokumen di disk (content-addressed) agar dokumen yang sama tidak di-encode ulang
+"""
+
+import hashlib
+import os
+import re
+import threading
+import uuid
+
+import numpy as np
+
+# Jumlah dokumen per panggilan encode, supaya progress bisa dilaporkan per potongan
+ENCODE_CHUNK_BATCHES = 16
+
+# Segmen dengan baris kurang dari batas ini dianggap kecil; jika jumlah segmen kecil
+# mencapai COMPACT_SEGMENTS, semuanya digabung menjadi satu segmen
+COMPACT_MIN_ROWS = 50000
+COMPACT_SEGMENTS = 8
+
+STORE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'save_models', 'embedding_cache'))
+
+
+def hash_dokumen(text, model_name):
+    """Key content-addressed: sha1 dari nama model + teks dokumen yang sudah dibersihkan"""
+    return hashlib.sha1(f"{model_name}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Penyimpanan embedding persisten untuk satu model.
+
+    Setiap batch embedding baru ditulis sebagai segmen `seg_*.npy` (dibuka
+    memory-mapped) beserta `seg_*.keys` berisi hash dokumen per baris. Index
+    hash -> (segmen, baris) dibangun dari file .keys dan diperbarui saat ada
+    segmen baru, termasuk segmen yang ditulis proses lain. Segmen kecil (misalnya
+    dari analisis inkremental yang hanya meng-encode baris baru) digabung lewat
+    _compact supaya jumlah file dan mmap tetap terbatas.
+    """
+
+    def __init__(self, model_name, root=STORE_DIR, dtype=np.float32):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.path = os.path.join(root, f"{slug}_{self.dtype.name}")
+        self._lock = threading.Lock()
+        self._index = {}
+        self._segments = {}
+        # Hash dokumen per baris setiap segmen (isi file .keys)
+        self._segment_keys = {}
+        # mtime direktori saat terakhir di-list; tidak berubah = tidak ada segmen baru
+        self._dir_mtime = None
+
+    def _refresh(self):
+        """Muat segmen yang belum dikenal ke index (dipanggil dengan lock)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._dir_mtime:
+            return
+        self._dir_mtime = mtime
+        ada = sorted(fname[:-len('.keys')] for fname in os.listdir(self.path) if fname.endswith('.keys'))
+        # Segmen yang sudah digabung proses lain: key-nya dipindah ke segmen gabungan
+        hilang = set(self._segments) - set(ada)
+        for seg in ada:
+            if seg in self._segments:
+                continue
+            try:
+                vectors = np.load(os.path.join(self.path, f"{seg}.npy"), mmap_mode='r')
+                with open(os.path.join(self.path, f"{seg}.keys"), encoding='utf-8') as f:
+                    keys = f.read().split()
+            except FileNotFoundError:
+                # Segmen belum selesai ditulis atau baru saja digabung proses lain
+                continue
+            self._segments[seg] = vectors
+            self._segment_keys[seg] = keys
+            for row, key in enumerate(keys):
+                lama = self._index.get(key)
+                if lama is None or lama[0] in hilang:
+                    self._index[key] = (seg, row)
+        for seg in hilang:
+            # mmap dilepas jika tidak ada key yang masih menunjuk ke segmen ini
+            if all(self._index.get(key, (None,))[0] != seg for key in self._segment_keys[seg]):
+                del self._segments[seg]
+                del self._segment_keys[seg]
+
+    def _tulis_segmen(self, keys, vectors):
+        """
+        Tulis segmen baru secara atomik: .npy dulu, .keys terakhir sebagai penanda selesai
+
+        Returns:
+            str: Nama segmen
+        """
+        os.makedirs(self.path, exist_ok=True)
+        seg = f"seg_{uuid.uuid4().hex}"
+        npy_path = os.path.join(self.path, f"{seg}.npy")
+        keys_path = os.path.join(self.path, f"{seg}.keys")
+
+        tmp_npy = npy_path + '.tmp'
+        with open(tmp_npy, 'wb') as f:
+            np.save(f, vectors.astype(self.dtype, copy=False))
+        os.replace(tmp_npy, npy_path)
+
+        tmp_keys = keys_path + '.tmp'
+        with open(tmp_keys, 'w', encoding='utf-8') as f:
+            f.write("\n".join(keys))
+        os.replace(tmp_keys, keys_path)
+
+        self._segments[seg] = np.load(npy_path, mmap_mode='r')
+        self._segment_keys[seg] = keys
+        for row, key in enumerate(keys):
+            self._index.setdefault(key, (seg, row))
+        return seg
+
+    def _compact(self, min_rows=COMPACT_MIN_ROWS, max_segments=COMPACT_SEGMENTS):
+        """
+        Gabungkan segmen kecil menjadi satu segmen (dipanggil dengan lock).
+
+        Setelah jumlah segmen dengan baris < min_rows mencapai max_segments, semua
+        barisnya (tanpa hash duplikat) disalin ke satu segmen baru lalu file segmen
+        lama dihapus (.keys dulu supaya proses lain tidak memuatnya lagi). Proses
+        lain yang sudah membuka segmen lama tetap bisa membaca mmap-nya.
+        """
+        # Segmen yang sudah digabung proses lain (file .keys hilang) tidak digabung lagi
+        kecil = {
+            seg for seg, vectors in self._segments.items()
+            if len(vectors) < min_rows and os.path.exists(os.path.join(self.path, f"{seg}.keys"))
+        }
+        if len(kecil) < max_segments:
+            return
+
+        keys, sumber, dilihat = [], {}, set()
+        for seg in sorted(kecil):
+            for row, key in enumerate(self._segment_keys[seg]):
+                if key in dilihat:
+                    continue
+                dilihat.add(key)
+                posisi, baris = sumber.setdefault(seg, ([], []))
+                posisi.append(len(keys))
+                baris.append(row)
+                keys.append(key)
+        dim = next(iter(self._segments.values())).shape[1]
+        vectors = np.empty((len(keys), dim), dtype=self.dtype)
+        for seg, (posisi, baris) in sumber.items():
+            vectors[posisi] = self._segments[seg][baris]
+
+        gabungan = self._tulis_segmen(keys, vectors)
+        for row, key in enumerate(keys):
+            self._index[key] = (gabungan, row)
+        for seg in kecil:
+            del self._segments[seg]
+            del self._segment_keys[seg]
+            for ext in ('.keys', '.npy'):
+                try:
+                    os.remove(os.path.join(self.path, f"{seg}{ext}"))
+                except FileNotFoundError:
+                    pass
+        print(f"Embedding cache: {len(kecil)} segmen kecil digabung ({len(keys)} dokumen)")
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def encode(self, embedding_model, docs, batch_size=64, show_progress_bar=True, progress=None):
+        """
+        Embedding untuk docs; hanya dokumen yang belum pernah dilihat yang di-encode.
+
+        Args:
+            embedding_model: SentenceTransformer
+            docs: List teks dokumen
+            batch_size: Batch size encode
+            show_progress_bar: Tampilkan progress encode
+            progress: Callback progress("encoding", selesai, total, cached=...) yang
+                dipanggil setiap ENCODE_CHUNK_BATCHES batch
+
+        Returns:
+            np.ndarray: Matriks embedding (len(docs), dim) float32
+        """
+        keys = [hash_dokumen(text, self.model_name) for text in docs]
+
+        with self._lock:
+            self._refresh()
+            # Dokumen duplikat dalam satu korpus cukup di-encode sekali
+            baru = {}
+            for key, text in zip(keys, docs):
+                if key not in self._index and key not in baru:
+                    baru[key] = text
+
+        print(f"Embedding cache: {len(baru)} dokumen baru perlu di-encode dari {len(docs)} dokumen")
+        cached = len(docs) - len(baru)
+        if baru:
+            teks_baru = list(baru.values())
+            langkah = batch_size * ENCODE_CHUNK_BATCHES
+            potongan = []
+            for mulai in range(0, len(teks_baru), langkah):
+                potongan.append(np.asarray(embedding_model.encode(
+                    teks_baru[mulai:mulai + langkah], show_progress_bar=show_progress_bar, batch_size=batch_size
+                )))
+                if progress is not None:
+                    progress("encoding", min(mulai + langkah, len(teks_baru)), len(teks_baru), cached=cached)
+            with self._lock:
+                self._tulis_segmen(list(baru.keys()), np.concatenate(potongan))
+                self._compact()
+        elif progress is not None:
+            progress("encoding", 0, 0, cached=cached)
+
+        with self._lock:
+            # Kelompokkan per segmen agar baris disalin dengan fancy indexing
+            per_segmen = {}
+            for i, key in enumerate(keys):
+                seg, row = self._index[key]
+                posisi, baris = per_segmen.setdefault(seg, ([], []))
+                posisi.append(i)
+                baris.append(row)
+
+            dim = next(iter(self._segments.values())).shape[1] if self._segments else 0
+            embeddings = np.empty((len(docs), dim), dtype=np.float32)
+            for seg, (posisi, baris) in per_segmen.items():
+                embeddings[posisi] = self._segments[seg][baris]
+        return embeddings
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name, dtype=np.float32):
+    """EmbeddingStore bersama per (model, dtype) dalam satu proses"""
+    key = (model_name, np.dtype(dtype).name)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EmbeddingStore(model_name, dtype=dtype)
+        return _stores[key]
+
+
+def encode_with_cache(embedding_model, model_name, docs, batch_size=64, dtype=np.float32, progress=None):
+    """Shortcut: encode docs lewat embedding store milik model_name"""
+    return get_embedding_store(model_name, dtype).encode(
+        embedding_model, docs, batch_size=batch_size, progress=progress
+    )
@@ -0,0 +1,241 @@
+"""
+Incremental analysis untuk Research Intelligence
+Analisis ulang korpus yang bertambah: hanya baris baru yang di-encode, di-assign ke topik dan di-match
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from .cluster_sweep import sidik_dokumen
+from .preprocessing import combine_title_abstract
+
+
+def kunci_dokumen(docs):
+    """Key per baris: sha1 teks dokumen (64 bit pertama, hex)"""
+    return [hashlib.sha1(doc.encode('utf-8')).hexdigest()[:16] for doc in docs]
+
+
+def kunci_korpus(df):
+    """kunci_dokumen untuk DataFrame yang sudah di-preprocess (Title + Abstract)"""
+    return kunci_dokumen(combine_title_abstract(df))
+
+
+def hitung_delta(base_keys, keys):
+    """
+    Bandingkan baris korpus baru dengan korpus yang sudah dianalisis.
+
+    Returns:
+        tuple: (index baris lama per baris baru atau -1 untuk baris baru,
+            jumlah baris baru, jumlah baris lama yang tidak ada lagi)
+    """
+    posisi = {key: i for i, key in enumerate(base_keys)}
+    idx_lama = np.array([posisi.get(key, -1) for key in keys], dtype=np.int64)
+    n_baru = int((idx_lama < 0).sum())
+    n_hilang = len(posisi) - len(set(idx_lama[idx_lama >= 0].tolist()))
+    return idx_lama, n_baru, n_hilang
+
+
+def embedding_topik(embeddings, labels):
+    """
+    Rata-rata embedding dokumen per label (termasuk -1), sama dengan
+    topic_embeddings_ BERTopic saat fit dengan embeddings.
+
+    Returns:
+        tuple: (array label terurut, matriks embedding topik)
+    """
+    topics = np.unique(labels)
+    centroid = np.vstack([embeddings[labels == topic].mean(axis=0) for topic in topics])
+    return topics, centroid
+
+
+def tetapkan_topik(embeddings, topics, centroid):
+    """
+    Assign dokumen ke topik terdekat seperti BERTopic.transform untuk model
+    BaseCluster: argmax kemiripan kosinus ke embedding topik, outlier (-1)
+    jika yang terdekat adalah rata-rata dokumen outlier.
+
+    Returns:
+        tuple: (label int32, kemiripan ke topik terpilih)
+    """
+    sim = cosine_similarity(embeddings, centroid)
+    terbaik = sim.argmax(axis=1)
+    return topics[terbaik].astype(np.int32), sim[np.arange(len(terbaik)), terbaik]
+
+
+def _kemiripan_ke_topik(embeddings, labels, topics, centroid):
+    """Kemiripan kosinus setiap dokumen ke embedding topiknya sendiri"""
+    posisi = np.searchsorted(topics, labels)
+    a = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    b = centroid / np.maximum(np.linalg.norm(centroid, axis=1, keepdims=True), 1e-12)
+    return np.einsum('ij,ij->i', a, b[posisi])
+
+
+def rencana_incremental(docs, base, encode_fn, max_change=0.25, max_outlier_shift=0.15, max_drift=0.1):
+    """
+    Siapkan analisis BERTopic inkremental dari hasil analisis sebelumnya.
+
+    Baris yang sudah ada memakai embedding, proyeksi UMAP dan label HDBSCAN
+    lama. Hanya baris baru yang di-encode (encode_fn), diproyeksikan dengan UMAP
+    yang sudah di-fit dan di-assign ke topik lama lewat tetapkan_topik, untuk
+    setiap min_cluster_size yang label-nya tersimpan. Refit penuh disarankan
+    (dipakai=False) jika perubahan baris melebihi max_change, share outlier baris
+    baru melebihi share outlier korpus lama lebih dari max_outlier_shift, atau
+    kemiripan rata-rata baris baru ke topiknya turun lebih dari max_drift
+    (relatif) dibanding baris lama, dihitung pada min_cluster_size terbaik lama.
+
+    Args:
+        docs: Teks dokumen korpus baru
+        base: cache_data bertopic_analysis dari korpus sebelumnya
+        encode_fn: Fungsi encode list teks menjadi embeddings
+        max_change: Batas (baris baru + baris hilang) / jumlah dokumen
+        max_outlier_shift: Batas kenaikan share outlier baris baru
+        max_drift: Batas penurunan relatif kemiripan baris baru ke topiknya
+
+    Returns:
+        dict: ringkasan (dipakai, alasan, baris_baru, baris_hilang, outlier_baru,
+            outlier_lama, drift); jika dipakai juga embeddings, reduced_embeddings,
+            fixed_labels (min_cluster_size -> label) dan min_cluster_range
+    """
+    base_docs = base["docs"]
+    idx_lama, n_baru, n_hilang = hitung_delta(kunci_dokumen(base_docs), kunci_dokumen(docs))
+    rencana = {
+        "dipakai": False,
+        "alasan": None,
+        "baris_baru": n_baru,
+        "baris_hilang": n_hilang,
+        "outlier_baru": None,
+        "outlier_lama": None,
+        "drift": None,
+    }
+
+    share_perubahan = (n_baru + n_hilang) / max(len(docs), 1)
+    if share_perubahan > max_change:
+        rencana["alasan"] = f"perubahan baris {share_perubahan:.1%} melebihi batas {max_change:.1%}"
+        return rencana
+
+    # Label HDBSCAN korpus lama per min_cluster_size (dari sweep atau generate topics)
+    sidik_lama = sidik_dokumen(base_docs)
+    min_samples = base.get("min_samples")
+    label_lama = {
+        kunci[1]: np.asarray(labels)
+        for kunci, labels in (base.get("topic_assignments") or {}).items()
+        if kunci[0] == sidik_lama and kunci[2] == min_samples
+    }
+    if not label_lama:
+        rencana["alasan"] = "tidak ada topic assignment korpus lama"
+        return rencana
+    if base.get("fitted_umap") is None or base.get("reduced_embeddings") is None:
+        rencana["alasan"] = "proyeksi UMAP korpus lama tidak tersedia"
+        return rencana
+
+    baru = np.flatnonzero(idx_lama < 0)
+    lama = np.flatnonzero(idx_lama >= 0)
+    base_embeddings = np.asarray(base["embeddings"])
+    base_reduced = np.asarray(base["reduced_embeddings"])
+
+    embeddings = np.empty((len(docs), base_embeddings.shape[1]), dtype=base_embeddings.dtype)
+    reduced = np.empty((len(docs), base_reduced.shape[1]), dtype=base_reduced.dtype)
+    embeddings[lama] = base_embeddings[idx_lama[lama]]
+    reduced[lama] = base_reduced[idx_lama[lama]]
+    if len(baru):
+        emb_baru = np.asarray(encode_fn([docs[i] for i in baru]), dtype=base_embeddings.dtype)
+        embeddings[baru] = emb_baru
+        reduced[baru] = np.nan_to_num(base["fitted_umap"].transform(emb_baru))
+
+    m_terbaik = base.get("best_min_cluster_size")
+    if m_terbaik not in label_lama:
+        m_terbaik = min(label_lama)
+
+    fixed_labels = {}
+    for m, labels in label_lama.items():
+        topics, centroid = embedding_topik(base_embeddings, labels)
+        gabungan = np.empty(len(docs), dtype=np.int32)
+        gabungan[lama] = labels[idx_lama[lama]]
+        if len(baru):
+            label_baru, sim_baru = tetapkan_topik(embeddings[baru], topics, centroid)
+            gabungan[baru] = label_baru
+        fixed_labels[m] = gabungan
+
+        if m == m_terbaik:
+            rencana["outlier_lama"] = float(np.mean(labels == -1))
+            if len(baru):
+                rencana["outlier_baru"] = float(np.mean(label_baru == -1))
+                sim_lama = _kemiripan_ke_topik(base_embeddings, labels, topics, centroid)
+                rencana["drift"] = float(max(0.0, 1.0 - sim_baru.mean() / max(sim_lama.mean(), 1e-12)))
+
+    if rencana["outlier_baru"] is not None and \
+            rencana["outlier_baru"] - rencana["outlier_lama"] > max_outlier_shift:
+        rencana["alasan"] = (f"share outlier baris baru {rencana['outlier_baru']:.1%} "
+                             f"vs {rencana['outlier_lama']:.1%} di korpus lama")
+        return rencana
+    if rencana["drift"] is not None and rencana["drift"] > max_drift:
+        rencana["alasan"] = f"drift {rencana['drift']:.1%} melebihi batas {max_drift:.1%}"
+        return rencana
+
+    rencana.update({
+        "dipakai": True,
+        "embeddings": embeddings,
+        "reduced_embeddings": reduced,
+        "fixed_labels": fixed_labels,
+        "min_cluster_range": sorted(fixed_labels),
+    })
+    return rencana
+
+
+def ringkasan_rencana(rencana):
+    """Bagian rencana yang dikirim ke frontend (tanpa array)"""
+    return {k: rencana[k] for k in ("dipakai", "alasan", "baris_baru", "baris_hilang",
+                                    "outlier_baru", "outlier_lama", "drift")}
+
+
+class CorpusRegistry:
+    """
+    Key baris korpus yang pernah dianalisis, per (sha1 file, metode).
+
+    Dipakai untuk menemukan analisis sebelumnya dari file yang isinya sebagian
+    besar sama (misalnya export yang sama ditambah paper baru). Hanya
+    max_entries korpus terakhir yang disimpan.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def daftar(self, content_hash, metode, keys):
+        with self._lock:
+            self._entries.pop((content_hash, metode), None)
+            self._entries[(content_hash, metode)] = frozenset(keys)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def cari_basis(self, content_hash, metode, keys, min_overlap=0.8):
+        """
+        Korpus terdaftar dengan metode sama yang paling banyak berbagi baris.
+
+        Args:
+            content_hash: sha1 file yang akan dianalisis
+            metode: 'bertopic' atau 'keyword'
+            keys: kunci_dokumen korpus yang akan dianalisis
+            min_overlap: Minimal bagian baris korpus lama yang masih ada
+
+        Returns:
+            str: sha1 file korpus basis, atau None
+        """
+        keys = set(keys)
+        terbaik, overlap_terbaik = None, 0
+        with self._lock:
+            # Terbaru dulu: saat seri, analisis terakhir yang dipakai
+            for (kandidat, kandidat_metode), base_keys in reversed(self._entries.items()):
+                if kandidat_metode != metode or not base_keys:
+                    continue
+                if kandidat == content_hash:
+                    return kandidat
+                overlap = len(base_keys & keys)
+                if overlap / len(base_keys) >= min_overlap and overlap > overlap_terbaik:
+                    terbaik, overlap_terbaik = kandidat, overlap
+        return terbaik
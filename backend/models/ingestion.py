@@ -0,0 +1,133 @@
+"""
+Ingestion module untuk Research Intelligence
+Membaca file upload (CSV/XLSX) hanya pada kolom Title/Abstract beserta aliasnya
+"""
+
+import os
+
+import pandas as pd
+
+from .preprocessing import COLUMN_ALIASES, validate_dataframe
+
+# File CSV di atas batas ini dibaca per potongan dengan engine C
+CSV_CHUNK_MIN_BYTES = int(os.environ.get('INGEST_CHUNK_MIN_MB', 64)) * 1024 ** 2
+CSV_CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 10000))
+
+# Nilai default na_values pandas; sel XLSX berisi teks ini dianggap kosong seperti di read_csv/read_excel
+NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+])
+
+
+def kolom_teks(columns):
+    """Kolom header yang dipakai analisis (Title/Abstract dan aliasnya), urutan sesuai file"""
+    dipakai = {alias for aliases in COLUMN_ALIASES.values() for alias in aliases}
+    dipakai.update(COLUMN_ALIASES.keys())
+    return [col for col in columns if col in dipakai]
+
+
+def _pilih_kolom(columns):
+    """Kolom yang dibaca; error yang sama dengan validate_dataframe jika tidak ada"""
+    usecols = kolom_teks(columns)
+    if not usecols:
+        validate_dataframe(pd.DataFrame(columns=list(columns)))
+    return usecols
+
+
+def _header_unik(header):
+    """
+    Nama kolom duplikat diberi akhiran .1, .2, ... seperti header read_csv,
+    sehingga kolom teks yang muncul dua kali hanya dibaca kemunculan pertamanya.
+    """
+    header = list(header)
+    asli = set(header)
+    counts = {}
+    for i, col in enumerate(header):
+        cur_count = counts.get(col, 0)
+        if cur_count > 0:
+            nama = col
+            while cur_count > 0:
+                counts[nama] = cur_count + 1
+                col = f"{nama}.{cur_count}"
+                cur_count = cur_count + 1 if col in asli else counts.get(col, 0)
+            header[i] = col
+        counts[col] = cur_count + 1
+    return header
+
+
+def read_csv_upload(filepath, chunk_min_bytes=CSV_CHUNK_MIN_BYTES, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Baca CSV upload hanya pada kolom teks.
+
+    Header dibaca dulu untuk menentukan usecols. File biasa dibaca dengan engine
+    pyarrow (multi-thread, hanya kolom terpilih yang dimaterialisasi); file di
+    atas chunk_min_bytes dibaca per chunk_rows baris dengan engine C. Semua
+    kolom dibaca sebagai teks (dtype=str) supaya tipe tidak ditebak per
+    potongan: potongan yang isinya hanya angka tetap menghasilkan str, sama
+    dengan pembacaan seluruh file dan read_excel_upload.
+
+    Args:
+        filepath: Path file CSV
+        chunk_min_bytes: Ukuran file minimum untuk pembacaan per potongan
+        chunk_rows: Jumlah baris per potongan
+
+    Returns:
+        pandas DataFrame: Kolom Title/Abstract (atau aliasnya)
+    """
+    usecols = _pilih_kolom(pd.read_csv(filepath, nrows=0).columns)
+
+    if os.path.getsize(filepath) >= chunk_min_bytes:
+        chunks = pd.read_csv(filepath, usecols=usecols, dtype=str, chunksize=chunk_rows)
+        return pd.concat(chunks, ignore_index=True)
+
+    try:
+        return pd.read_csv(filepath, usecols=usecols, dtype=str, engine='pyarrow')
+    except Exception as e:
+        # pyarrow tidak terpasang atau format yang tidak didukung parser pyarrow
+        print(f"Engine pyarrow gagal ({type(e).__name__}: {e}), memakai engine C")
+        return pd.read_csv(filepath, usecols=usecols, dtype=str)
+
+
+def read_excel_upload(filepath):
+    """
+    Baca sheet pertama XLSX hanya pada kolom teks.
+
+    Workbook dibuka openpyxl dalam mode read-only sehingga baris di-stream
+    dari file, bukan dimuat seluruhnya ke memori.
+
+    Args:
+        filepath: Path file XLSX
+
+    Returns:
+        pandas DataFrame: Kolom Title/Abstract (atau aliasnya)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _header_unik(next(rows, ()))
+        usecols = _pilih_kolom(header)
+        indices = [header.index(col) for col in usecols]
+        data = {col: [] for col in usecols}
+        for row in rows:
+            for col, idx in zip(usecols, indices):
+                value = row[idx] if idx < len(row) else None
+                if isinstance(value, str):
+                    value = None if value in NA_STRINGS else value
+                elif value is not None:
+                    # Sel angka/tanggal dijadikan teks seperti kolom teks campuran di read_csv
+                    value = str(value)
+                data[col].append(value)
+    finally:
+        workbook.close()
+
+    return pd.DataFrame(data, columns=usecols)
+
+
+def read_upload(filepath):
+    """Baca file upload sesuai ekstensinya (.xlsx atau CSV)"""
+    if filepath.lower().endswith('.xlsx'):
+        return read_excel_upload(filepath)
+    return read_csv_upload(filepath)
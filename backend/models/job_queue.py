@@ -0,0 +1,232 @@
+"""
+Job queue untuk Research Intelligence
+Menjalankan analisis panjang di background thread dengan status progress yang bisa di-poll atau di-stream
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Status job
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+
+class QueueFullError(RuntimeError):
+    """Antrian job sudah mencapai batas"""
+
+
+class Job:
+    """
+    Satu pekerjaan di antrian.
+
+    Fungsi pipeline menerima objek ini dan melaporkan progress lewat report(),
+    misalnya report("sweep", 3, 14) atau report("encoding"). Setiap laporan juga
+    dicatat sebagai event bernomor urut untuk stream SSE (wait_events), dan
+    stop_event di-set saat user meminta pipeline berhenti lebih awal.
+    """
+
+    def __init__(self, key, kind):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.stage = "queued"
+        self.current = None
+        self.total = None
+        self.detail = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def _catat_event(self, event, data):
+        """Tambah event ke log dan bangunkan stream yang menunggu (dipanggil dengan lock)"""
+        self.events.append({"seq": len(self.events), "event": event, **data})
+        self._cond.notify_all()
+
+    def report(self, stage, current=None, total=None, **detail):
+        """Perbarui tahap pipeline yang sedang berjalan"""
+        with self._lock:
+            self.stage = stage
+            self.current = current
+            self.total = total
+            self.detail = detail
+            self._catat_event("progress", {
+                "stage": stage,
+                "progress": {"current": current, "total": total, **detail}
+            })
+
+    def _mulai(self):
+        with self._lock:
+            self.status = RUNNING
+            self.stage = "started"
+            self.started_at = time.time()
+            self._catat_event("progress", {"stage": "started", "progress": {"current": None, "total": None}})
+
+    def _selesai(self, result=None, error=None):
+        """Tandai job selesai; event terakhir adalah 'done' atau 'failed'"""
+        with self._lock:
+            self.finished_at = time.time()
+            if error is None:
+                self.result = result
+                self.status = DONE
+                self.stage = "done"
+                self._catat_event("done", {"stage": "done"})
+            else:
+                self.error = error
+                self.status = ERROR
+                self._catat_event("failed", {"stage": self.stage, "error": error})
+
+    def stop(self):
+        """Minta pipeline berhenti lebih awal (sweep memakai kandidat yang sudah selesai)"""
+        self.stop_event.set()
+
+    def wait_events(self, after, timeout=15):
+        """
+        Tunggu event dengan seq >= after.
+
+        Returns:
+            tuple: (list event baru, job sudah selesai)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > after or self.finished, timeout)
+            return self.events[after:], self.finished
+
+    @property
+    def finished(self):
+        return self.status in (DONE, ERROR)
+
+    def to_dict(self):
+        """Status job untuk endpoint /jobs/<id>"""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": {
+                    "current": self.current,
+                    "total": self.total,
+                    **self.detail
+                },
+                "error": self.error,
+                "stop_requested": self.stop_event.is_set(),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+
+class JobQueue:
+    """
+    Antrian job dengan jumlah worker dan kedalaman antrian terbatas.
+
+    Job dengan key yang sama dengan job yang masih queued/running tidak
+    dijalankan dua kali: submit() mengembalikan job yang sudah ada, kecuali
+    job itu sudah diminta berhenti atau sudah selesai. Job yang selesai
+    disimpan selama result_ttl detik agar hasilnya bisa diambil.
+    """
+
+    def __init__(self, max_workers=1, max_queue=8, result_ttl=3600):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._inflight = {}
+
+    def _bersihkan(self):
+        """Buang job selesai yang sudah melewati result_ttl (dipanggil dengan lock)"""
+        batas = time.time() - self.result_ttl
+        kadaluarsa = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < batas
+        ]
+        for job_id in kadaluarsa:
+            del self._jobs[job_id]
+
+    def submit(self, key, kind, fn, *args, **kwargs):
+        """
+        Masukkan job ke antrian.
+
+        Args:
+            key: Identitas request (hashable) untuk de-duplikasi
+            kind: Jenis job, misalnya 'analyze' atau 'generate_topics'
+            fn: Fungsi pipeline, dipanggil fn(job, *args, **kwargs)
+
+        Returns:
+            tuple: (Job, deduplicated)
+
+        Raises:
+            QueueFullError: Jika job aktif sudah mencapai max_workers + max_queue
+        """
+        with self._lock:
+            self._bersihkan()
+            # Job yang diminta berhenti akan mengembalikan hasil parsial (atau error),
+            # jadi request ulang dijalankan sebagai job baru
+            lama = self._jobs.get(self._inflight.get(key))
+            if lama is not None and not lama.finished and not lama.stop_event.is_set():
+                return lama, True
+
+            if len(self._inflight) >= self.max_workers + self.max_queue:
+                raise QueueFullError(
+                    f"Antrian penuh ({len(self._inflight)} job aktif), coba lagi nanti"
+                )
+
+            job = Job(key, kind)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+
+        self._executor.submit(self._jalankan, job, fn, args, kwargs)
+        return job, False
+
+    def _jalankan(self, job, fn, args, kwargs):
+        job._mulai()
+        result, error = None, None
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            print(f"Job {job.kind} {job.id} gagal:")
+            print(traceback.format_exc())
+            error = str(e) or type(e).__name__
+        finally:
+            # Entry dilepas sebelum job ditandai selesai agar submit berikutnya
+            # tidak pernah diarahkan ke job yang sudah gagal; entry milik job
+            # pengganti (setelah stop) tidak ikut dihapus
+            with self._lock:
+                if self._inflight.get(job.key) == job.id:
+                    del self._inflight[job.key]
+            job._selesai(result, error)
+
+    def get(self, job_id):
+        """Job berdasarkan id, atau None jika tidak ada/kadaluarsa"""
+        with self._lock:
+            self._bersihkan()
+            return self._jobs.get(job_id)
+
+    def stop(self, job_id):
+        """Minta job berhenti lebih awal; None jika job tidak ada"""
+        job = self.get(job_id)
+        if job is not None:
+            job.stop()
+        return job
+
+    def stats(self):
+        """Ringkasan antrian untuk /health"""
+        with self._lock:
+            return {
+                "active": len(self._inflight),
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue
+            }
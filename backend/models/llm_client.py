@@ -0,0 +1,505 @@
+"""
+LLM client untuk Research Intelligence
+Client Groq dengan koneksi pooled, retry/backoff, cache label persisten dan backend offline
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "masukan_api_key_di_sini")  # Ganti dengan API key Groq Anda
+LABEL_MODEL = "llama-3.3-70b-versatile"
+
+# Naikkan jika prompt label berubah supaya cache lama tidak dipakai
+LABEL_PROMPT_VERSION = 1
+
+CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'save_models', 'llm_cache.sqlite'))
+
+# Status HTTP yang layak dicoba ulang
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Batas mode batch: perkiraan token prompt per request dan jumlah topik per request
+BATCH_MAX_PROMPT_TOKENS = 3000
+BATCH_MAX_TOPICS = 40
+# Perkiraan token jawaban per topik ("id": "label" maksimal 5 kata)
+BATCH_OUTPUT_TOKENS_PER_TOPIC = 20
+
+
+class GroqClient:
+    """
+    Client chat completion Groq dengan satu requests.Session bersama.
+
+    Koneksi TCP/TLS dipakai ulang lewat pool HTTPAdapter, dan request dicoba ulang
+    dengan exponential backoff (plus jitter, atau Retry-After dari server) untuk
+    429, 5xx, timeout dan error koneksi.
+    """
+
+    def __init__(self, api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, timeout=10,
+                 max_retries=2, backoff=0.5, pool_size=8):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def _jeda(self, percobaan, response=None):
+        """Lama tunggu sebelum percobaan berikutnya"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                return min(float(retry_after), 30.0)
+            except (TypeError, ValueError):
+                pass
+        return self.backoff * (2 ** percobaan) * (1 + random.random() * 0.25)
+
+    def chat(self, messages, model=LABEL_MODEL, temperature=0.2, max_tokens=None, timeout=None,
+             max_retries=None):
+        """
+        Kirim chat completion.
+
+        Args:
+            timeout: Timeout per percobaan (None = self.timeout)
+            max_retries: Jumlah percobaan ulang (None = self.max_retries)
+
+        Returns:
+            str: Isi jawaban, atau None jika gagal setelah semua percobaan
+        """
+        payload = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+
+        if max_retries is None:
+            max_retries = self.max_retries
+        for percobaan in range(max_retries + 1):
+            terakhir = percobaan == max_retries
+            try:
+                response = self.session.post(self.base_url, json=payload, timeout=timeout or self.timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                print(f"Request error ({percobaan + 1}/{max_retries + 1}): {e}")
+                if terakhir:
+                    return None
+                time.sleep(self._jeda(percobaan))
+                continue
+            except requests.exceptions.RequestException as e:
+                print(f"Request error: {e}")
+                return None
+
+            if response.status_code == 200:
+                return response.json()['choices'][0]['message']['content']
+            if response.status_code in RETRY_STATUS and not terakhir:
+                print(f"API Error {response.status_code}, mencoba ulang ({percobaan + 1}/{max_retries + 1})")
+                time.sleep(self._jeda(percobaan, response))
+                continue
+            print(f"API Error: {response.status_code} {response.text[:200]}")
+            return None
+        return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """GroqClient bersama per proses (pool koneksi dipakai semua request)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GroqClient()
+        return _client
+
+
+class LabelCache:
+    """Cache label persisten (SQLite) dengan key hash dari backend dan kata representasi"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS topic_labels ("
+                "key TEXT PRIMARY KEY, label TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        # Koneksi per operasi: aman dipakai dari banyak thread/proses
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(cache_id, words):
+        return hashlib.sha1(json.dumps([cache_id, list(words)], ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """dict key -> label untuk key yang ada di cache"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        hasil = {}
+        with self._connect() as conn:
+            for mulai in range(0, len(keys), 500):
+                bagian = keys[mulai:mulai + 500]
+                rows = conn.execute(
+                    f"SELECT key, label FROM topic_labels WHERE key IN ({','.join('?' * len(bagian))})", bagian
+                ).fetchall()
+                hasil.update(rows)
+        return hasil
+
+    def set_many(self, items):
+        """Simpan pasangan (key, label)"""
+        sekarang = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO topic_labels (key, label, created_at) VALUES (?, ?, ?)",
+                [(key, label, sekarang) for key, label in items]
+            )
+
+
+class ResponseCache:
+    """
+    Cache jawaban LLM persisten (SQLite, satu tabel per jenis jawaban).
+
+    Entry yang lebih tua dari ttl detik dianggap tidak ada, dan jika jumlah entry
+    melebihi max_entries entry tertua dihapus saat set().
+    """
+
+    def __init__(self, table, path=CACHE_PATH, ttl=None, max_entries=None):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Nama tabel cache tidak valid: {table}")
+        self.table = table
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(*parts):
+        return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Nilai (hasil json.loads) atau None jika tidak ada/kadaluarsa"""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        return json.loads(value)
+
+    def set(self, key, value):
+        sekarang = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), sekarang)
+            )
+            if self.ttl is not None:
+                conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (sekarang - self.ttl,))
+            if self.max_entries is not None:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key NOT IN "
+                    f"(SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT ?)",
+                    (int(self.max_entries),)
+                )
+
+
+def buat_prompt_label(words):
+    """Prompt label satu topik dari kata representasinya"""
+    return f"""Generate a short and clear topic label (maximum 5 words) based on the following keywords:
+{words}
+The label must:
+- Be in English
+- Accurately represent the core meaning of the keywords
+- Be concise and descriptive
+- Return only the label text (no explanations)"""
+
+
+def perkiraan_token(teks):
+    """Perkiraan kasar jumlah token (±4 karakter per token untuk teks Inggris)"""
+    return len(teks) // 4 + 1
+
+
+def _baris_topik(tid, words):
+    return f"{int(tid)}: {', '.join(str(w) for w in words)}"
+
+
+def buat_prompt_label_batch(topic_words):
+    """Prompt label banyak topik sekaligus dengan jawaban JSON topic_id -> label"""
+    daftar = "\n".join(_baris_topik(tid, words) for tid, words in topic_words.items())
+    return f"""Generate a short and clear topic label (maximum 5 words) for each topic below, based on its keywords.
+Each line is "<topic_id>: <keywords>".
+
+{daftar}
+
+Each label must:
+- Be in English
+- Accurately represent the core meaning of the keywords
+- Be concise and descriptive
+
+Return only a JSON object mapping every topic_id (as a string) to its label, for example:
+{{"0": "Label for topic 0", "1": "Label for topic 1"}}"""
+
+
+def bagi_per_token(topic_words, max_prompt_tokens=BATCH_MAX_PROMPT_TOKENS, max_topics=BATCH_MAX_TOPICS):
+    """
+    Bagi topik menjadi beberapa batch agar perkiraan token prompt tiap batch tidak
+    melebihi max_prompt_tokens dan jumlah topiknya tidak melebihi max_topics.
+
+    Returns:
+        list: List dict topic_id -> kata representasi
+    """
+    dasar = perkiraan_token(buat_prompt_label_batch({}))
+    batches, sekarang, token = [], {}, dasar
+    for tid, words in topic_words.items():
+        biaya = perkiraan_token(_baris_topik(tid, words)) + 1
+        if sekarang and (token + biaya > max_prompt_tokens or len(sekarang) >= max_topics):
+            batches.append(sekarang)
+            sekarang, token = {}, dasar
+        sekarang[tid] = words
+        token += biaya
+    if sekarang:
+        batches.append(sekarang)
+    return batches
+
+
+def _ekstrak_json(teks):
+    """Ambil objek/array JSON dari jawaban LLM (boleh dibungkus ``` atau teks lain)"""
+    if not teks:
+        return None
+    teks = re.sub(r"^```(?:json)?\s*|\s*```$", "", teks.strip())
+    try:
+        return json.loads(teks)
+    except json.JSONDecodeError:
+        pass
+    cocok = re.search(r"\{.*\}|\[.*\]", teks, re.DOTALL)
+    if cocok:
+        try:
+            return json.loads(cocok.group(0))
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def parse_label_batch(teks, topic_ids):
+    """
+    Validasi jawaban batch: hanya id yang diminta dengan label teks tidak kosong.
+
+    Menerima {"id": "label"} atau [{"topic_id": id, "label": "..."}].
+
+    Returns:
+        dict: topic_id -> label untuk id yang valid
+    """
+    data = _ekstrak_json(teks)
+    if isinstance(data, list):
+        data = {
+            str(item.get("topic_id", item.get("id"))): item.get("label")
+            for item in data if isinstance(item, dict)
+        }
+    if not isinstance(data, dict):
+        return {}
+
+    per_id = {str(int(tid)): tid for tid in topic_ids}
+    labels = {}
+    for key, label in data.items():
+        tid = per_id.get(str(key).strip())
+        if tid is None or not isinstance(label, str):
+            continue
+        label = label.strip().strip('"').strip()
+        if label and len(label) <= 100:
+            labels[tid] = label
+    return labels
+
+
+class GroqLabelBackend:
+    """Label topik lewat Groq: satu chat completion per batch topik, atau per topik"""
+
+    def __init__(self, client=None, model=LABEL_MODEL):
+        self.client = client or get_groq_client()
+        self.model = model
+        self.cache_id = f"groq:{model}:v{LABEL_PROMPT_VERSION}"
+
+    def label_one(self, words):
+        content = self.client.chat(
+            [{"role": "user", "content": buat_prompt_label(words)}],
+            model=self.model, temperature=0.2, max_tokens=20
+        )
+        if not content:
+            return None
+        return content.strip().strip('"').strip()
+
+    def label_batch(self, topic_words):
+        """Label satu batch topik dalam satu request; id yang tidak valid tidak dikembalikan"""
+        content = self.client.chat(
+            [{"role": "user", "content": buat_prompt_label_batch(topic_words)}],
+            model=self.model, temperature=0.2,
+            max_tokens=BATCH_OUTPUT_TOKENS_PER_TOPIC * len(topic_words) + 32
+        )
+        labels = parse_label_batch(content, topic_words.keys())
+        if content and not labels:
+            print("Jawaban batch label tidak valid (bukan JSON topic_id -> label)")
+        return labels
+
+
+class KeywordLabelBackend:
+    """
+    Backend offline: label dari kata representasi teratas (tanpa jaringan).
+
+    latency (detik) mensimulasikan waktu respons LLM untuk benchmark dan pengujian.
+    """
+
+    def __init__(self, n_words=3, latency=0.0):
+        self.n_words = n_words
+        self.latency = latency
+        self.cache_id = f"keyword:{n_words}"
+
+    def _label(self, words):
+        kata = []
+        for word in words:
+            for token in str(word).split():
+                if token.lower() not in kata:
+                    kata.append(token.lower())
+        if not kata:
+            return None
+        return " ".join(k.title() for k in kata[:self.n_words])
+
+    def label_one(self, words):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._label(words)
+
+    def label_batch(self, topic_words):
+        # Satu "request" untuk seluruh batch
+        if self.latency:
+            time.sleep(self.latency)
+        labels = {tid: self._label(words) for tid, words in topic_words.items()}
+        return {tid: label for tid, label in labels.items() if label}
+
+
+class TopicLabeler:
+    """
+    Label banyak topik sekaligus: cek cache persisten, lalu panggil backend secara
+    paralel (maksimal max_workers request bersamaan) hanya untuk topik yang belum
+    ada di cache. Topik yang gagal diberi label 'Topic <id>' dan tidak di-cache.
+
+    Dengan batch=True topik dikemas ke sedikit request (dibagi per perkiraan token,
+    lihat bagi_per_token) dan hanya id yang hilang/tidak valid di jawaban batch yang
+    dilabeli ulang satu per satu.
+    """
+
+    def __init__(self, backend, cache=None, max_workers=8, batch=True,
+                 max_prompt_tokens=BATCH_MAX_PROMPT_TOKENS, max_topics=BATCH_MAX_TOPICS):
+        self.backend = backend
+        self.cache = cache
+        self.max_workers = max(1, int(max_workers))
+        self.batch = batch
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_topics = max_topics
+
+    def _label_batch(self, topic_words):
+        """Label lewat request batch; topik yang tidak terjawab tidak ada di hasil"""
+        batches = bagi_per_token(topic_words, self.max_prompt_tokens, self.max_topics)
+        print(f"Labeling batch: {len(topic_words)} topik dalam {len(batches)} request")
+        hasil = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for labels in executor.map(self.backend.label_batch, batches):
+                hasil.update(labels)
+        return hasil
+
+    def _label_satu_per_satu(self, topic_words):
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(topic_words))) as executor:
+            hasil = executor.map(self.backend.label_one, topic_words.values())
+            return {tid: label for tid, label in zip(topic_words, hasil) if label}
+
+    def label(self, topic_words):
+        """
+        Args:
+            topic_words: dict topic_id -> list kata representasi
+
+        Returns:
+            dict: topic_id -> label
+        """
+        keys = {tid: LabelCache.key(self.backend.cache_id, words) for tid, words in topic_words.items()}
+        cached = self.cache.get_many(set(keys.values())) if self.cache is not None else {}
+
+        labels = {tid: cached[key] for tid, key in keys.items() if key in cached}
+        belum = [tid for tid in topic_words if tid not in labels]
+        print(f"Label cache: {len(labels)} topik dari cache, {len(belum)} topik perlu dilabeli")
+
+        if belum:
+            hasil = {}
+            sisa = {tid: topic_words[tid] for tid in belum}
+            if self.batch and hasattr(self.backend, "label_batch"):
+                hasil = self._label_batch(sisa)
+                sisa = {tid: words for tid, words in sisa.items() if tid not in hasil}
+                if sisa:
+                    print(f"{len(sisa)} topik tidak ada di jawaban batch, dilabeli satu per satu")
+            if sisa:
+                hasil.update(self._label_satu_per_satu(sisa))
+
+            baru = []
+            for tid in belum:
+                label = hasil.get(tid)
+                if label:
+                    labels[tid] = label
+                    baru.append((keys[tid], label))
+                    print(f"Topic {tid}: {label}")
+                else:
+                    labels[tid] = f"Topic {tid}"
+            if baru and self.cache is not None:
+                self.cache.set_many(baru)
+
+        return labels
+
+
+_label_cache = None
+
+
+def get_topic_labeler(backend=None, max_workers=None):
+    """
+    TopicLabeler dengan konfigurasi dari environment.
+
+    LABEL_BACKEND: 'groq' (default) atau 'keyword' (offline)
+    LABEL_CONCURRENCY: jumlah request label bersamaan (default 8)
+    LABEL_MODE: 'batch' (default, banyak topik per request) atau 'single'
+    """
+    global _label_cache
+    backend = backend or os.environ.get("LABEL_BACKEND", "groq")
+    max_workers = max_workers or int(os.environ.get("LABEL_CONCURRENCY", 8))
+
+    if backend == "groq":
+        backend_obj = GroqLabelBackend()
+    elif backend == "keyword":
+        backend_obj = KeywordLabelBackend()
+    else:
+        raise ValueError(f"Backend label tidak dikenali: {backend}")
+
+    with _client_lock:
+        if _label_cache is None:
+            _label_cache = LabelCache()
+    batch = os.environ.get("LABEL_MODE", "batch") == "batch"
+    return TopicLabeler(backend_obj, cache=_label_cache, max_workers=max_workers, batch=batch)
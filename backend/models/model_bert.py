@@ -1,32 +1,59 @@
 import os
-import re
 import numpy as np
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from tqdm import tqdm
-from joblib import Parallel, delayed
-from sklearn.feature_extraction.text import CountVectorizer
 from bertopic import BERTopic
 from hdbscan import HDBSCAN
-from sentence_transformers import SentenceTransformer
-from umap import UMAP
-from gensim.models.coherencemodel import CoherenceModel
 from gensim.corpora.dictionary import Dictionary
-from bertopic.representation import KeyBERTInspired
-import joblib
-import requests
-import json
+from bertopic.cluster import BaseCluster
 from .preprocessing import preprocess_dataframe,simple_tokenizer
-import torch
+from .model_registry import get_embedding_model, get_pipeline_models, EMBEDDING_MODEL_NAME
+from .embedding_store import encode_with_cache
+from .cluster_sweep import (
+    sweep_min_cluster_size, reduce_embeddings, CachedReduction, kunci_assignment, DEFAULT_MIN_SAMPLES
+)
+from .llm_client import get_topic_labeler
+from .incremental import rencana_incremental, ringkasan_rencana
 import plotly.io as pio
 import plotly.express as px
 
 
-def bertopic_analysis(df):
+def _tanpa_progress(stage, current=None, total=None, **detail):
+    """Callback progress default (tidak melakukan apa-apa)"""
+
+
+def bertopic_analysis(df, sweep_workers=None, sweep_strategy="grid", sweep_stride=3,
+                      min_samples=DEFAULT_MIN_SAMPLES,
+                      progress=None, stop_event=None, preprocessed=False, tokenize_workers=0,
+                      base=None, max_change=0.25, max_outlier_shift=0.15, max_drift=0.1):
+    """
+    Analisis BERTopic: embeddings, sweep min_cluster_size dan plot coherence
+
+    Args:
+        df: pandas DataFrame dengan kolom Title dan Abstract
+        sweep_workers: Jumlah proses sweep (None = semua core, 1 = sekuensial)
+        sweep_strategy: 'grid' (semua kandidat) atau 'coarse' (stride lalu refine)
+        sweep_stride: Jarak kandidat tahap kasar untuk strategi 'coarse'
+        min_samples: min_samples HDBSCAN tetap untuk semua kandidat; hierarki
+            HDBSCAN dihitung sekali untuk seluruh sweep. Default DEFAULT_MIN_SAMPLES
+            mengubah clustering dibanding sebelumnya; None = min_samples ikut
+            min_cluster_size (MST dihitung per kandidat)
+        progress: Callback progress(stage, current, total, **detail) untuk job queue
+        stop_event: threading.Event opsional untuk menghentikan sweep lebih awal;
+            hasil dihitung dari kandidat yang sudah dievaluasi
+        preprocessed: True jika df sudah melewati preprocess_dataframe
+            (misalnya dari CorpusStore), sehingga tidak dibersihkan ulang
+        tokenize_workers: Jumlah proses tokenisasi coherence (0 = nonaktif, None = semua core)
+        base: cache_data analisis BERTopic sebelumnya untuk korpus yang mirip; jika
+            diisi, analisis dijalankan inkremental: hanya baris baru yang di-encode
+            dan di-assign ke topik lama, tanpa fit ulang UMAP/HDBSCAN
+        max_change, max_outlier_shift, max_drift: Batas analisis inkremental; jika
+            terlampaui, analisis di-fit ulang penuh (lihat rencana_incremental)
+    """
+    progress = progress or _tanpa_progress
     try:
-        df_processed = preprocess_dataframe(df)
+        df_processed = df if preprocessed else preprocess_dataframe(df)
         docs_series = df_processed['Title'].astype(str) + " " + df_processed['Abstract'].astype(str)
         docs = docs_series.tolist()
         n_docs = len(docs)
@@ -36,21 +63,47 @@ def bertopic_analysis(df):
             raise ValueError("Terlalu sedikit dokumen untuk analisis topic modeling")
 
         print("Membuat embeddings...")
-        device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        embedding_model = SentenceTransformer("all-MiniLM-L6-v2", device=device)
-        embeddings = embedding_model.encode(docs, show_progress_bar=True, batch_size=64, device=device)
-
+        progress("loading_models")
         try:
-            umap_model = joblib.load("save_models/umap_model.joblib")
-            vectorizer_model = joblib.load("save_models/vectorizer_model.joblib")
-            ctfidf_model = joblib.load("save_models/ctfidf_model.joblib")
-            representation_model = KeyBERTInspired()
+            embedding_model = get_embedding_model()
+            models = get_pipeline_models()
+            umap_model = models["umap_model"]
+            vectorizer_model = models["vectorizer_model"]
+            ctfidf_model = models["ctfidf_model"]
         except Exception as e:
             print(f"Error loading models: {e}")
             return {"error": f"Model files tidak ditemukan: {str(e)}", "plot_html": None}
 
+        def encode(texts):
+            # Hanya dokumen yang belum pernah di-encode yang dikirim ke model
+            return encode_with_cache(
+                embedding_model,
+                EMBEDDING_MODEL_NAME,
+                texts,
+                batch_size=64,
+                dtype=os.environ.get('EMBEDDING_CACHE_DTYPE', 'float32'),
+                progress=progress
+            )
+
+        rencana = None
+        if base is not None:
+            progress("incremental")
+            rencana = rencana_incremental(docs, base, encode, max_change=max_change,
+                                          max_outlier_shift=max_outlier_shift, max_drift=max_drift)
+            if rencana["dipakai"]:
+                print(f"Analisis inkremental: {rencana['baris_baru']} baris baru, "
+                      f"{rencana['baris_hilang']} baris dihapus")
+            else:
+                print(f"Analisis inkremental tidak dipakai, fit ulang penuh: {rencana['alasan']}")
+
+        if rencana is not None and rencana["dipakai"]:
+            embeddings = rencana["embeddings"]
+        else:
+            embeddings = encode(docs)
+
         print("Tokenizing documents...")
-        docs_tokenized = simple_tokenizer(docs)
+        progress("tokenizing")
+        docs_tokenized = simple_tokenizer(docs, n_workers=tokenize_workers)
         dictionary = Dictionary(docs_tokenized)
 
         # Step 6: Tentukan range min_cluster_size berdasarkan jumlah dokumen
@@ -79,71 +132,65 @@ def bertopic_analysis(df):
         else:
             min_cluster_range = range(50, 85)
 
+        fixed_labels = None
+        if rencana is not None and rencana["dipakai"]:
+            # UMAP dan label HDBSCAN dari korpus lama; baris baru sudah diproyeksikan dan di-assign
+            umap_model = base["fitted_umap"]
+            reduced_embeddings = rencana["reduced_embeddings"]
+            cached_umap = CachedReduction(reduced_embeddings, embeddings, umap_model)
+            min_samples = base.get("min_samples")
+            min_cluster_range = rencana["min_cluster_range"]
+            fixed_labels = rencana["fixed_labels"]
+        else:
+            # UMAP hanya di-fit sekali; setiap kandidat HDBSCAN memakai proyeksi yang sama
+            print("Reduksi dimensi UMAP...")
+            progress("umap")
+            reduced_embeddings, cached_umap = reduce_embeddings(umap_model, embeddings)
+
         print(f"Evaluasi min_cluster_size: {list(min_cluster_range)}")
 
-        def evaluate_min_cluster(min_cluster):
-            try:
-                hdbscan_model = HDBSCAN(
-                    min_cluster_size=min_cluster,
-                    metric='euclidean',
-                    cluster_selection_method='eom',
-                    prediction_data=False,
-                    core_dist_n_jobs=-2
-                )
-                topic_model = BERTopic(
-                    embedding_model=embedding_model,
-                    umap_model=umap_model,
-                    hdbscan_model=hdbscan_model,
-                    vectorizer_model=vectorizer_model,
-                    ctfidf_model=ctfidf_model,
-                    verbose=False
-                )
-                topic_model.fit(docs, embeddings)
-                topic_words = []
-                topic_freq = topic_model.get_topic_freq()
-                topic_ids = topic_freq[(topic_freq['Count'] >= 5) & (topic_freq['Topic'] != -1)]['Topic'].tolist()
-                topic_ids = [t for t in topic_ids if t != -1]
-                for topic_id in topic_ids:
-                    words = topic_model.get_topic(topic_id)
-                    if isinstance(words, list):
-                        topic_words.append([word for word, _ in words])
-                if len(topic_words) > 1:
-                    coherence_model = CoherenceModel(
-                        topics=topic_words,
-                        texts=docs_tokenized,
-                        dictionary=dictionary,
-                        coherence='c_v',
-                        processes=1,
-                        topn=15
-                    )
-                    coherence = coherence_model.get_coherence()
-                    return (min_cluster, coherence, topic_model)
-                else:
-                    return (min_cluster, np.nan, None)
-            except Exception as e:
-                print(f"min_cluster_size = {min_cluster} → ERROR: {str(e)}")
-                return (min_cluster, np.nan, None)
-
-        results = []
-        for m in tqdm(min_cluster_range, desc="Evaluating cluster sizes"):
-            result = evaluate_min_cluster(m)
-            results.append(result)
+        results = sweep_min_cluster_size(
+            docs=docs,
+            embeddings=embeddings,
+            docs_tokenized=docs_tokenized,
+            dictionary=dictionary,
+            models={
+                "umap_model": cached_umap,
+                "vectorizer_model": vectorizer_model,
+                "ctfidf_model": ctfidf_model,
+            },
+            min_cluster_range=min_cluster_range,
+            embedding_model=embedding_model,
+            n_workers=sweep_workers,
+            strategy=sweep_strategy,
+            stride=sweep_stride,
+            min_samples=min_samples,
+            progress=progress,
+            stop_event=stop_event,
+            fixed_labels=fixed_labels
+        )
 
+        progress("plot")
         best_score = -1
         best_size = None
-        best_model = None
 
         # Simpan opsi cluster yang valid untuk dropdown
         valid_clusters = []
+
+        # Label HDBSCAN per ukuran dari sweep: generate topics untuk ukuran ini tidak fit ulang
+        topic_assignments = {
+            kunci_assignment(docs, min_cluster, min_samples): labels
+            for min_cluster, _, labels in results
+            if labels is not None
+        }
         
-        for min_cluster, coherence, model in results:
+        for min_cluster, coherence, _ in results:
             if not np.isnan(coherence):
                 print(f"min_cluster_size = {min_cluster} → Coherence = {coherence:.4f}")
                 valid_clusters.append(min_cluster)
                 if coherence > best_score:
                     best_score = coherence
                     best_size = min_cluster
-                    best_model = model
             else:
                 print(f"min_cluster_size = {min_cluster} → Tidak cukup topik atau error")
 
@@ -184,15 +231,16 @@ def bertopic_analysis(df):
 
             plot_html = pio.to_html(fig, full_html=False, include_plotlyjs='cdn', div_id="coherence-plot")
 
-        # Siapkan data untuk cache (untuk generate topics nanti)
+        # Siapkan data untuk cache (untuk generate topics nanti).
+        # Model tidak ikut di-cache: generate topics mengambil salinan baru dari registry.
         cache_data = {
             "docs": docs,
             "embeddings": embeddings,
-            "embedding_model": embedding_model,
-            "umap_model": umap_model,
-            "vectorizer_model": vectorizer_model,
-            "ctfidf_model": ctfidf_model,
-            "representation_model": representation_model,
+            "reduced_embeddings": reduced_embeddings,
+            "fitted_umap": umap_model,
+            "min_samples": min_samples,
+            "topic_assignments": topic_assignments,
+            "best_min_cluster_size": best_size,
         }
 
         return {
@@ -202,6 +250,8 @@ def bertopic_analysis(df):
                 "coherence_score": best_score
             },
             "cluster_options": sorted(valid_clusters),  # Kirim opsi cluster yang valid
+            "stopped_early": stop_event is not None and stop_event.is_set(),
+            "incremental": ringkasan_rencana(rencana) if rencana is not None else None,
             "cache_data": cache_data  # Data untuk di-cache
         }
 
@@ -217,40 +267,95 @@ def bertopic_analysis(df):
 def generate_topics_with_label(
     docs,
     embeddings,
-    embedding_model,
-    umap_model,
-    vectorizer_model,
-    ctfidf_model,
-    representation_model,
-    min_cluster_size
+    min_cluster_size,
+    reduced_embeddings=None,
+    fitted_umap=None,
+    min_samples=None,
+    embedding_model=None,
+    umap_model=None,
+    vectorizer_model=None,
+    ctfidf_model=None,
+    representation_model=None,
+    topic_assignments=None,
+    progress=None
 ):
+    """
+    Fit BERTopic final untuk min_cluster_size pilihan user, reduksi outlier dan label Groq.
+
+    Jika topic_assignments (dict dari cache_data bertopic_analysis) sudah berisi label
+    HDBSCAN untuk korpus, min_cluster_size dan min_samples yang sama, clustering tidak
+    diulang: label dipakai lewat BaseCluster sehingga hanya c-TF-IDF, reduksi outlier
+    dan labeling yang dijalankan. Label dari fit baru disimpan ke dict yang sama.
+    """
+    progress = progress or _tanpa_progress
     try:
         print(f"Generating topics with min_cluster_size: {min_cluster_size}")
+
+        # Komponen yang tidak diberikan diambil dari registry (salinan per request)
+        models = get_pipeline_models()
+        if embedding_model is None:
+            embedding_model = get_embedding_model()
+        if umap_model is None and reduced_embeddings is not None:
+            # Pakai proyeksi UMAP dari analisis, tanpa fit ulang
+            umap_model = CachedReduction(reduced_embeddings, embeddings, fitted_umap)
+        if umap_model is None:
+            umap_model = models["umap_model"]
+        if vectorizer_model is None:
+            vectorizer_model = models["vectorizer_model"]
+        if ctfidf_model is None:
+            ctfidf_model = models["ctfidf_model"]
+        if representation_model is None:
+            representation_model = models["representation_model"]
         
-        # Buat model HDBSCAN baru dengan parameter yang dipilih user
-        hdbscan_model = HDBSCAN(
-            min_cluster_size=min_cluster_size,
-            metric='euclidean',
-            cluster_selection_method='eom',
-            prediction_data=True
-        )
+        kunci = kunci_assignment(docs, min_cluster_size, min_samples)
+        labels = topic_assignments.get(kunci) if topic_assignments is not None else None
+
+        if labels is not None:
+            # Ukuran ini sudah dievaluasi di sweep: label HDBSCAN dipakai apa adanya.
+            # Representasi akhir berasal dari update_topics (c-TF-IDF), jadi
+            # representation_model dan probabilitas tidak diperlukan.
+            print("Memakai topic assignment dari sweep (tanpa fit ulang HDBSCAN)")
+            topic_model = BERTopic(
+                embedding_model=embedding_model,
+                umap_model=umap_model,
+                hdbscan_model=BaseCluster(),
+                vectorizer_model=vectorizer_model,
+                ctfidf_model=ctfidf_model,
+                verbose=True
+            )
 
-        # Buat model BERTopic dengan semua komponen yang sudah ada
-        topic_model = BERTopic(
-            embedding_model=embedding_model,
-            umap_model=umap_model,
-            hdbscan_model=hdbscan_model,
-            vectorizer_model=vectorizer_model,
-            ctfidf_model=ctfidf_model,
-            representation_model=representation_model,
-            calculate_probabilities=True,
-            verbose=True
-        )
+            progress("fitting", cached=True)
+            topics, probs = topic_model.fit_transform(docs, embeddings, y=np.asarray(labels))
+        else:
+            # Buat model HDBSCAN baru dengan parameter yang dipilih user
+            hdbscan_model = HDBSCAN(
+                min_cluster_size=min_cluster_size,
+                min_samples=min_samples,
+                metric='euclidean',
+                cluster_selection_method='eom',
+                prediction_data=True
+            )
+
+            # Buat model BERTopic dengan semua komponen yang sudah ada
+            topic_model = BERTopic(
+                embedding_model=embedding_model,
+                umap_model=umap_model,
+                hdbscan_model=hdbscan_model,
+                vectorizer_model=vectorizer_model,
+                ctfidf_model=ctfidf_model,
+                representation_model=representation_model,
+                calculate_probabilities=True,
+                verbose=True
+            )
 
-        print("Fitting topic model...")
-        topics, probs = topic_model.fit_transform(docs, embeddings)
+            print("Fitting topic model...")
+            progress("fitting")
+            topics, probs = topic_model.fit_transform(docs, embeddings)
+            if topic_assignments is not None:
+                topic_assignments[kunci] = np.asarray(hdbscan_model.labels_, dtype=np.int32)
         
         print("Reducing outliers...")
+        progress("reducing_outliers")
         new_topics = topic_model.reduce_outliers(docs, topics, strategy="distributions")
         topic_model.update_topics(docs, topics=new_topics, vectorizer_model=vectorizer_model)
 
@@ -259,6 +364,7 @@ def generate_topics_with_label(
         
         # Generate labels menggunakan Groq API
         print("Generating labels with Groq API...")
+        progress("labeling", 0, int((topic_info['Topic'] != -1).sum()))
         auto_labels = generate_labels_with_groq(topic_info)
 
         # Update topic info dengan labels
@@ -277,48 +383,18 @@ def generate_topics_with_label(
         }
 
 
-def generate_labels_with_groq(topic_info):
-    """Generate labels untuk setiap topik menggunakan Groq API"""
-    auto_labels = {}
-    api_key = "masukan_api_key_di_sini"  # Ganti dengan API key Groq Anda
-    base_url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-
-    for _, row in topic_info.iterrows():
-        topic_id = row["Topic"]
-        if topic_id == -1:
-            continue  # Skip outlier topics
-
-        words = row["Representation"]
-        prompt = f"""Generate a short and clear topic label (maximum 5 words) based on the following keywords:
-{words}
-The label must:
-- Be in English
-- Accurately represent the core meaning of the keywords
-- Be concise and descriptive
-- Return only the label text (no explanations)"""
-
-        payload = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
-            "max_tokens": 20
-        }
-
-        try:
-            response = requests.post(base_url, headers=headers, json=payload, timeout=10)
-            if response.status_code == 200:
-                label = response.json()['choices'][0]['message']['content'].strip()
-                auto_labels[topic_id] = label
-                print(f"Topic {topic_id}: {label}")
-            else:
-                print(f"API Error for topic {topic_id}: {response.status_code}")
-                auto_labels[topic_id] = f"Topic {topic_id}"
-        except Exception as e:
-            print(f"Error generating label for topic {topic_id}: {str(e)}")
-            auto_labels[topic_id] = f"Topic {topic_id}"
+def generate_labels_with_groq(topic_info, labeler=None):
+    """
+    Generate labels untuk setiap topik (selain outlier).
 
-    return auto_labels
\ No newline at end of file
+    Label diambil dari cache persisten bila kata representasinya sudah pernah
+    dilabeli; sisanya dikirim paralel lewat TopicLabeler (backend dari env
+    LABEL_BACKEND, default Groq).
+    """
+    labeler = labeler or get_topic_labeler()
+    topic_words = {
+        row["Topic"]: list(row["Representation"])
+        for _, row in topic_info.iterrows()
+        if row["Topic"] != -1  # Skip outlier topics
+    }
+    return labeler.label(topic_words)
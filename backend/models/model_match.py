@@ -5,14 +5,20 @@ Handles keyword matching analysis dengan RapidFuzz, lalu grouping pakai Groq API
 
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import ast
-from rapidfuzz import fuzz
-import requests
+import re
+from rapidfuzz import fuzz, process
 from backend.models.preprocessing import preprocess_dataframe, combine_title_abstract
+from backend.models.llm_client import GROQ_API_KEY, GROQ_BASE_URL, ResponseCache, get_groq_client
+from backend.models.process_pool import mp_context
 import matplotlib.pyplot as plt
 from io import BytesIO
 import base64
 import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 # ==============================
 # BAGIAN 1: Utility Keyword Matching
@@ -28,10 +34,14 @@ def fix_and_eval_keywords(x):
             return []
     return []
 
+def _keyword_dataset_path():
+    """Path absolut dataset keyword ACM"""
+    data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'dataset'))
+    return os.path.join(data_path, 'topik_keyword_bersih_final.csv.xls')
+
 def load_cleaned_keywords():
     """Load CSV keyword ACM yang sudah dibersihkan"""
-    data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'dataset'))
-    dataset_path = os.path.join(data_path, 'topik_keyword_bersih_final.csv.xls')
+    dataset_path = _keyword_dataset_path()
 
     if not os.path.exists(dataset_path):
         raise FileNotFoundError(f"File tidak ditemukan: {dataset_path}")
@@ -41,62 +51,378 @@ def load_cleaned_keywords():
     return df_topik
 
 
+def _iter_topik_keywords(df_topik):
+    """Pasangan (topik, keywords lowercase) dari DataFrame topik atau KeywordMatcher"""
+    if isinstance(df_topik, KeywordMatcher):
+        # Keyword sudah lowercase, cukup iris per offset topik
+        yield from df_topik.iter_topik_keywords()
+        return
+
+    for _, row in df_topik.iterrows():
+        keywords = row['Keywords'] if isinstance(row['Keywords'], list) else []
+        yield row['Topik_Utama'], [kw.lower() for kw in keywords if isinstance(kw, str)]
+
+
 def cari_bidang_ilmu_terbaik_dengan_fallback(text, df_topik, threshold=80):
-    """Cari bidang ilmu terbaik berdasarkan kemiripan keyword"""
+    """Cari bidang ilmu terbaik berdasarkan kemiripan keyword (df_topik boleh KeywordMatcher)"""
     teks = text.lower()
     skor_tertinggi = 0
     topik_terbaik = None
     topik_di_atas_threshold = None
     skor_di_atas_threshold = 0
     
-    for _, row in df_topik.iterrows():
-        topik = row['Topik_Utama']
-        keywords = row['Keywords'] if isinstance(row['Keywords'], list) else []
-        
+    for topik, keywords in _iter_topik_keywords(df_topik):
         for kw in keywords:
-            if isinstance(kw, str):
-                skor = fuzz.partial_ratio(teks, kw.lower())
-                if skor > skor_tertinggi:
-                    skor_tertinggi = skor
-                    topik_terbaik = topik
-                if skor >= threshold and skor > skor_di_atas_threshold:
-                    skor_di_atas_threshold = skor
-                    topik_di_atas_threshold = topik
+            skor = fuzz.partial_ratio(teks, kw)
+            if skor > skor_tertinggi:
+                skor_tertinggi = skor
+                topik_terbaik = topik
+            if skor >= threshold and skor > skor_di_atas_threshold:
+                skor_di_atas_threshold = skor
+                topik_di_atas_threshold = topik
     
     return topik_di_atas_threshold if topik_di_atas_threshold else topik_terbaik
 
 
+# Toleransi floating point untuk batas atas skor partial_ratio
+_SKOR_EPS = 1e-6
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class KeywordMatcher:
+    """
+    Matcher keyword ACM yang dikompilasi sekali dari tabel topik.
+
+    Keyword disimpan datar (sudah lowercase) bersama inverted index token -> keyword.
+    Untuk setiap dokumen, keyword yang token jangkarnya muncul di dokumen diskor
+    lebih dulu; keyword lain hanya diskor jika batas atas skornya (dihitung dari
+    jumlah karakter bersama) masih bisa menyamai skor terbaik. Untuk banyak
+    dokumen sekaligus tersedia match_batch yang menskor matriks dokumen x keyword
+    dengan rapidfuzz.process.cdist. Kedua jalur identik dengan
+    cari_bidang_ilmu_terbaik_dengan_fallback.
+    """
+
+    def __init__(self, df_topik):
+        self.topik = []
+        self.keywords = []
+        keyword_topik_id = []
+
+        for _, row in df_topik.iterrows():
+            self.topik.append(row['Topik_Utama'])
+            keywords = row['Keywords'] if isinstance(row['Keywords'], list) else []
+            for kw in keywords:
+                if isinstance(kw, str):
+                    self.keywords.append(kw.lower())
+                    keyword_topik_id.append(len(self.topik) - 1)
+
+        # Vektor keyword -> id topik (indeks ke self.topik)
+        self.keyword_topik_id = np.array(keyword_topik_id, dtype=np.int32)
+        self._build_index()
+
+    def to_table(self):
+        """Tabel keyword datar (topik, keywords, keyword_topik_id) untuk dikirim ke worker"""
+        return (tuple(self.topik), self.keywords, self.keyword_topik_id)
+
+    @classmethod
+    def from_table(cls, table):
+        """Bangun ulang matcher dari hasil to_table tanpa membaca ulang DataFrame"""
+        matcher = cls.__new__(cls)
+        topik, keywords, keyword_topik_id = table
+        matcher.topik = list(topik)
+        matcher.keywords = tuple(keywords)
+        matcher.keyword_topik_id = keyword_topik_id
+        matcher._build_index()
+        return matcher
+
+    def iter_topik_keywords(self):
+        """Iterasi (topik, tuple keyword lowercase) sesuai urutan dataset"""
+        for topik_id, topik in enumerate(self.topik):
+            mulai, akhir = self.topik_offsets[topik_id], self.topik_offsets[topik_id + 1]
+            yield topik, self.keywords[mulai:akhir]
+
+    def _build_index(self):
+        """Bangun offset topik, inverted index token jangkar dan matriks jumlah karakter keyword"""
+        self.keywords = tuple(self.keywords)
+        # Keyword satu topik bersebelahan: keywords[offsets[i]:offsets[i+1]] milik topik i
+        self.topik_offsets = np.searchsorted(
+            self.keyword_topik_id, np.arange(len(self.topik) + 1), side='left'
+        )
+
+        token_per_kw = [set(_TOKEN_RE.findall(kw)) for kw in self.keywords]
+
+        # Frekuensi token antar keyword, token paling jarang dipakai sebagai jangkar
+        frekuensi = {}
+        for tokens in token_per_kw:
+            for tok in tokens:
+                frekuensi[tok] = frekuensi.get(tok, 0) + 1
+
+        self.index = {}
+        for kw_id, tokens in enumerate(token_per_kw):
+            if not tokens:
+                continue
+            jangkar = min(tokens, key=lambda t: (frekuensi[t], -len(t), t))
+            self.index.setdefault(jangkar, []).append(kw_id)
+
+        # Matriks jumlah karakter: baris = keyword, kolom = karakter dalam alfabet keyword
+        self.alfabet = sorted({c for kw in self.keywords for c in kw})
+        posisi = {c: i for i, c in enumerate(self.alfabet)}
+        self.char_counts = np.zeros((len(self.keywords), len(self.alfabet)), dtype=np.int32)
+        for kw_id, kw in enumerate(self.keywords):
+            for c in kw:
+                self.char_counts[kw_id, posisi[c]] += 1
+        self.kw_lengths = np.array([len(kw) for kw in self.keywords], dtype=np.int32)
+
+    def _batas_atas(self, teks):
+        """
+        Batas atas partial_ratio(teks, kw) untuk semua keyword.
+
+        Setiap alignment dengan panjang jendela i menghasilkan 200*m/(n+i) dengan
+        m <= min(i, C), C = jumlah karakter bersama dan n = panjang string terpendek,
+        sehingga skor tidak mungkin melebihi 200*C/(n+C).
+        """
+        doc_counts = np.array([teks.count(c) for c in self.alfabet], dtype=np.int32)
+        bersama = np.minimum(self.char_counts, doc_counts).sum(axis=1)
+        terpendek = np.minimum(self.kw_lengths, len(teks))
+        penyebut = terpendek + bersama
+        with np.errstate(divide='ignore', invalid='ignore'):
+            batas = np.where(penyebut > 0, 200.0 * bersama / penyebut, 0.0)
+        return batas
+
+    def cari_bidang_ilmu(self, text, threshold=80):
+        """Cari bidang ilmu terbaik untuk satu dokumen (semantik sama dengan versi loop)"""
+        teks = text.lower()
+        skor = {}
+
+        # Tahap 1: skor 100 hanya mungkin jika keyword muncul utuh di teks
+        exact = self._cari_exact(teks)
+        if exact is not None:
+            skor[exact] = 100.0
+            return self._pilih_topik(skor, 100.0, threshold)
+
+        # Tahap 2: skor keyword kandidat dari inverted index
+        for tok in set(_TOKEN_RE.findall(teks)):
+            for kw_id in self.index.get(tok, ()):
+                if kw_id not in skor:
+                    skor[kw_id] = fuzz.partial_ratio(teks, self.keywords[kw_id])
+        skor_tertinggi = max(skor.values(), default=0)
+
+        # Tahap 3: keyword sisa diurutkan berdasarkan batas atas, berhenti jika tidak bisa menyamai
+        batas = self._batas_atas(teks)
+        sisa = np.flatnonzero(batas >= skor_tertinggi - _SKOR_EPS)
+        for kw_id in sisa[np.argsort(-batas[sisa], kind='stable')]:
+            if batas[kw_id] < skor_tertinggi - _SKOR_EPS:
+                break
+            kw_id = int(kw_id)
+            if kw_id in skor:
+                continue
+            skor[kw_id] = fuzz.partial_ratio(
+                teks, self.keywords[kw_id], score_cutoff=max(skor_tertinggi - _SKOR_EPS, 0)
+            )
+            if skor[kw_id] > skor_tertinggi:
+                skor_tertinggi = skor[kw_id]
+
+        return self._pilih_topik(skor, skor_tertinggi, threshold)
+
+    def _cari_exact(self, teks):
+        """
+        Indeks keyword pertama yang skornya pasti 100, atau None.
+
+        Untuk needle <= 64 karakter partial_ratio dijamin optimal, sehingga skor 100
+        setara dengan substring utuh. Keyword yang lebih panjang tetap diskor normal.
+        """
+        if not teks:
+            return None
+        for kw_id, kw in enumerate(self.keywords):
+            if not kw:
+                continue
+            pendek, panjang = (kw, teks) if len(kw) <= len(teks) else (teks, kw)
+            if len(pendek) <= 64:
+                if pendek in panjang:
+                    return kw_id
+            elif fuzz.partial_ratio(teks, kw) == 100:
+                return kw_id
+        return None
+
+    def _pilih_topik(self, skor, skor_tertinggi, threshold):
+        """Pilih keyword pertama dengan skor tertinggi dari skor yang sudah dihitung"""
+        if skor_tertinggi <= 0:
+            return None
+        kw_terbaik = min(kw_id for kw_id, s in skor.items() if s == skor_tertinggi)
+        return self._topik_dari_skor(kw_terbaik, skor_tertinggi, threshold)
+
+    def _topik_dari_skor(self, kw_terbaik, skor_tertinggi, threshold):
+        """Terapkan aturan fallback threshold pada keyword pertama dengan skor tertinggi"""
+        if skor_tertinggi <= 0:
+            return None
+        topik_terbaik = self.topik[self.keyword_topik_id[kw_terbaik]]
+        topik_di_atas_threshold = topik_terbaik if skor_tertinggi >= threshold else None
+        return topik_di_atas_threshold if topik_di_atas_threshold else topik_terbaik
+
+    def match_many(self, docs, threshold=80):
+        """Cari bidang ilmu untuk banyak dokumen sekaligus (satu dokumen per iterasi)"""
+        return [self.cari_bidang_ilmu(text, threshold) for text in docs]
+
+    def match_batch(self, docs, threshold=80, chunk_size=256, workers=-1):
+        """
+        Cari bidang ilmu dengan menskor seluruh batch dokumen x keyword sekaligus.
+
+        Dokumen diproses per chunk sehingga memori matriks skor dibatasi
+        chunk_size x jumlah keyword (float64). argmax NumPy mengembalikan indeks
+        pertama dari skor maksimum, sama dengan perbandingan '>' pada versi loop.
+
+        Args:
+            docs: List teks dokumen
+            threshold: Ambang skor untuk fallback
+            chunk_size: Jumlah dokumen per pemanggilan cdist
+            workers: Jumlah thread rapidfuzz (-1 = semua core)
+
+        Returns:
+            list: Bidang ilmu ACM per dokumen (None jika tidak ada yang cocok)
+        """
+        if not self.keywords:
+            return [None] * len(docs)
+
+        hasil = []
+        for mulai in range(0, len(docs), chunk_size):
+            chunk = [text.lower() for text in docs[mulai:mulai + chunk_size]]
+            skor = process.cdist(
+                chunk,
+                self.keywords,
+                scorer=fuzz.partial_ratio,
+                dtype=np.float64,
+                workers=workers
+            )
+            kw_terbaik = skor.argmax(axis=1)
+            skor_tertinggi = skor[np.arange(len(chunk)), kw_terbaik]
+            hasil.extend(
+                self._topik_dari_skor(kw_id, s, threshold)
+                for kw_id, s in zip(kw_terbaik, skor_tertinggi)
+            )
+        return hasil
+
+
+# Cache taksonomi keyword ACM per proses, dimuat ulang jika mtime dataset berubah
+_taksonomi_lock = threading.Lock()
+_taksonomi_cache = {"path": None, "mtime": None, "matcher": None}
+
+
+def get_keyword_matcher():
+    """
+    KeywordMatcher dari dataset keyword ACM yang di-cache per proses.
+
+    Dataset dibaca dan di-parse (ast.literal_eval) hanya sekali; request berikutnya
+    memakai keyword datar yang sudah lowercase. Jika mtime file berubah, cache
+    dimuat ulang secara otomatis.
+    """
+    dataset_path = _keyword_dataset_path()
+    if not os.path.exists(dataset_path):
+        raise FileNotFoundError(f"File tidak ditemukan: {dataset_path}")
+    mtime = os.stat(dataset_path).st_mtime_ns
+
+    with _taksonomi_lock:
+        cache = _taksonomi_cache
+        if cache["matcher"] is None or cache["path"] != dataset_path or cache["mtime"] != mtime:
+            print("Memuat taksonomi keyword ACM...")
+            cache["matcher"] = KeywordMatcher(load_cleaned_keywords())
+            cache["path"] = dataset_path
+            cache["mtime"] = mtime
+        return cache["matcher"]
+
+
+# Matcher milik proses worker, diisi sekali oleh _init_match_worker
+_worker_matcher = None
+_worker_engine = None
+
+
+def _init_match_worker(table_bytes, engine):
+    """Initializer ProcessPoolExecutor: unpickle tabel keyword sekali per worker"""
+    global _worker_matcher, _worker_engine
+    _worker_matcher = KeywordMatcher.from_table(pickle.loads(table_bytes))
+    _worker_engine = engine
+
+
+def _match_shard(docs):
+    """Cocokkan satu shard dokumen di dalam proses worker"""
+    if _worker_engine == "batch":
+        # Satu thread per proses agar tidak oversubscribe core
+        return _worker_matcher.match_batch(docs, workers=1)
+    return _worker_matcher.match_many(docs)
+
+
+def match_parallel(matcher, docs, engine="batch", n_workers=None, shard_size=2000):
+    """
+    Jalankan keyword matching di ProcessPoolExecutor.
+
+    Tabel keyword di-pickle sekali di proses utama lalu dikirim ke setiap worker
+    lewat initializer, sehingga setiap task hanya membawa shard dokumen.
+    Urutan hasil sama dengan urutan docs.
+
+    Args:
+        matcher: KeywordMatcher yang sudah dibangun
+        docs: List teks dokumen
+        engine: 'batch' atau 'index'
+        n_workers: Jumlah proses (None = os.cpu_count())
+        shard_size: Jumlah dokumen per task
+
+    Returns:
+        list: Bidang ilmu ACM per dokumen
+    """
+    table_bytes = pickle.dumps(matcher.to_table(), protocol=pickle.HIGHEST_PROTOCOL)
+    shards = [docs[i:i + shard_size] for i in range(0, len(docs), shard_size)]
+
+    hasil = []
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=mp_context(__name__),
+        initializer=_init_match_worker,
+        initargs=(table_bytes, engine)
+    ) as executor:
+        for shard_hasil in executor.map(_match_shard, shards):
+            hasil.extend(shard_hasil)
+    return hasil
+
+
 # ==============================
 # BAGIAN 2: Pemanggilan Groq API
 # ==============================
-api_key =  "masukan_api_key_di_sini"  # Ganti dengan API key Groq Anda
-base_url = "https://api.groq.com/openai/v1/chat/completions"
-
-def get_groq_response(prompt, model="llama3-70b-8192"):
-    """Panggil Groq API untuk dapatkan jawaban AI"""
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant for research topic classification and grouping."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.3
-    }
-    
-    try:
-        response = requests.post(base_url, headers=headers, json=data, timeout=30)
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
-        else:
-            print("Error:", response.status_code, response.text)
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
-        return None
+api_key = GROQ_API_KEY  # Set lewat env GROQ_API_KEY
+base_url = GROQ_BASE_URL
+
+GROUP_MODEL = "llama3-70b-8192"
+# Naikkan jika generate_prompt berubah supaya hasil grouping lama di cache tidak dipakai
+GROUP_PROMPT_VERSION = 1
+
+# /generate_groups menunggu Groq secara sinkron: satu percobaan tanpa retry dengan
+# batas GROUP_TIMEOUT detik, setelah itu grouping fallback dipakai
+GROUP_TIMEOUT = float(os.environ.get('GROUP_TIMEOUT', 20))
+
+_group_cache = None
+_group_cache_lock = threading.Lock()
+
+
+def get_group_cache():
+    """
+    Cache persisten hasil grouping (GROUP_CACHE_TTL detik, default 7 hari;
+    maksimal GROUP_CACHE_MAX_ENTRIES entry, default 1000)
+    """
+    global _group_cache
+    with _group_cache_lock:
+        if _group_cache is None:
+            _group_cache = ResponseCache(
+                "field_groups",
+                ttl=int(os.environ.get('GROUP_CACHE_TTL', 7 * 24 * 3600)),
+                max_entries=int(os.environ.get('GROUP_CACHE_MAX_ENTRIES', 1000))
+            )
+        return _group_cache
+
+
+def get_groq_response(prompt, model=GROUP_MODEL):
+    """Panggil Groq API untuk dapatkan jawaban AI (koneksi pooled, tanpa retry, batas GROUP_TIMEOUT)"""
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant for research topic classification and grouping."},
+        {"role": "user", "content": prompt}
+    ]
+    return get_groq_client().chat(messages, model=model, temperature=0.3, timeout=GROUP_TIMEOUT, max_retries=0)
 
 def generate_prompt(fields, n_groups=5):
     """Buat prompt grouping ke Groq API"""
@@ -182,14 +508,69 @@ def parse_groq_response(response_text):
 # ==============================
 # BAGIAN 3: Proses Keyword Matching + Groq Grouping
 # ==============================
-def keyword_matching(df):
-    """Jalankan proses keyword matching dan kembalikan DataFrame hasil"""
-    df_topik = load_cleaned_keywords()
-    df_processed = preprocess_dataframe(df)
+# Penanda baris yang belum punya hasil di base_df (None adalah hasil match yang valid)
+_BELUM_DI_MATCH = object()
+
+
+def match_dengan_basis(docs, match_fn, base_df=None):
+    """
+    Bidang ilmu per dokumen; jika base_df (hasil matching sebelumnya) diberikan,
+    dokumen dengan teks yang sama memakai Bidang_Ilmu_ACM lama dan hanya dokumen
+    baru yang dikirim ke match_fn.
+    """
+    if base_df is None or 'Bidang_Ilmu_ACM' not in base_df.columns:
+        return match_fn(docs)
+
+    lama = dict(zip(combine_title_abstract(base_df), base_df['Bidang_Ilmu_ACM']))
+    hasil = [lama.get(doc, _BELUM_DI_MATCH) for doc in docs]
+    baru = [i for i, bidang in enumerate(hasil) if bidang is _BELUM_DI_MATCH]
+    print(f"Matching inkremental: {len(baru)} dari {len(docs)} dokumen baru")
+    if baru:
+        for i, bidang in zip(baru, match_fn([docs[i] for i in baru])):
+            hasil[i] = bidang
+    return hasil
+
+
+def _match_dokumen(matcher, docs, engine, chunk_size, n_workers, shard_size):
+    """Bidang ilmu per dokumen dengan engine dan mode paralel yang dipilih"""
+    if n_workers != 0 and len(docs) > shard_size:
+        hasil = match_parallel(matcher, docs, engine=engine, n_workers=n_workers, shard_size=shard_size)
+    elif engine == "batch":
+        hasil = matcher.match_batch(docs, chunk_size=chunk_size)
+    else:
+        hasil = matcher.match_many(docs)
+    return hasil
+
+
+def keyword_matching(df, engine="batch", chunk_size=256, n_workers=0, shard_size=2000, preprocessed=False,
+                     base_df=None):
+    """
+    Jalankan proses keyword matching dan kembalikan DataFrame hasil
+
+    Args:
+        df: pandas DataFrame dengan kolom Title dan Abstract
+        engine: 'batch' (cdist semua core) atau 'index' (inverted index, satu core)
+        chunk_size: Jumlah dokumen per batch untuk engine 'batch'
+        n_workers: Jumlah proses untuk mode paralel (0 = nonaktif, None = semua core)
+        shard_size: Jumlah dokumen per task pada mode paralel
+        preprocessed: True jika df sudah melewati preprocess_dataframe
+            (misalnya dari CorpusStore), sehingga tidak dibersihkan ulang
+        base_df: Hasil keyword_matching sebelumnya untuk korpus yang mirip; baris
+            dengan teks yang sama memakai Bidang_Ilmu_ACM lama dan hanya baris baru
+            yang di-match
+    """
+    df_processed = df.copy() if preprocessed else preprocess_dataframe(df)
     docs = combine_title_abstract(df_processed)
     
-    hasil = [cari_bidang_ilmu_terbaik_dengan_fallback(text, df_topik) for text in docs]
-    df_processed['Bidang_Ilmu_ACM'] = hasil
+    matcher = get_keyword_matcher()
+    if engine not in ("batch", "index"):
+        raise ValueError(f"Engine keyword matching tidak dikenali: {engine}")
+
+    df_processed['Bidang_Ilmu_ACM'] = match_dengan_basis(
+        docs,
+        lambda teks: _match_dokumen(matcher, teks, engine, chunk_size, n_workers, shard_size),
+        base_df
+    )
     
     return df_processed
 
@@ -211,7 +592,13 @@ def get_top_n_fields(df_processed, n=10):
     return top_fields.index.tolist(), top_fields.to_dict()
 
 def group_fields_with_groq(df_or_series, n_groups=5):
-    """Group bidang ilmu dengan Groq API"""
+    """
+    Group bidang ilmu dengan Groq API.
+
+    Hasil yang berhasil di-parse disimpan di cache persisten dengan key
+    (top fields terurut, n_groups, model, versi prompt), sehingga kombinasi yang
+    sama tidak memanggil Groq lagi. Grouping fallback tidak di-cache.
+    """
     # Handle both DataFrame and Series input
     if isinstance(df_or_series, pd.Series):
         df_processed = pd.DataFrame({'Bidang_Ilmu_ACM': df_or_series})
@@ -227,6 +614,13 @@ def group_fields_with_groq(df_or_series, n_groups=5):
             "fields": []
         }]
     
+    cache = get_group_cache()
+    cache_key = ResponseCache.key(sorted(top_fields), int(n_groups), GROUP_MODEL, GROUP_PROMPT_VERSION)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        print(f"Grouping {n_groups} kelompok diambil dari cache")
+        return cached
+
     prompt = generate_prompt(top_fields, n_groups)
     response = get_groq_response(prompt)
     
@@ -239,6 +633,7 @@ def group_fields_with_groq(df_or_series, n_groups=5):
     if not parsed_groups:
         return create_fallback_groups(top_fields, field_counts, n_groups)
     
+    cache.set(cache_key, parsed_groups)
     return parsed_groups
 
 def create_fallback_groups(fields, field_counts, n_groups):
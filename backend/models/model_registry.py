@@ -0,0 +1,125 @@
+"""
+Model registry untuk Research Intelligence
+Memuat SentenceTransformer dan artefak joblib sekali per proses lalu dibagi antar request
+"""
+
+import copy
+import os
+import threading
+import time
+
+import joblib
+import torch
+from sentence_transformers import SentenceTransformer
+from sklearn.base import clone
+from bertopic.representation import KeyBERTInspired
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+SAVE_MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'save_models'))
+
+# Artefak joblib yang dipakai pipeline BERTopic
+JOBLIB_MODELS = ("umap_model", "vectorizer_model", "ctfidf_model")
+
+_lock = threading.RLock()
+_models = {}
+_status = {
+    "ready": False,
+    "warming_up": False,
+    "error": None,
+    "load_seconds": {}
+}
+
+
+def _load_model(name):
+    """Muat satu artefak dari disk (tanpa cache)"""
+    if name == "embedding_model":
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        return SentenceTransformer(EMBEDDING_MODEL_NAME, device=device)
+    if name in JOBLIB_MODELS:
+        return joblib.load(os.path.join(SAVE_MODELS_DIR, f"{name}.joblib"))
+    raise KeyError(f"Model tidak dikenal: {name}")
+
+
+def get_model(name):
+    """
+    Ambil model bersama dari registry, dimuat sekali per proses.
+
+    Objek yang dikembalikan dipakai bersama semua request dan tidak boleh
+    di-fit ulang; gunakan get_pipeline_models() untuk salinan per request.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(name)
+        if model is None:
+            mulai = time.perf_counter()
+            model = _load_model(name)
+            _models[name] = model
+            _status["load_seconds"][name] = round(time.perf_counter() - mulai, 3)
+            print(f"✓ Model '{name}' dimuat ({_status['load_seconds'][name]} s)")
+    return model
+
+
+def get_embedding_model():
+    """SentenceTransformer bersama (hanya untuk encode, aman dipakai antar thread)"""
+    return get_model("embedding_model")
+
+
+def _clone_model(model):
+    """Salinan belum di-fit dengan parameter yang sama; fallback ke deepcopy"""
+    try:
+        return clone(model)
+    except Exception:
+        return copy.deepcopy(model)
+
+
+def get_pipeline_models():
+    """
+    Komponen BERTopic untuk satu analisis.
+
+    UMAP, vectorizer dan c-TF-IDF adalah clone dari model bersama sehingga fit
+    per request tidak mengubah objek di registry.
+
+    Returns:
+        dict: umap_model, vectorizer_model, ctfidf_model, representation_model
+    """
+    models = {name: _clone_model(get_model(name)) for name in JOBLIB_MODELS}
+    models["representation_model"] = KeyBERTInspired()
+    return models
+
+
+def warm_up():
+    """Muat semua model lebih awal (dipanggil saat aplikasi start)"""
+    with _lock:
+        if _status["ready"] or _status["warming_up"]:
+            return
+        _status["warming_up"] = True
+
+    try:
+        for name in ("embedding_model",) + JOBLIB_MODELS:
+            get_model(name)
+        with _lock:
+            _status["ready"] = True
+            _status["error"] = None
+    except Exception as e:
+        print(f"Error warm-up model: {e}")
+        with _lock:
+            _status["error"] = str(e)
+    finally:
+        with _lock:
+            _status["warming_up"] = False
+
+
+def readiness():
+    """Status registry untuk endpoint /health"""
+    with _lock:
+        loaded = sorted(_models.keys())
+        return {
+            "ready": _status["ready"] or len(loaded) == 1 + len(JOBLIB_MODELS),
+            "warming_up": _status["warming_up"],
+            "loaded": loaded,
+            "load_seconds": dict(_status["load_seconds"]),
+            "error": _status["error"]
+        }
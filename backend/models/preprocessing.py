@@ -7,11 +7,14 @@ import pandas as pd
 import re
 import numpy as np
 import re
-from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import nltk
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .process_pool import mp_context
 
 def remove_copyright(text):
     """
@@ -38,6 +41,100 @@ def remove_copyright(text):
         return text
 
 
+# ==============================
+# Pola pembersihan abstract (dikompilasi sekali saat import)
+# ==============================
+# Label-label struktural
+STRUCTURAL_LABELS = [
+    r'Design/methodology/approach:',
+    r'Originality/value:',
+    r'Purpose:',
+    r'Findings:',
+    r'Research limitations:',
+    r'Practical implications:',
+    r'Social implications:',
+    r'Managerial implications:'
+]
+
+# Informasi editorial atau publikasi
+EDITORIAL_PATTERNS = [
+    r'Copyright:',
+    r'corrected-proof ts1',
+    r'Peer review.*?responsibility.*?\.',
+    r'©.*?All rights reserved\.'
+]
+
+# Bagian metadata & keywords
+METADATA_PATTERNS = [
+    r'Keywords?:.*',
+    r'Article info.*'
+]
+
+# Setiap pola dipasangkan dengan potongan literal (huruf kecil) yang wajib ada
+# agar pola itu bisa cocok; pola hanya dijalankan jika potongannya ditemukan
+_POLA_BERJANGKAR = [
+    (re.compile(pola, re.IGNORECASE), jangkar)
+    for pola, jangkar in zip(
+        STRUCTURAL_LABELS + EDITORIAL_PATTERNS + METADATA_PATTERNS,
+        [
+            'design/methodology/approach:', 'originality/value:', 'purpose:', 'findings:',
+            'research limitations:', 'practical implications:', 'social implications:',
+            'managerial implications:',
+            'copyright:', 'corrected-proof ts1', 'peer review', '©',
+            'keyword', 'article info'
+        ]
+    )
+]
+
+def _huruf_kecil(text):
+    """Versi huruf kecil text untuk mencari potongan literal pola"""
+    lower = text.lower()
+    if lower.isascii():
+        return lower
+    # Karakter non-ASCII yang dengan re.IGNORECASE cocok dengan huruf ASCII tetapi
+    # tidak menjadi huruf tersebut lewat lower(): 'K' (Kelvin) sudah menjadi 'k',
+    # 'İ' menjadi 'i' + U+0307, sisanya 'ı' dan 'ſ'. Menghapus U+0307 lain hanya
+    # bisa menambah kecocokan potongan, tidak pernah menghilangkannya
+    return lower.replace('\u0307', '').replace('ı', 'i').replace('ſ', 's')
+
+
+def _hapus_pola(text):
+    """
+    Jalankan pola label/editorial/metadata berurutan seperti semula.
+
+    Pola tidak digabung menjadi satu alternation karena penghapusan satu pola
+    bisa membentuk kecocokan baru untuk pola berikutnya (misalnya
+    'FindPurpose:ings:'); sebagai gantinya pola dilewati jika potongan
+    literalnya tidak ada, sehingga abstract biasa cukup dicek dengan `in`.
+    """
+    lower = _huruf_kecil(text)
+    for pola, jangkar in _POLA_BERJANGKAR:
+        if jangkar in lower:
+            hasil = pola.sub('', text)
+            if hasil != text:
+                text = hasil
+                lower = _huruf_kecil(text)
+    return text
+
+
+def _bersihkan_teks(text):
+    """clean_abstract untuk str yang sudah pasti tidak null"""
+    # LANGKAH 1: Hapus copyright terlebih dahulu (prioritas utama)
+    copyright_pos = text.find('©')
+    if copyright_pos != -1:
+        text = text[:copyright_pos].rstrip()
+
+    # LANGKAH 2-4: Hapus label struktural, info editorial dan metadata
+    text = _hapus_pola(text)
+
+    # LANGKAH 5: Hapus karakter non-ASCII
+    if not text.isascii():
+        text = text.encode('ascii', 'ignore').decode('ascii')
+
+    # LANGKAH 6: Normalisasi spasi (split() memakai definisi whitespace yang sama dengan \s)
+    return ' '.join(text.split())
+
+
 def clean_abstract(text):
     """
     Membersihkan abstract dari berbagai elemen yang tidak dibutuhkan
@@ -48,54 +145,33 @@ def clean_abstract(text):
     Returns:
         str: Cleaned abstract text
     """
-    if pd.isnull(text):
+    if not isinstance(text, str) and pd.isnull(text):
         return ""
-    
-    # LANGKAH 1: Hapus copyright terlebih dahulu (prioritas utama)
-    text = remove_copyright(text)
-    
-    # LANGKAH 2: Hapus label-label struktural
-    structural_labels = [
-        r'Design/methodology/approach:',
-        r'Originality/value:',
-        r'Purpose:',
-        r'Findings:',
-        r'Research limitations:',
-        r'Practical implications:',
-        r'Social implications:',
-        r'Managerial implications:'
-    ]
-    
-    for label in structural_labels:
-        text = re.sub(label, '', text, flags=re.IGNORECASE)
-    
-    # LANGKAH 3: Hapus informasi editorial atau publikasi
-    editorial_patterns = [
-        r'Copyright:',
-        r'corrected-proof ts1',
-        r'Peer review.*?responsibility.*?\.',
-        r'©.*?All rights reserved\.'
-    ]
-    
-    for pattern in editorial_patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-
-    # LANGKAH 4: Hapus bagian metadata & keywords
-    metadata_patterns = [
-        r'Keywords?:.*',
-        r'Article info.*'
-    ]
-    
-    for pattern in metadata_patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    return _bersihkan_teks(text)
 
-    # LANGKAH 5: Hapus karakter non-ASCII
-    text = re.sub(r'[^\x00-\x7F]+', '', text)
 
-    # LANGKAH 6: Normalisasi spasi
-    text = re.sub(r'\s+', ' ', text)
+def clean_series(series):
+    """
+    clean_abstract untuk satu kolom sekaligus (tanpa overhead Series.apply)
+    
+    Args:
+        series: pandas Series berisi teks mentah
+        
+    Returns:
+        pandas Series: Teks bersih dengan index yang sama
+    """
+    return pd.Series(
+        [_bersihkan_teks(text) if isinstance(text, str) else clean_abstract(text) for text in series],
+        index=series.index,
+        name=series.name
+    )
 
-    return text.strip()
+
+# Alternatif nama kolom yang diterima validate_dataframe
+COLUMN_ALIASES = {
+    'Title': ['title', 'Title', 'TITLE', 'paper_title', 'document_title'],
+    'Abstract': ['abstract', 'Abstract', 'ABSTRACT', 'abs', 'summary']
+}
 
 
 def validate_dataframe(df):
@@ -116,14 +192,9 @@ def validate_dataframe(df):
     
     if missing_columns:
         # Cek alternatif nama kolom
-        alt_mapping = {
-            'Title': ['title', 'Title', 'TITLE', 'paper_title', 'document_title'],
-            'Abstract': ['abstract', 'Abstract', 'ABSTRACT', 'abs', 'summary']
-        }
-        
         for req_col in missing_columns[:]:  # Copy list to avoid modification during iteration
             found = False
-            for alt_col in alt_mapping.get(req_col, []):
+            for alt_col in COLUMN_ALIASES.get(req_col, []):
                 if alt_col in df.columns:
                     df[req_col] = df[alt_col]
                     missing_columns.remove(req_col)
@@ -162,12 +233,12 @@ def preprocess_dataframe(df):
 
     # Proses kolom Abstract
     if 'Abstract' in df.columns:
-        df['Abstract'] = df['Abstract'].apply(clean_abstract)
+        df['Abstract'] = clean_series(df['Abstract'])
         print("✓ Kolom 'Abstract' telah diproses")
     
     # Proses kolom Title (jika ada)
     if 'Title' in df.columns:
-        df['Title'] = df['Title'].apply(clean_abstract)
+        df['Title'] = clean_series(df['Title'])
         print("✓ Kolom 'Title' telah diproses")
 
     # Hapus baris yang null/kosong di Title atau Abstract
@@ -336,13 +407,69 @@ except LookupError:
 
 stop_words = set(stopwords.words("english"))
 lemmatizer = WordNetLemmatizer()
-def simple_tokenizer(texts):
+# Token yang dipecah dua oleh word_tokenize (kontraksi MacIntyre di NLTKWordTokenizer)
+# pada teks yang hanya berisi huruf dan spasi; aturan word_tokenize lain butuh tanda baca
+_KONTRAKSI = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+_BUKAN_HURUF = re.compile(r'[^a-zA-Z\s]')
+
+# Jumlah kata berbeda yang hasil lemmatize-nya diingat
+LEMMA_CACHE_SIZE = 200000
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def lemma_verba(word):
+    """WordNet lemma (pos='v') satu kata, di-cache per kata berbeda"""
+    return lemmatizer.lemmatize(word, pos='v')
+
+
+def tokenize_dokumen(doc):
+    """
+    Token satu dokumen untuk coherence.
+
+    Setelah semua karakter selain huruf dibuang, word_tokenize hanya memecah
+    spasi dan kontraksi di _KONTRAKSI, jadi cukup str.split(); tokennya sama.
+    """
+    tokens = []
+    for w in _BUKAN_HURUF.sub('', doc.lower()).split():
+        pecahan = _KONTRAKSI.get(w)
+        if pecahan is None:
+            tokens.append(w)
+        else:
+            tokens.extend(pecahan)
+    return [lemma_verba(w) for w in tokens if w not in stop_words and len(w) > 2]
+
+
+def _tokenize_shard(texts):
+    return [tokenize_dokumen(doc) for doc in texts]
+
+
+def simple_tokenizer(texts, n_workers=0, shard_size=5000):
+    """
+    Tokenisasi dokumen untuk coherence (lowercase, huruf saja, tanpa stopword, lemma verba)
+
+    Args:
+        texts: List teks dokumen
+        n_workers: Jumlah proses untuk mode paralel (0 = nonaktif, None = semua core)
+        shard_size: Jumlah dokumen per task pada mode paralel
+
+    Returns:
+        list: List token per dokumen, urutan sama dengan texts
+    """
+    texts = list(texts)
+    if n_workers == 0 or len(texts) <= shard_size:
+        return _tokenize_shard(texts)
+
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
     tokenized = []
-    for doc in texts:
-        doc = doc.lower()     
-        doc = re.sub(r'[^a-zA-Z\s]', '', doc)
-        doc = re.sub(r'\s+', ' ', doc).strip()  
-        tokens = word_tokenize(doc)
-        tokens = [lemmatizer.lemmatize(w, pos='v') for w in tokens if w not in stop_words and len(w) > 2]
-        tokenized.append(tokens)
-    return tokenized
\ No newline at end of file
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp_context(__name__)) as executor:
+        for shard_tokens in executor.map(_tokenize_shard, shards):
+            tokenized.extend(shard_tokens)
+    return tokenized
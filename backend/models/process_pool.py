@@ -0,0 +1,36 @@
+"""
+Process pool untuk Research Intelligence
+Start method bersama untuk ProcessPoolExecutor yang dibuat dari thread job server
+"""
+
+import multiprocessing
+import threading
+
+_preload = set()
+_preload_lock = threading.Lock()
+
+
+def mp_context(*preload):
+    """
+    Context multiprocessing untuk ProcessPoolExecutor.
+
+    Pool dibuat dari thread job saat torch, SentenceTransformer dan thread lain
+    sudah berjalan, jadi worker tidak di-fork langsung dari proses server.
+    forkserver dipakai jika tersedia, dengan modul preload (misalnya modul
+    yang mengimpor BERTopic) diimpor sekali di proses server-nya; selain itu
+    spawn. Preload hanya berlaku untuk modul yang didaftarkan sebelum
+    forkserver pertama kali dijalankan.
+
+    Args:
+        *preload: Nama modul yang diimpor sekali di proses forkserver
+
+    Returns:
+        multiprocessing context untuk argumen mp_context
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    ctx = multiprocessing.get_context('forkserver')
+    with _preload_lock:
+        _preload.update(preload)
+        ctx.set_forkserver_preload(sorted(_preload))
+    return ctx
@@ -0,0 +1,253 @@
+"""
+Upload store untuk Research Intelligence
+Menyimpan file upload secara content-addressed: body di-stream ke disk sambil di-hash, isi yang sama disimpan sekali
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Bukan POSIX (Windows): index hanya dikunci antar thread
+    fcntl = None
+
+# Ukuran potongan saat membaca file untuk hashing
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Ekstensi file yang diterima /upload
+UPLOAD_EXTENSIONS = ('.csv', '.xlsx')
+
+# File .part yang lebih tua dari ini dianggap sisa upload yang terputus
+STALE_PART_SECONDS = 24 * 3600
+
+
+def hash_file(filepath, chunk_size=UPLOAD_CHUNK_SIZE):
+    """sha1 isi file, dibaca per potongan"""
+    sha = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class HashingFile:
+    """
+    File sementara yang menghitung sha1 dan ukuran isinya selama ditulis.
+
+    Dipakai sebagai stream file parser multipart Werkzeug: setiap potongan body
+    upload langsung ditulis ke disk dan masuk ke hash, jadi file tidak perlu
+    dibaca ulang. File dihapus saat close() jika tidak dipindahkan lewat
+    UploadStore.add().
+    """
+
+    def __init__(self, tmp_dir):
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._sha = hashlib.sha1()
+        self.size = 0
+
+    def write(self, data):
+        self._sha.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        return self._file.flush()
+
+    def hexdigest(self):
+        return self._sha.hexdigest()
+
+    def close(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _pindahkan(self, target):
+        """Tutup file lalu pindahkan ke target (dipanggil UploadStore)"""
+        self._file.close()
+        os.replace(self.path, target)
+
+
+class UploadStore:
+    """
+    File upload yang disimpan per isi (blob) dengan nama sebagai alias.
+
+    Blob disimpan di `<root>/.blobs/<sha1><ext>` dan index nama -> blob di
+    `<root>/.index.json`. Upload dengan isi yang sudah ada hanya menambah alias
+    tanpa menyimpan ulang; blob dihapus saat alias terakhirnya dihapus. sha1 isi
+    file dipakai sebagai key cache downstream (artefak korpus, analysis cache,
+    job). File lama yang tersimpan langsung di root dipindahkan ke blob saat start.
+    Perubahan index dikunci antar thread dan antar proses server (flock pada
+    `<root>/.index.lock`).
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, '.blobs')
+        self.tmp_dir = os.path.join(root, '.tmp')
+        self.index_path = os.path.join(root, '.index.json')
+        self.lock_path = os.path.join(root, '.index.lock')
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._bersihkan_part()
+        self._migrasi()
+
+    # ----- index -----
+
+    @contextmanager
+    def _terkunci(self):
+        """Kunci read-modify-write index (dan blob-nya) antar thread dan antar proses"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _baca_index(self):
+        """Index dibaca ulang setiap operasi agar perubahan proses lain terlihat"""
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _tulis_index(self, index):
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.index_path)
+
+    def _bersihkan_part(self):
+        if not os.path.isdir(self.tmp_dir):
+            return
+        batas = time.time() - STALE_PART_SECONDS
+        for fname in os.listdir(self.tmp_dir):
+            fpath = os.path.join(self.tmp_dir, fname)
+            if os.path.getmtime(fpath) < batas:
+                os.remove(fpath)
+
+    def _migrasi(self):
+        """Pindahkan file upload format lama (langsung di root) ke blob"""
+        for fname in sorted(os.listdir(self.root)):
+            fpath = os.path.join(self.root, fname)
+            if fname.startswith('.') or not os.path.isfile(fpath):
+                continue
+            if not fname.lower().endswith(UPLOAD_EXTENSIONS):
+                continue
+            with self._terkunci():
+                if not os.path.exists(fpath):
+                    # Sudah dipindahkan proses lain
+                    continue
+                index = self._baca_index()
+                if fname not in index:
+                    digest = hash_file(fpath)
+                    index[fname] = self._entry_baru(index, digest, fname, os.path.getsize(fpath))
+                    target = self.path(index[fname])
+                    if os.path.exists(target):
+                        os.remove(fpath)
+                    else:
+                        os.replace(fpath, target)
+                    self._tulis_index(index)
+                    print(f"Upload '{fname}' dipindahkan ke blob {index[fname]['blob']}")
+
+    @staticmethod
+    def _entry_baru(index, digest, name, size):
+        """Entry alias baru; memakai blob yang sudah ada untuk isi yang sama"""
+        blob = next((e["blob"] for e in index.values() if e["hash"] == digest), None)
+        if blob is None:
+            blob = digest + os.path.splitext(name)[1].lower()
+        return {"hash": digest, "blob": blob, "size": size, "uploaded_at": time.time()}
+
+    # ----- operasi -----
+
+    def open_temp(self):
+        """File sementara untuk stream upload baru"""
+        return HashingFile(self.tmp_dir)
+
+    def add(self, name, upload):
+        """
+        Simpan upload yang sudah selesai di-stream dengan nama tertentu.
+
+        Args:
+            name: Nama file dari user
+            upload: HashingFile berisi body upload
+
+        Returns:
+            tuple: (entry, status) dengan status 'stored' (blob baru), 'alias'
+                (isi sama dengan file lain) atau 'duplicate' (nama sudah dipakai)
+        """
+        digest = upload.hexdigest()
+        with self._terkunci():
+            index = self._baca_index()
+            if name in index:
+                upload.close()
+                return dict(index[name], name=name), 'duplicate'
+
+            entry = self._entry_baru(index, digest, name, upload.size)
+            target = self.path(entry)
+            if os.path.exists(target):
+                upload.close()
+                status = 'alias'
+            else:
+                upload._pindahkan(target)
+                status = 'stored'
+            index[name] = entry
+            self._tulis_index(index)
+        return dict(entry, name=name), status
+
+    def get(self, name):
+        """Entry untuk nama file (hash, blob, size), atau None"""
+        with self._lock:
+            entry = self._baca_index().get(name)
+        return None if entry is None else dict(entry, name=name)
+
+    def path(self, entry):
+        """Path blob sebuah entry"""
+        return os.path.join(self.blob_dir, entry["blob"])
+
+    def list(self):
+        """Semua entry, urut sesuai waktu upload"""
+        with self._lock:
+            index = self._baca_index()
+        return sorted(
+            (dict(entry, name=name) for name, entry in index.items()),
+            key=lambda e: e["uploaded_at"]
+        )
+
+    def remove(self, name):
+        """
+        Hapus alias; blob ikut dihapus jika tidak ada alias lain.
+
+        Returns:
+            tuple: (entry atau None jika nama tidak ada, True jika blob dihapus)
+        """
+        with self._terkunci():
+            index = self._baca_index()
+            entry = index.pop(name, None)
+            if entry is None:
+                return None, False
+            orphan = all(e["blob"] != entry["blob"] for e in index.values())
+            if orphan and os.path.exists(self.path(entry)):
+                os.remove(self.path(entry))
+            self._tulis_index(index)
+        return dict(entry, name=name), orphan
@@ -0,0 +1,71 @@
+"""
+Benchmark matching bidang ilmu ACM: fuzzy (KeywordMatcher.match_batch) vs embedding (AcmEmbeddingClassifier)
+
+Mengukur waktu encode label ACM, encode dokumen dan klasifikasi embedding
+(perkalian matriks dokumen x label), waktu fuzzy matching pada sampel, lalu
+mencetak laporan kesepakatan kedua engine pada dokumen sampel.
+Jalankan dari root repo:
+    python -m benchmarks.bench_acm_embedding --docs 100000 --fuzzy-docs 500
+    python -m benchmarks.bench_acm_embedding --csv uploads/data.csv
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from backend.models.acm_embedding import AcmEmbeddingClassifier, laporan_kesepakatan
+from backend.models.model_match import KeywordMatcher, load_cleaned_keywords
+from backend.models.model_registry import get_embedding_model
+from backend.models.preprocessing import preprocess_dataframe, combine_title_abstract
+from benchmarks.bench_keyword_matching import buat_dokumen_sintetis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=100000, help="Jumlah dokumen sintetis")
+    parser.add_argument('--fuzzy-docs', type=int, default=500, help="Jumlah dokumen untuk fuzzy matching")
+    parser.add_argument('--csv', help="CSV upload (kolom Title/Abstract) sebagai pengganti dokumen sintetis")
+    args = parser.parse_args()
+
+    df_topik = load_cleaned_keywords()
+    matcher = KeywordMatcher(df_topik)
+    if args.csv:
+        docs = combine_title_abstract(preprocess_dataframe(pd.read_csv(args.csv)))
+    else:
+        docs = buat_dokumen_sintetis(df_topik, args.docs)
+    print(f"Dokumen: {len(docs)}")
+
+    model = get_embedding_model()
+    label_dir = tempfile.mkdtemp(prefix="acm_labels_")
+    try:
+        mulai = time.perf_counter()
+        classifier = AcmEmbeddingClassifier.from_matcher(matcher, model, label_dir=label_dir)
+        print(f"{'encode label':<24} {time.perf_counter() - mulai:8.2f} s  ({len(classifier.label_matrix)} label)")
+    finally:
+        shutil.rmtree(label_dir, ignore_errors=True)
+
+    mulai = time.perf_counter()
+    embeddings = model.encode(docs, batch_size=64, show_progress_bar=False)
+    print(f"{'encode dokumen':<24} {time.perf_counter() - mulai:8.2f} s  (sekali; berikutnya dari embedding cache)")
+
+    mulai = time.perf_counter()
+    hasil_embedding = classifier.klasifikasi(embeddings)
+    print(f"{'klasifikasi embedding':<24} {time.perf_counter() - mulai:8.2f} s")
+
+    sampel = docs[:args.fuzzy_docs]
+    mulai = time.perf_counter()
+    hasil_fuzzy = matcher.match_batch(sampel)
+    durasi = time.perf_counter() - mulai
+    print(f"{'fuzzy match_batch':<24} {durasi:8.2f} s  untuk {len(sampel)} dokumen "
+          f"(~{durasi / max(len(sampel), 1) * len(docs):.0f} s untuk semua dokumen)")
+
+    laporan = laporan_kesepakatan(hasil_fuzzy, hasil_embedding[:len(sampel)])
+    print(json.dumps(laporan, indent=1, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark ANN index: scan brute force vs IVFIndex
+
+Mengukur waktu build, build dari index korpus sebelumnya (dari_basis), latensi
+query (p50/p99) dan recall@k terhadap hasil eksak brute force, pada embedding
+sintetis 384 dimensi (seperti all-MiniLM-L6-v2) yang berkelompok per topik.
+Index dibuka memory-mapped dari disk seperti setelah restart.
+Jalankan dari root repo:
+    python -m benchmarks.bench_ann_index --docs 100000 --probes 8 24 64
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from backend.models.ann_index import IVFIndex, normalisasi
+
+
+def buat_embedding(n_docs, dim=384, n_topics=300, seed=0):
+    """Embedding per topik (pusat acak + noise) dengan ukuran topik tidak seragam"""
+    rng = np.random.default_rng(seed)
+    pusat = rng.normal(size=(n_topics, dim))
+    bobot = rng.dirichlet(np.ones(n_topics) * 0.5)
+    topik = rng.choice(n_topics, size=n_docs, p=bobot)
+    return (pusat[topik] + rng.normal(scale=1.2, size=(n_docs, dim))).astype(np.float32)
+
+
+def kunci(n_docs, offset=0):
+    return [f"{i + offset:016x}" for i in range(n_docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=100000, help="Jumlah dokumen")
+    parser.add_argument('--queries', type=int, default=200, help="Jumlah query")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--probes', type=int, nargs='+', default=[8, 24, 64], help="n_probe yang diukur")
+    args = parser.parse_args()
+
+    semua = buat_embedding(int(args.docs * 1.05) + args.queries)
+    embeddings = semua[:args.docs]
+    queries = semua[-args.queries:]
+    vectors = normalisasi(embeddings)
+    tmp = tempfile.mkdtemp(prefix="ann_bench_")
+    try:
+        mulai = time.perf_counter()
+        index = IVFIndex.build(embeddings, kunci(args.docs))
+        t_build = time.perf_counter() - mulai
+        index.save(f"{tmp}/base")
+        index = IVFIndex.load(f"{tmp}/base")
+        print(f"Dokumen: {args.docs}, list: {index.n_lists}, build {t_build:.2f} s")
+
+        # Korpus turunan: 5% baris baru
+        n_baru = int(args.docs * 0.05)
+        mulai = time.perf_counter()
+        turunan = IVFIndex.dari_basis(index, semua[:args.docs + n_baru], kunci(args.docs + n_baru))
+        print(f"dari_basis (+{n_baru} dokumen): {time.perf_counter() - mulai:.2f} s, {turunan.n_lists} list")
+
+        acuan, durasi = [], []
+        for q in queries:
+            mulai = time.perf_counter()
+            skor = vectors @ normalisasi(q)
+            top = np.argpartition(-skor, args.k - 1)[:args.k]
+            acuan.append(set(top[np.argsort(-skor[top])].tolist()))
+            durasi.append(time.perf_counter() - mulai)
+        ms = np.array(durasi) * 1000
+        print(f"{'brute force':<16} p50 {np.percentile(ms, 50):7.2f} ms  p99 {np.percentile(ms, 99):7.2f} ms")
+
+        for n_probe in args.probes:
+            durasi, recall = [], []
+            for q, eksak in zip(queries, acuan):
+                mulai = time.perf_counter()
+                ids, _ = index.search(q, k=args.k, n_probe=n_probe)
+                durasi.append(time.perf_counter() - mulai)
+                recall.append(len(eksak & set(ids.tolist())) / args.k)
+            ms = np.array(durasi) * 1000
+            print(f"{f'IVF n_probe={n_probe}':<16} p50 {np.percentile(ms, 50):7.2f} ms  "
+                  f"p99 {np.percentile(ms, 99):7.2f} ms  recall@{args.k}={np.mean(recall):.3f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark sweep HDBSCAN: fit independen vs hierarki yang dipakai ulang
+
+Membandingkan HDBSCAN(min_cluster_size=m, min_samples=k) yang di-fit terpisah untuk
+setiap m dengan HierarkiHDBSCAN yang menghitung MST sekali lalu hanya seleksi EOM per m,
+pada embedding tereduksi sintetis (5 dimensi, seperti output UMAP).
+Jalankan dari root repo:
+    python -m benchmarks.bench_hdbscan_sweep --sizes 1000 5000 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+from hdbscan import HDBSCAN
+
+from backend.models.cluster_sweep import HierarkiHDBSCAN
+
+
+def buat_embedding_tereduksi(n_docs, n_clusters=25, dim=5, seed=42):
+    """Blob gaussian dengan ukuran tidak seragam plus noise latar"""
+    rng = np.random.default_rng(seed)
+    pusat = rng.uniform(-10, 10, size=(n_clusters, dim))
+    bobot = rng.dirichlet(np.ones(n_clusters))
+    label = rng.choice(n_clusters, size=int(n_docs * 0.9), p=bobot)
+    titik = pusat[label] + rng.normal(scale=0.6, size=(len(label), dim))
+    noise = rng.uniform(-12, 12, size=(n_docs - len(label), dim))
+    return np.vstack([titik, noise]).astype(np.float32)
+
+
+def rentang_kandidat(n_docs):
+    """Rentang min_cluster_size yang sama dengan bertopic_analysis"""
+    if n_docs < 500:
+        return range(4, 18)
+    if n_docs < 1000:
+        return range(8, 25)
+    if n_docs < 1500:
+        return range(12, 30)
+    if n_docs < 5500:
+        return range(21, 50)
+    if n_docs < 10000:
+        return range(35, 65)
+    return range(50, 85)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--min-samples', type=int, default=10)
+    args = parser.parse_args()
+
+    for n_docs in args.sizes:
+        X = buat_embedding_tereduksi(n_docs)
+        kandidat = list(rentang_kandidat(n_docs))
+
+        mulai = time.perf_counter()
+        independen = {
+            m: HDBSCAN(min_cluster_size=m, min_samples=args.min_samples, metric='euclidean',
+                       cluster_selection_method='eom', core_dist_n_jobs=-2).fit(X).labels_
+            for m in kandidat
+        }
+        t_independen = time.perf_counter() - mulai
+
+        mulai = time.perf_counter()
+        hierarki = HierarkiHDBSCAN(X, args.min_samples)
+        dipakai_ulang = {m: hierarki.labels(m) for m in kandidat}
+        t_ulang = time.perf_counter() - mulai
+
+        beda = [m for m in kandidat if not np.array_equal(independen[m], dipakai_ulang[m])]
+        print(f"n={n_docs:<6} kandidat={len(kandidat):<3} independen={t_independen:7.2f} s  "
+              f"hierarki bersama={t_ulang:7.2f} s  speedup={t_independen / t_ulang:5.1f}x  "
+              f"label berbeda={len(beda)}")
+        if beda:
+            raise SystemExit(f"Label berbeda untuk min_cluster_size {beda}")
+
+
+if __name__ == '__main__':
+    main()
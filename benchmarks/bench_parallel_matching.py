@@ -0,0 +1,47 @@
+"""
+Benchmark throughput keyword matching paralel (ProcessPoolExecutor)
+
+Mengukur dokumen/detik untuk 1, 2, 4 dan N worker pada korpus sintetis.
+Jalankan dari root repo:
+    python -m benchmarks.bench_parallel_matching --docs 50000
+"""
+
+import argparse
+import os
+import time
+
+from backend.models.model_match import KeywordMatcher, load_cleaned_keywords, match_parallel
+from benchmarks.bench_keyword_matching import buat_dokumen_sintetis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=50000, help="Jumlah abstrak sintetis")
+    parser.add_argument('--engine', choices=['batch', 'index'], default='batch')
+    parser.add_argument('--shard-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    df_topik = load_cleaned_keywords()
+    matcher = KeywordMatcher(df_topik)
+    docs = buat_dokumen_sintetis(df_topik, args.docs)
+
+    n_cpu = os.cpu_count() or 1
+    daftar_worker = sorted({1, 2, 4, n_cpu})
+    print(f"Dokumen: {len(docs)}, engine: {args.engine}, shard: {args.shard_size}, CPU: {n_cpu}")
+
+    acuan = None
+    for n_workers in daftar_worker:
+        mulai = time.perf_counter()
+        hasil = match_parallel(matcher, docs, engine=args.engine,
+                               n_workers=n_workers, shard_size=args.shard_size)
+        durasi = time.perf_counter() - mulai
+        print(f"workers={n_workers:<3} {durasi:8.2f} s  {len(docs) / durasi:10.1f} dok/s")
+
+        if acuan is None:
+            acuan = hasil
+        elif hasil != acuan:
+            raise SystemExit(f"Hasil dengan {n_workers} worker berbeda dari 1 worker")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark tokenisasi coherence: word_tokenize + lemmatize per token vs split + cache lemma
+
+Membandingkan simple_tokenizer versi lama (NLTK word_tokenize dan
+WordNetLemmatizer untuk setiap kemunculan token) dengan simple_tokenizer dari
+backend.models.preprocessing, lalu memastikan token keduanya identik.
+Jalankan dari root repo:
+    python -m benchmarks.bench_tokenizer --docs 20000 --workers 0 2
+"""
+
+import argparse
+import random
+import re
+import time
+
+from nltk.corpus import wordnet
+from nltk.tokenize import word_tokenize
+
+from backend.models.preprocessing import lemmatizer, lemma_verba, simple_tokenizer, stop_words
+
+
+def simple_tokenizer_lama(texts):
+    """Implementasi simple_tokenizer sebelum split + cache lemma (acuan)"""
+    tokenized = []
+    for doc in texts:
+        doc = doc.lower()
+        doc = re.sub(r'[^a-zA-Z\s]', '', doc)
+        doc = re.sub(r'\s+', ' ', doc).strip()
+        tokens = word_tokenize(doc)
+        tokens = [lemmatizer.lemmatize(w, pos='v') for w in tokens if w not in stop_words and len(w) > 2]
+        tokenized.append(tokens)
+    return tokenized
+
+
+def buat_dokumen(n_docs, n_words=200, seed=0):
+    """Dokumen dari kosakata WordNet dengan tanda baca, angka, kontraksi dan huruf besar"""
+    rng = random.Random(seed)
+    kosakata = sorted({nama.replace('_', ' ') for nama in wordnet.all_lemma_names()})
+    kosakata = rng.sample(kosakata, 30000) + [
+        "cannot", "Gonna", "wanna", "gotta", "lemme", "gimme", "can't", "it's",
+        "U.S.", "e-mail", "3D", "naïve", "(model)", "results.", "data,", "\t\n",
+    ]
+    return [
+        " ".join(rng.choice(kosakata) for _ in range(n_words))
+        for _ in range(n_docs)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=20000, help="Jumlah dokumen")
+    parser.add_argument('--workers', type=int, nargs='+', default=[0], help="n_workers yang diukur (0 = satu proses)")
+    args = parser.parse_args()
+
+    docs = buat_dokumen(args.docs)
+    print(f"Dokumen: {args.docs}")
+
+    mulai = time.perf_counter()
+    acuan = simple_tokenizer_lama(docs)
+    t_lama = time.perf_counter() - mulai
+    print(f"{'word_tokenize + lemmatize':<28} {t_lama:8.2f} s")
+
+    for n_workers in args.workers:
+        lemma_verba.cache_clear()
+        mulai = time.perf_counter()
+        hasil = simple_tokenizer(docs, n_workers=n_workers or 0)
+        durasi = time.perf_counter() - mulai
+        print(f"{f'split + cache (workers={n_workers})':<28} {durasi:8.2f} s  speedup={t_lama / durasi:5.1f}x")
+        if hasil != acuan:
+            beda = sum(a != b for a, b in zip(acuan, hasil))
+            raise SystemExit(f"{beda} dokumen berbeda dari implementasi lama")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark labeling topik tanpa jaringan
+
+Memakai KeywordLabelBackend dengan latency buatan untuk membandingkan labeling
+per topik (sekuensial dan paralel), mode batch (banyak topik per request) dan
+pemanggilan ulang yang dilayani cache persisten.
+Jalankan dari root repo:
+    python -m benchmarks.bench_topic_labeling --topics 40 --latency 0.3
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.models.llm_client import KeywordLabelBackend, LabelCache, TopicLabeler
+
+KOSAKATA = (
+    "network routing wireless protocol neural learning training model security attack "
+    "encryption privacy database query index transaction image vision detection segmentation "
+    "graph algorithm optimization scheduling cloud energy sensor robot language translation"
+).split()
+
+
+def buat_topik(n_topics, n_words=10, seed=0):
+    """dict topic_id -> kata representasi acak"""
+    rng = random.Random(seed)
+    return {tid: rng.sample(KOSAKATA, n_words) for tid in range(n_topics)}
+
+
+def ukur(nama, labeler, topics):
+    mulai = time.perf_counter()
+    labels = labeler.label(topics)
+    durasi = time.perf_counter() - mulai
+    print(f"{nama:<26} {durasi:8.2f} s")
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--topics', type=int, default=40, help="Jumlah topik")
+    parser.add_argument('--latency', type=float, default=0.3, help="Latency buatan per request (detik)")
+    parser.add_argument('--workers', type=int, default=8, help="Request label bersamaan")
+    args = parser.parse_args()
+
+    topics = buat_topik(args.topics)
+    backend = KeywordLabelBackend(latency=args.latency)
+    print(f"Topik: {args.topics}, latency: {args.latency} s, workers: {args.workers}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = LabelCache(os.path.join(tmp, "labels.sqlite"))
+        acuan = ukur("per topik, sekuensial", TopicLabeler(backend, max_workers=1, batch=False), topics)
+        paralel = ukur("per topik, paralel", TopicLabeler(backend, max_workers=args.workers, batch=False), topics)
+        batch = ukur("batch", TopicLabeler(backend, cache=cache, max_workers=args.workers), topics)
+        ulang = ukur("batch + cache (ulang)", TopicLabeler(backend, cache=cache, max_workers=args.workers), topics)
+
+    if not (acuan == paralel == batch == ulang):
+        raise SystemExit("Label berbeda antar mode")
+
+
+if __name__ == '__main__':
+    main()
@@ -240,6 +240,8 @@ if (fileInput) {
 
       if (status === 'duplicate') {
         alert('File sudah ada di server');
+      } else if (msg === 'TOO_LARGE') {
+        alert('Ukuran file melebihi batas upload server');
       } else if (status === 'success') {
         alert('File berhasil diupload');
       } else {
@@ -305,6 +307,8 @@ if (dropzone) {
         loadFilesFromServer();
       } else if (msg === 'DUPLICATE') {
         alert('File sudah ada di server');
+      } else if (msg === 'TOO_LARGE') {
+        alert('Ukuran file melebihi batas upload server');
       } else {
         alert('Gagal mengupload file');
       }
@@ -368,14 +372,14 @@ if (runAnalysisBtn) {
     // Navigate to analysis page
     showPage('analisis');
     
-    // Show appropriate analysis slide
-    showAnalisisSlide(metode);
+    // Show appropriate analysis slide (matching embedding memakai tampilan keyword)
+    showAnalisisSlide(metode === "embedding" ? "keyword" : metode);
 
     // Run analysis based on method
     if (metode === "bertopic") {
       jalankanAnalisisBertopic(namaFile);
-    } else if (metode === "keyword") {
-      jalankanAnalisisKeyword(namaFile);
+    } else if (metode === "keyword" || metode === "embedding") {
+      jalankanAnalisisKeyword(namaFile, metode);
     } else {
       alert("Metode analisis belum didukung.");
     }
@@ -433,6 +437,140 @@ function setInnerHTMLWithScripts(el, html) {
   });
 }
 
+// ===================
+// Job queue: /analyze dan /generate_topics mengembalikan job id, progress diikuti lewat
+// Server-Sent Events (fallback ke polling) lalu hasil diambil dari /jobs/<id>/result
+// ===================
+
+const LABEL_TAHAP_JOB = {
+  queued: "Menunggu antrian",
+  started: "Memulai",
+  preprocessing: "Preprocessing data",
+  loading_models: "Memuat model",
+  incremental: "Menyiapkan analisis inkremental",
+  encoding: "Membuat embeddings",
+  tokenizing: "Tokenisasi dokumen",
+  umap: "Reduksi dimensi UMAP",
+  sweep: "Evaluasi min_cluster_size",
+  plot: "Membuat plot",
+  indexing: "Membangun index paper serupa",
+  fitting: "Fitting topic model",
+  reducing_outliers: "Mengurangi outlier",
+  labeling: "Membuat label topik",
+  matching: "Matching bidang ilmu",
+  agreement: "Membandingkan dengan keyword matching",
+  chart: "Membuat chart",
+};
+
+// Parameter /analyze untuk mode inkremental (checkbox di halaman upload)
+function parameterInkremental() {
+  const checkbox = document.getElementById("analisisInkremental");
+  return checkbox && checkbox.checked ? "&incremental=1" : "";
+}
+
+function formatCatatanInkremental(info) {
+  if (!info) return "";
+  if (info.dipakai) {
+    return `<p><em>Analisis inkremental: ${info.baris_baru} paper baru di-assign ke topik sebelumnya.</em></p>`;
+  }
+  return `<p><em>Analisis inkremental tidak dipakai (${info.alasan}); model di-fit ulang penuh.</em></p>`;
+}
+
+function formatProgressJob(status) {
+  const label = LABEL_TAHAP_JOB[status.stage] || status.stage;
+  const progress = status.progress || {};
+  if (progress.total) {
+    return `${label} (${progress.current || 0}/${progress.total})...`;
+  }
+  return `${label}...`;
+}
+
+function ambilHasilJob(jobId) {
+  return fetch(`/jobs/${jobId}/result`).then((res) => res.json());
+}
+
+function pollJob(jobId, onProgress, intervalMs = 1500) {
+  return new Promise((resolve, reject) => {
+    const poll = () => {
+      fetch(`/jobs/${jobId}`)
+        .then((res) => res.json())
+        .then((status) => {
+          if (!status.status) {
+            resolve({ error: status.error || "Job tidak ditemukan" });
+            return;
+          }
+          if (onProgress) onProgress(status);
+
+          if (status.status === "done" || status.status === "error") {
+            ambilHasilJob(jobId).then(resolve).catch(reject);
+          } else {
+            setTimeout(poll, intervalMs);
+          }
+        })
+        .catch(reject);
+    };
+    poll();
+  });
+}
+
+function ikutiJobSSE(jobId, onProgress) {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/jobs/${jobId}/events`);
+    let selesai = false;
+
+    source.addEventListener("progress", (event) => {
+      if (onProgress) onProgress(JSON.parse(event.data));
+    });
+
+    const akhiri = () => {
+      selesai = true;
+      source.close();
+      ambilHasilJob(jobId).then(resolve).catch(reject);
+    };
+    source.addEventListener("done", akhiri);
+    source.addEventListener("failed", akhiri);
+
+    // Koneksi stream terputus sebelum job selesai: lanjutkan dengan polling
+    source.onerror = () => {
+      if (selesai) return;
+      source.close();
+      pollJob(jobId, onProgress).then(resolve).catch(reject);
+    };
+  });
+}
+
+function tungguJob(response, onProgress, onSubmit) {
+  return response.json().then((submit) => {
+    // Error validasi (400/404/503) langsung dikembalikan apa adanya
+    if (!submit.job_id) {
+      return submit;
+    }
+    if (onSubmit) onSubmit(submit);
+
+    return window.EventSource
+      ? ikutiJobSSE(submit.job_id, onProgress)
+      : pollJob(submit.job_id, onProgress);
+  });
+}
+
+// Plot coherence yang bertambah setiap kandidat sweep selesai
+function renderSweepLive(el, titik) {
+  if (!window.Plotly || !el) return;
+  const urut = [...titik].sort((a, b) => a.x - b.x);
+  Plotly.react(
+    el,
+    [{ x: urut.map((t) => t.x), y: urut.map((t) => t.y), mode: "lines+markers" }],
+    {
+      title: "Coherence Score vs. min_cluster_size (HDBSCAN)",
+      xaxis: { title: "Min Cluster Size" },
+      yaxis: { title: "Coherence Score" },
+      width: 800,
+      height: 500,
+      showlegend: false,
+    }
+  );
+}
+
 // ===================
 // Updated functions for topic generation
 // ===================
@@ -457,6 +595,7 @@ function generateTopikDenganLabel() {
   topicResultDiv.innerHTML = `
     <div style="text-align:center;padding:20px;">
       <p>Generating topics and labels...</p>
+      <p class="job-progress"></p>
       <div class="spinner"></div>
     </div>
   `;
@@ -473,7 +612,10 @@ function generateTopikDenganLabel() {
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
-      return response.json();
+      return tungguJob(response, (status) => {
+        const progressEl = topicResultDiv.querySelector(".job-progress");
+        if (progressEl) progressEl.textContent = formatProgressJob(status);
+      });
     })
     .then((data) => {
       if (data.error) {
@@ -575,16 +717,47 @@ function jalankanAnalisisBertopic(namaFile) {
   hasilDiv.innerHTML = `
     <div style="text-align:center;padding:20px;">
       <p>Memproses analisis BERTopic...</p>
+      <p class="job-progress"></p>
       <div class="loader"></div>
+      <button class="btn-stop-sweep" style="display:none;margin-top:10px;">Hentikan sweep &amp; pakai hasil sementara</button>
+      <div class="coherence-plot-live"></div>
     </div>
   `;
 
+  const titikSweep = [];
+  const stopBtn = hasilDiv.querySelector(".btn-stop-sweep");
+
   fetch("/analyze", {
     method: "POST",
     headers: { "Content-Type": "application/x-www-form-urlencoded" },
-    body: `filename=${encodeURIComponent(namaFile)}&metode=bertopic`,
+    body: `filename=${encodeURIComponent(namaFile)}&metode=bertopic${parameterInkremental()}`,
   })
-    .then((response) => response.json())
+    .then((response) => tungguJob(
+      response,
+      (status) => {
+        const progressEl = hasilDiv.querySelector(".job-progress");
+        if (progressEl) progressEl.textContent = formatProgressJob(status);
+
+        const progress = status.progress || {};
+        if (status.stage === "sweep") {
+          if (stopBtn) stopBtn.style.display = "inline-block";
+          if (progress.min_cluster_size !== undefined && progress.coherence !== null) {
+            titikSweep.push({ x: progress.min_cluster_size, y: progress.coherence });
+            renderSweepLive(hasilDiv.querySelector(".coherence-plot-live"), titikSweep);
+          }
+        } else if (stopBtn && titikSweep.length > 0) {
+          stopBtn.style.display = "none";
+        }
+      },
+      (submit) => {
+        if (!stopBtn) return;
+        stopBtn.onclick = () => {
+          stopBtn.disabled = true;
+          stopBtn.textContent = "Menghentikan sweep...";
+          fetch(`/jobs/${submit.job_id}/stop`, { method: "POST" });
+        };
+      }
+    ))
     .then((data) => {
       if (data.error) {
         hasilDiv.innerHTML = `<p style="color:red;">Error: ${data.error}</p>`;
@@ -623,6 +796,8 @@ function jalankanAnalisisBertopic(namaFile) {
             <p><strong>Parameter Terbaik:</strong></p>
             <p><strong>min_cluster_size:</strong> ${data.best_params.min_cluster_size}</p>
             <p><strong>Coherence Score:</strong> ${parseFloat(data.best_params.coherence_score).toFixed(4)}</p>
+            ${data.stopped_early ? "<p><em>Sweep dihentikan lebih awal; hasil dari kandidat yang sudah dievaluasi.</em></p>" : ""}
+            ${formatCatatanInkremental(data.incremental)}
           </div>
         `;
       }
@@ -665,7 +840,18 @@ function jalankanAnalisisBertopic(namaFile) {
 // Make function available globally
 window.generateTopikDenganLabel = generateTopikDenganLabel;
 
-function jalankanAnalisisKeyword(namaFile) {
+function formatKesepakatan(laporan) {
+  if (!laporan || !laporan.n_dokumen) return "";
+  const sumber = laporan.sumber === "sampel" ? `sampel ${laporan.n_dokumen} dokumen` : `${laporan.n_dokumen} dokumen`;
+  return `
+    <div style="background:#f9f9f9; padding:15px; border-radius:8px; margin:15px 0;">
+      <p><strong>Kesepakatan dengan Matching Keyword</strong> (${sumber})</p>
+      <p>Label sama: ${(laporan.agreement * 100).toFixed(1)}% &middot; Cohen's kappa: ${laporan.kappa.toFixed(3)}</p>
+    </div>
+  `;
+}
+
+function jalankanAnalisisKeyword(namaFile, metode = "keyword") {
   const hasilDiv = document.getElementById("hasilKeyword");
   const containerDiv = document.getElementById("analisisKeyword");
   const chartImg = document.getElementById("topFieldsChartImg");
@@ -680,7 +866,8 @@ function jalankanAnalisisKeyword(namaFile) {
   if (hasilDiv) {
     hasilDiv.innerHTML = `
       <div style="text-align:center;padding:20px;">
-        <p>Memproses analisis Keyword Matching...</p>
+        <p>Memproses analisis ${metode === "embedding" ? "Embedding" : "Keyword"} Matching...</p>
+        <p class="job-progress"></p>
         <div class="loader"></div>
       </div>
     `;
@@ -694,9 +881,12 @@ function jalankanAnalisisKeyword(namaFile) {
   fetch("/analyze", {
     method: "POST",
     headers: { "Content-Type": "application/x-www-form-urlencoded" },
-    body: `filename=${encodeURIComponent(namaFile)}&metode=keyword`,
+    body: `filename=${encodeURIComponent(namaFile)}&metode=${metode}${parameterInkremental()}`,
   })
-    .then((response) => response.json())
+    .then((response) => tungguJob(response, (status) => {
+      const progressEl = hasilDiv && hasilDiv.querySelector(".job-progress");
+      if (progressEl) progressEl.textContent = formatProgressJob(status);
+    }))
     .then((data) => {
       if (data.error) {
         if (hasilDiv) {
@@ -713,20 +903,16 @@ function jalankanAnalisisKeyword(namaFile) {
         chartImg.style.display = "block";
       }
 
-      // Tampilkan grouped result jika ada
-      if (data.grouped && recommendationCard) {
-        displayGroupedResults(data.grouped);
-      }
-
-      // Clear hasil div jika ada
+      // Clear hasil div jika ada (laporan kesepakatan untuk matching embedding)
       if (hasilDiv) {
-        hasilDiv.innerHTML = "";
+        hasilDiv.innerHTML = formatKesepakatan(data.agreement);
       }
 
       // Aktifkan container
       containerDiv.classList.add("active");
 
-      // Setup event listener untuk dropdown cluster
+      // Setup event listener untuk dropdown cluster; grouping Groq dimuat
+      // terpisah lewat /generate_groups setelah chart tampil
       setupClusterSelector(namaFile);
     })
     .catch((error) => {
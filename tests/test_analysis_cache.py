@@ -0,0 +1,35 @@
+import numpy as np
+
+from backend.models.analysis_cache import AnalysisCache
+
+
+def buat_entry(n_bytes):
+    return {"embeddings": np.zeros(n_bytes // 8), "topic_assignments": {}}
+
+
+def test_entry_pinned_tidak_di_spill(tmp_path):
+    cache = AnalysisCache(max_bytes=3000, spill_dir=str(tmp_path))
+    cache["a"] = buat_entry(2000)
+    with cache.pinned("a") as data:
+        # Entry baru melewati max_bytes; "a" yang sedang dipakai tetap di memori
+        cache["b"] = buat_entry(2000)
+        data["topic_assignments"][(5, 10)] = np.arange(3)
+        cache["c"] = buat_entry(2000)
+    assert (5, 10) in cache["a"]["topic_assignments"]
+    assert cache.stats()["memory_bytes"] <= 3000 + cache._entries["a"]["nbytes"]
+
+
+def test_entry_di_spill_setelah_pin_dilepas(tmp_path):
+    cache = AnalysisCache(max_bytes=3000, spill_dir=str(tmp_path))
+    cache["a"] = buat_entry(2000)
+    with cache.pinned("a") as data:
+        data["topic_assignments"][(5, 10)] = np.arange(3)
+    cache["b"] = buat_entry(2000)
+    assert cache._entries["a"]["data"] is None
+    np.testing.assert_array_equal(cache["a"]["topic_assignments"][(5, 10)], np.arange(3))
+
+
+def test_pinned_key_tidak_ada(tmp_path):
+    cache = AnalysisCache(spill_dir=str(tmp_path))
+    with cache.pinned("x") as data:
+        assert data is None
@@ -0,0 +1,38 @@
+import threading
+
+import numpy as np
+
+from backend.models.ann_index import AnnStore
+
+
+def test_build_bersamaan_untuk_isi_yang_sama(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(500, 16)).astype(np.float32)
+    keys = [f"{i:016x}".encode() for i in range(len(embeddings))]
+
+    # Satu store per thread meniru beberapa proses server; satu store bersama
+    # meniru beberapa job dalam satu proses
+    stores = [AnnStore(str(tmp_path)) for _ in range(4)]
+    bersama = AnnStore(str(tmp_path))
+    stores += [bersama] * 4
+    hasil, errors = [], []
+
+    def build(store):
+        try:
+            hasil.append(store.build("abc", embeddings, keys))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=build, args=(store,)) for store in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(hasil) == len(stores) and all(index is not None for index in hasil)
+    index = AnnStore(str(tmp_path)).get("abc")
+    ids, _ = index.search(embeddings[7], k=1)
+    assert ids[0] == 7
+    # Tidak ada folder sementara atau folder lama yang tertinggal
+    assert sorted(p.name for p in (tmp_path / ".ann" / "abc").iterdir()) == ["v1"]
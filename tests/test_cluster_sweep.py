@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from hdbscan import HDBSCAN
+
+from backend.models.cluster_sweep import HierarkiHDBSCAN
+
+
+def buat_blob(n_docs, dim, n_clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    pusat = rng.uniform(-10, 10, size=(n_clusters, dim))
+    ukuran = rng.dirichlet(np.ones(n_clusters)) * n_docs * 0.9
+    titik = [rng.normal(p, rng.uniform(0.3, 1.5), size=(max(int(u), 1), dim)) for p, u in zip(pusat, ukuran)]
+    titik.append(rng.uniform(-12, 12, size=(n_docs - sum(len(t) for t in titik), dim)))
+    return np.vstack(titik)
+
+
+@pytest.mark.parametrize("dim", [5, 64])
+@pytest.mark.parametrize("min_samples", [1, 10])
+def test_label_sama_dengan_fit_independen(dim, min_samples):
+    X = buat_blob(1500, dim)
+    hierarki = HierarkiHDBSCAN(X, min_samples)
+    for m in (5, 12, 30, 60, 150):
+        acuan = HDBSCAN(min_cluster_size=m, min_samples=min_samples, metric='euclidean',
+                        cluster_selection_method='eom').fit(X).labels_
+        np.testing.assert_array_equal(hierarki.labels(m), acuan)
+
+
+def test_min_samples_lebih_besar_dari_data():
+    X = buat_blob(40, 5, n_clusters=2)
+    acuan = HDBSCAN(min_cluster_size=5, min_samples=100).fit(X).labels_
+    np.testing.assert_array_equal(HierarkiHDBSCAN(X, 100).labels(5), acuan)
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+from gensim.corpora.dictionary import Dictionary
+from gensim.models.coherencemodel import CoherenceModel
+
+from backend.models.coherence import C_V_TOLERANCE, CoherenceIndex
+
+KOSAKATA = ("topic model neural network graph learning data cluster embedding query "
+            "database index retrieval vision image protein gene sensor wireless energy").split()
+
+
+def buat_korpus(seed=0):
+    """Dokumen pendek, kosong, dan lebih panjang dari window; banyak token berulang"""
+    rng = random.Random(seed)
+    texts = [[], ["graph"], ["graph", "graph", "graph"]]
+    for i in range(60):
+        kata = rng.sample(KOSAKATA, rng.randint(3, 8))
+        texts.append(rng.choices(kata, k=rng.choice([5, 20, 150, 400])))
+    return texts
+
+
+TOPICS = [
+    ["topic", "model", "neural", "network", "graph"],
+    # Kata di luar dictionary dibuang, kata berulang tetap dihitung
+    ["query", "tidak_ada_di_korpus", "database", "query", "index", "retrieval"],
+    ["protein", "gene", "gene", "sensor", "image", "vision"],
+]
+
+
+@pytest.mark.parametrize("window_size", [10, 110])
+@pytest.mark.parametrize("topn", [4, 15])
+def test_c_v_sama_dengan_gensim(window_size, topn):
+    texts = buat_korpus()
+    dictionary = Dictionary(texts)
+    acuan = CoherenceModel(topics=TOPICS, texts=texts, dictionary=dictionary, coherence='c_v',
+                           window_size=window_size, topn=topn, processes=1).get_coherence()
+    index = CoherenceIndex(texts, dictionary, window_size=window_size)
+    assert abs(index.c_v(TOPICS, topn=topn) - acuan) <= C_V_TOLERANCE
+    # Cache NPMI dari pemanggilan pertama tidak mengubah hasil
+    assert abs(index.c_v(TOPICS[::-1], topn=topn) - acuan) <= C_V_TOLERANCE
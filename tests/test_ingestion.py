@@ -0,0 +1,35 @@
+import csv
+
+import pandas as pd
+from openpyxl import Workbook
+
+from backend.models.ingestion import read_csv_upload, read_excel_upload
+
+HEADER = ['Authors', 'Title', 'Abstract', 'Year', 'Abstract', 'Abstract.1']
+ROWS = [
+    ['A. Author', 'Judul pertama', 'Abstrak pertama', 2020, 'Duplikat', 'Lain'],
+    ['B. Author', 'Judul kedua', 'Abstrak kedua', 2021, None, 'Lain'],
+    ['C. Author', 12345, 'NA', 2022, 'Duplikat', None],
+]
+
+
+def test_header_duplikat_xlsx_sama_dengan_csv(tmp_path):
+    xlsx = tmp_path / "data.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(xlsx)
+
+    path_csv = tmp_path / "data.csv"
+    with open(path_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(ROWS)
+
+    df = read_excel_upload(str(xlsx))
+    assert df.columns.tolist() == ['Title', 'Abstract']
+    assert df['Abstract'].tolist()[:2] == ['Abstrak pertama', 'Abstrak kedua']
+    pd.testing.assert_frame_equal(df, read_csv_upload(str(path_csv), chunk_min_bytes=0),
+                                  check_dtype=False)
@@ -0,0 +1,45 @@
+from backend.models.job_queue import DONE, ERROR, JobQueue
+
+
+def tunggu_stop(job):
+    job.stop_event.wait(5)
+    return "parsial"
+
+
+def tunggu_selesai(job):
+    while not job.finished:
+        job.wait_events(len(job.events), timeout=1)
+    return job
+
+
+def test_submit_ulang_setelah_stop_membuat_job_baru():
+    queue = JobQueue(max_workers=2)
+    lama, _ = queue.submit("k", "analyze", tunggu_stop)
+    queue.stop(lama.id)
+    baru, deduplicated = queue.submit("k", "analyze", lambda job: "lengkap")
+    assert not deduplicated and baru.id != lama.id
+    assert tunggu_selesai(lama).result == "parsial"
+    assert tunggu_selesai(baru).result == "lengkap"
+    # Selesainya job lama tidak melepas entry job pengganti
+    assert queue.stats()["active"] == 0
+
+
+def test_submit_ulang_setelah_error_membuat_job_baru():
+    def error(job):
+        raise RuntimeError("gagal")
+
+    queue = JobQueue()
+    lama, _ = queue.submit("k", "analyze", error)
+    assert tunggu_selesai(lama).status == ERROR
+    baru, deduplicated = queue.submit("k", "analyze", lambda job: "ok")
+    assert not deduplicated
+    assert tunggu_selesai(baru).status == DONE
+
+
+def test_submit_ulang_job_berjalan_dideduplikasi():
+    queue = JobQueue()
+    lama, _ = queue.submit("k", "analyze", tunggu_stop)
+    sama, deduplicated = queue.submit("k", "analyze", tunggu_stop)
+    assert deduplicated and sama is lama
+    queue.stop(lama.id)
+    tunggu_selesai(lama)
@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from rapidfuzz import fuzz
+
+from backend.models.model_match import (
+    KeywordMatcher,
+    cari_bidang_ilmu_terbaik_dengan_fallback,
+    load_cleaned_keywords,
+)
+from benchmarks.bench_keyword_matching import buat_dokumen_sintetis
+
+TOPIK = pd.DataFrame({
+    'Topik_Utama': ['Machine learning', 'Computer vision', 'Databases', 'Networks', 'Tanpa keyword',
+                    'Stream processing', 'Keyword rusak'],
+    'Keywords': [
+        ['Neural Networks', 'deep learning', 'reinforcement learning'],
+        # 'deep learning' juga ada di topik sebelumnya: keyword pertama yang menang
+        ['image segmentation', 'object detection', 'deep learning'],
+        ['query optimization', 'transaction processing', 'sql'],
+        ['routing protocol', 'wireless sensor networks', 42],
+        [],
+        # Lebih dari 64 karakter: _cari_exact tidak memakai pencarian substring
+        ['distributed stream processing over heterogeneous clusters of commodity machines'],
+        np.nan,
+    ],
+})
+
+DOKUMEN = [
+    "",
+    "---",
+    "sql",
+    "zzzz qqq xxx",
+    "We study NEURAL NETWORKS for vision",
+    "objct detecton in aerial images",
+    "query optimisation for analytical workloads",
+    "transacton procesing",
+    "deep learning",
+    "a survey of distributed stream processing over heterogeneous clusters of commodity machines",
+    "distributed stream procesing over heterogenous clusters of comodity machines",
+    "wireless sensor",
+]
+
+
+def _hapus_karakter(rng, teks, n):
+    for _ in range(n):
+        if len(teks) > 1:
+            i = rng.randrange(len(teks))
+            teks = teks[:i] + teks[i + 1:]
+    return teks
+
+
+def _keywords(df_topik):
+    return [kw.lower() for kws in df_topik['Keywords'] if isinstance(kws, list) for kw in kws if isinstance(kw, str)]
+
+
+def dokumen_dekat_threshold(df_topik, seed=0):
+    """Keyword dengan 1-4 karakter dihapus di tengah kata umum: skor di sekitar threshold"""
+    rng = random.Random(seed)
+    return [
+        f"in this paper {_hapus_karakter(rng, kw, n)} is evaluated"
+        for kw in _keywords(df_topik) for n in range(1, 5)
+    ]
+
+
+def dokumen_tanpa_jangkar(df_topik, seed=0):
+    """
+    Keyword yang setiap katanya salah ketik: token jangkar inverted index tidak
+    muncul, sehingga keyword terbaik hanya ditemukan lewat pruning _batas_atas.
+    """
+    rng = random.Random(seed)
+    return [
+        "we evaluate " + " ".join(_hapus_karakter(rng, kata, 1) for kata in kw.split())
+        for kw in _keywords(df_topik)
+    ]
+
+
+def cek_sama(df_topik, docs, threshold):
+    matcher = KeywordMatcher(df_topik)
+    acuan = [cari_bidang_ilmu_terbaik_dengan_fallback(d, df_topik, threshold) for d in docs]
+    assert matcher.match_many(docs, threshold) == acuan
+    assert matcher.match_batch(docs, threshold, chunk_size=7) == acuan
+
+
+def test_korpus_sekitar_threshold_mencakup_kedua_sisi():
+    docs = dokumen_dekat_threshold(TOPIK)
+    keywords = KeywordMatcher(TOPIK).keywords
+    skor = [max(fuzz.partial_ratio(d, kw) for kw in keywords) for d in docs]
+    assert any(75 <= s < 80 for s in skor) and any(80 <= s < 90 for s in skor)
+
+
+@pytest.mark.parametrize("threshold", [60, 80, 90, 100])
+def test_sama_dengan_loop_lama(threshold):
+    cek_sama(TOPIK, DOKUMEN + dokumen_dekat_threshold(TOPIK) + dokumen_tanpa_jangkar(TOPIK), threshold)
+
+
+def test_sama_dengan_loop_lama_taksonomi_acm():
+    df_topik = load_cleaned_keywords()
+    cek_sama(df_topik, buat_dokumen_sintetis(df_topik, 40) + dokumen_tanpa_jangkar(df_topik)[::3], 80)